@@ -222,7 +222,7 @@ class DashboardController(http.Controller):
             })
             
         except Exception as e:
-            _logger.exception(f"Error getting chart data for {chart_type}")
+            _logger.exception("Error getting chart data for %s", chart_type)
             return self._json_response({
                 'success': False,
                 'error': str(e)
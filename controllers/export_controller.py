@@ -11,14 +11,20 @@ Controller ini menyediakan REST API endpoints untuk:
 import json
 import base64
 import logging
+import tempfile
 from datetime import datetime
 
+from werkzeug.wsgi import wrap_file
+
 from odoo import http, _
 from odoo.http import request, Response
 from odoo.exceptions import AccessError, UserError
 
 _logger = logging.getLogger(__name__)
 
+# Batas ukuran file CSV download yang disimpan di RAM sebelum di-spill ke disk
+CSV_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
 
 class EmployeeExportController(http.Controller):
     """
@@ -102,10 +108,10 @@ class EmployeeExportController(http.Controller):
             }
             
         except AccessError as e:
-            _logger.warning(f"Access denied for export: {str(e)}")
+            _logger.warning("Access denied for export: %s", e)
             return {'success': False, 'error': 'Akses ditolak'}
         except Exception as e:
-            _logger.error(f"Export error: {str(e)}")
+            _logger.error("Export error: %s", e)
             return {'success': False, 'error': str(e)}
     
     @http.route('/api/employee/export/regulatory', type='json', auth='user', methods=['POST'])
@@ -156,7 +162,7 @@ class EmployeeExportController(http.Controller):
             }
             
         except Exception as e:
-            _logger.error(f"Regulatory export error: {str(e)}")
+            _logger.error("Regulatory export error: %s", e)
             return {'success': False, 'error': str(e)}
     
     @http.route('/api/employee/export/download', type='http', auth='user', methods=['GET'])
@@ -188,6 +194,9 @@ class EmployeeExportController(http.Controller):
             if not employees:
                 return Response("No data found", status=404)
             
+            if export_format == 'csv':
+                return self._stream_csv_download(employees, categories)
+            
             # Export
             file_data, filename = self._do_export(
                 employees, export_format, categories, {}
@@ -208,7 +217,7 @@ class EmployeeExportController(http.Controller):
         except AccessError:
             return Response("Access Denied", status=403)
         except Exception as e:
-            _logger.error(f"Download error: {str(e)}")
+            _logger.error("Download error: %s", e)
             return Response(str(e), status=500)
     
     # ===========================================
@@ -237,7 +246,7 @@ class EmployeeExportController(http.Controller):
             }
             
         except Exception as e:
-            _logger.error(f"Analytics error: {str(e)}")
+            _logger.error("Analytics error: %s", e)
             return {'success': False, 'error': str(e)}
     
     @http.route('/api/employee/analytics/gender', type='json', auth='user', methods=['GET'])
@@ -425,14 +434,45 @@ class EmployeeExportController(http.Controller):
             return service.export(employees, categories, delimiter=delimiter)
         elif export_format == 'json':
             pretty = options.get('pretty', True)
+            omit_empty = options.get('omit_empty', False)
             service = EmployeeExportJson(request.env)
-            return service.export(employees, categories, pretty=pretty)
+            return service.export(employees, categories, pretty=pretty,
+                                  omit_empty=omit_empty)
         elif export_format == 'pdf':
             service = EmployeeExportPdf(request.env)
             return service.export(employees, categories)
         else:
             raise ValueError(f"Format tidak didukung: {export_format}")
     
+    def _stream_csv_download(self, employees, categories, delimiter=','):
+        """
+        Download CSV tanpa menampung seluruh file di memory.
+        
+        Chunk dari EmployeeExportCsv.export_stream ditulis ke file sementara
+        (di-spill ke disk jika besar) selama transaksi request masih aktif,
+        lalu file dikirim ke client secara streaming.
+        """
+        from ..services import EmployeeExportCsv
+        
+        service = EmployeeExportCsv(request.env)
+        chunks, filename = service.export_stream(employees, categories, delimiter=delimiter)
+        
+        output = tempfile.SpooledTemporaryFile(max_size=CSV_SPOOL_MAX_SIZE)
+        for chunk in chunks:
+            output.write(chunk)
+        size = output.tell()
+        output.seek(0)
+        
+        return Response(
+            wrap_file(request.httprequest.environ, output),
+            headers=[
+                ('Content-Type', self._get_mimetype('csv')),
+                ('Content-Disposition', f'attachment; filename="{filename}"'),
+                ('Content-Length', str(size)),
+            ],
+            direct_passthrough=True,
+        )
+    
     def _get_mimetype(self, export_format):
         """Get MIME type for export format."""
         mimetypes = {
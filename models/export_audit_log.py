@@ -183,7 +183,7 @@ class HrEmployeeExportAuditLog(models.Model):
         try:
             return self.sudo().create(vals)
         except Exception as e:
-            _logger.error(f"Failed to create audit log: {e}")
+            _logger.error("Failed to create audit log: %s", e)
             return self.browse()
     
     @api.model
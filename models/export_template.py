@@ -388,7 +388,7 @@ class HrEmployeeExportTemplate(models.Model):
             try:
                 return json.loads(self.field_mapping)
             except (json.JSONDecodeError, TypeError):
-                _logger.warning(f"Invalid JSON in field_mapping for template {self.code}")
+                _logger.warning("Invalid JSON in field_mapping for template %s", self.code)
                 return {}
         return {}
 
@@ -474,7 +474,7 @@ class HrEmployeeExportTemplate(models.Model):
                 return str(value) if value else None
                 
         except Exception as e:
-            _logger.warning(f"Error getting field value for {field_path}: {e}")
+            _logger.warning("Error getting field value for %s: %s", field_path, e)
             return None
 
     def toggle_active(self):
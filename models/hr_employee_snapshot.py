@@ -234,7 +234,7 @@ class HrEmployeeSnapshot(models.Model):
             year = year or last_month.year
             month = month or last_month.month
         
-        _logger.info(f"Generating employee snapshot for {month}/{year}")
+        _logger.info("Generating employee snapshot for %s/%s", month, year)
         
         # Check existing snapshots
         existing = self.search([
@@ -243,11 +243,11 @@ class HrEmployeeSnapshot(models.Model):
         ])
         
         if existing and not force:
-            _logger.warning(f"Snapshot for {month}/{year} already exists. Use force=True to regenerate.")
+            _logger.warning("Snapshot for %s/%s already exists. Use force=True to regenerate.", month, year)
             return 0
         
         if existing and force:
-            _logger.info(f"Force mode: deleting {len(existing)} existing snapshots")
+            _logger.info("Force mode: deleting %s existing snapshots", len(existing))
             existing.sudo().unlink()
         
         # Get all employees (active and inactive for historical accuracy)
@@ -268,7 +268,7 @@ class HrEmployeeSnapshot(models.Model):
             unit_id = emp.department_id.id if emp.department_id else False
             
             if not unit_id:
-                _logger.warning(f"Employee {emp.name} has no department, skipping snapshot")
+                _logger.warning("Employee %s has no department, skipping snapshot", emp.name)
                 continue
             
             snapshot_data = {
@@ -288,7 +288,7 @@ class HrEmployeeSnapshot(models.Model):
         # Bulk create snapshots
         if snapshots_to_create:
             created = self.sudo().create(snapshots_to_create)
-            _logger.info(f"Created {len(created)} employee snapshots for {month}/{year}")
+            _logger.info("Created %s employee snapshots for %s/%s", len(created), month, year)
             return len(created)
         
         return 0
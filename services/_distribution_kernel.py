@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Kernel pengelompokan distribusi (usia, masa kerja) berbasis numba.
+
+Dipakai EmployeeExportGraphPdf untuk jumlah karyawan yang besar. numba
+bersifat opsional: jika tidak terinstall, NUMBA_AVAILABLE bernilai False
+dan service tetap memakai jalur numpy (searchsorted/bincount).
+"""
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    _logger.info("numba not installed. Graph distributions will be computed with numpy.")
+
+
+if NUMBA_AVAILABLE:
+    # Signature eksplisit: kernel di-compile saat import (dan di-cache ke
+    # disk), bukan saat export pertama
+    @njit('int64[:](float64[:], float64[:])', cache=True)
+    def bucket_counts(values, edges):
+        """
+        Hitung jumlah nilai per kelompok dalam satu loop.
+
+        Args:
+            values: Array nilai (usia/masa kerja dalam tahun)
+            edges: Array batas bawah kelompok ke-2 dst., urut naik
+
+        Returns:
+            Array jumlah per kelompok (len(edges) + 1 elemen)
+        """
+        n_edges = edges.shape[0]
+        out = np.zeros(n_edges + 1, dtype=np.int64)
+        for i in range(values.shape[0]):
+            value = values[i]
+            group = 0
+            while group < n_edges and value >= edges[group]:
+                group += 1
+            out[group] += 1
+        return out
+else:
+    bucket_counts = None
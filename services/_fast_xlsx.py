@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+Writer XLSX minimal berbasis streaming untuk export data besar.
+
+Satu worksheet ditulis langsung sebagai XML ke dalam arsip ZIP, baris per
+baris, tanpa menyimpan cell di memory. Yang didukung hanya kebutuhan export
+tabular sederhana: string (inline), angka, boolean, tanggal, lebar kolom,
+header tebal, dan freeze baris header. Untuk merge, multi sheet, atau
+format yang lebih kaya gunakan xlsxwriter.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+import math
+import numbers
+import re
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+# Index style pada cellXfs di styles.xml
+STYLE_DEFAULT = 0
+STYLE_HEADER = 1
+STYLE_DATE = 2
+STYLE_NUMBER = 3
+
+# Tanggal serial Excel dihitung dari 1899-12-30
+_EPOCH_DATE = date(1899, 12, 30)
+_EPOCH_DATETIME = datetime(1899, 12, 30)
+
+# Karakter kontrol yang tidak valid di XML 1.0
+_ILLEGAL_XML_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_SPREADSHEET_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+_CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<Relationships xmlns="{_PKG_REL_NS}">'
+    f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<Relationships xmlns="{_PKG_REL_NS}">'
+    f'<Relationship Id="rId1" Type="{_REL_NS}/worksheet" Target="worksheets/sheet1.xml"/>'
+    f'<Relationship Id="rId2" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+_STYLES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<styleSheet xmlns="{_SPREADSHEET_NS}">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="dd\\-mm\\-yyyy"/></numFmts>'
+    '<fonts count="2">'
+    '<font><sz val="11"/><name val="Calibri"/><family val="2"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/><family val="2"/></font>'
+    '</fonts>'
+    '<fills count="2">'
+    '<fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill>'
+    '</fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="3" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def _column_letter(col):
+    """
+    Konversi index kolom (0-based) ke huruf kolom Excel.
+    
+    Args:
+        col (int): Index kolom, mis. 0 untuk 'A', 27 untuk 'AB'
+    
+    Returns:
+        str: Huruf kolom
+    """
+    letters = ''
+    col += 1
+    while col:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _number_text(value):
+    """
+    Teks elemen <v> untuk cell angka.
+    
+    Args:
+        value: Angka (int, float, Decimal, tipe numpy)
+    
+    Returns:
+        str: Representasi angka yang valid di XLSX
+    
+    Raises:
+        TypeError: Nilai bukan angka
+        ValueError: Angka NaN atau tak hingga
+    """
+    if isinstance(value, numbers.Integral):
+        return str(int(value))
+    if isinstance(value, (numbers.Real, Decimal)):
+        number = float(value)
+        if not math.isfinite(number):
+            raise ValueError(f"Cannot write non-finite number to XLSX: {value!r}")
+        return repr(number)
+    raise TypeError(f"Unsupported XLSX cell value type: {type(value).__name__}")
+
+
+class StreamingWorkbook:
+    """
+    Workbook XLSX satu sheet yang ditulis streaming ke file-like output.
+    
+    Urutan pemakaian: set_column_widths()/freeze_rows() (opsional), lalu
+    write_row() untuk setiap baris dari atas ke bawah, lalu close().
+    """
+    
+    def __init__(self, output, sheet_name='Sheet1', compresslevel=1):
+        """
+        Args:
+            output: File-like writable tujuan arsip XLSX
+            sheet_name (str): Nama worksheet
+            compresslevel (int): Level kompresi deflate (1 = tercepat)
+        """
+        self._zip = zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED,
+                                    compresslevel=compresslevel)
+        self._write_package_parts(sheet_name)
+        self._widths = ()
+        self._freeze_rows = 0
+        self._stream = None
+        self._row = 0
+        self._refs = []
+    
+    def set_column_widths(self, widths):
+        """Set lebar kolom; harus dipanggil sebelum write_row pertama."""
+        self._widths = tuple(widths)
+    
+    def freeze_rows(self, rows):
+        """Freeze sejumlah baris teratas; harus sebelum write_row pertama."""
+        self._freeze_rows = rows
+    
+    def write_row(self, values, styles=None):
+        """
+        Tulis satu baris berikutnya.
+        
+        Nilai None/False/'' dilewati (cell kosong, seperti nilai kosong
+        Odoo); True ditulis sebagai cell boolean. Angka (termasuk Decimal dan
+        tipe numpy) dikonversi lewat int()/float(). Tanggal ditulis sebagai
+        serial Excel; jika style kolomnya default, otomatis memakai
+        STYLE_DATE.
+        
+        Args:
+            values: Sequence nilai cell (str, bool, int, float, Decimal,
+                date, datetime)
+            styles: Sequence index style per kolom (optional)
+            
+        Raises:
+            TypeError: Tipe nilai tidak didukung
+            ValueError: Angka NaN atau tak hingga
+        """
+        if self._stream is None:
+            self._start_sheet()
+        
+        self._row += 1
+        row_num = str(self._row)
+        refs = self._refs
+        while len(refs) < len(values):
+            refs.append(_column_letter(len(refs)))
+        
+        parts = [f'<row r="{row_num}">']
+        for col, value in enumerate(values):
+            if value is None or value is False or value == '':
+                continue
+            style = styles[col] if styles else STYLE_DEFAULT
+            ref = refs[col] + row_num
+            
+            if isinstance(value, str):
+                text = escape(_ILLEGAL_XML_RE.sub('', value))
+                style_attr = f' s="{style}"' if style else ''
+                parts.append(
+                    f'<c r="{ref}"{style_attr} t="inlineStr">'
+                    f'<is><t xml:space="preserve">{text}</t></is></c>'
+                )
+                continue
+            
+            if isinstance(value, bool):
+                style_attr = f' s="{style}"' if style else ''
+                parts.append(f'<c r="{ref}"{style_attr} t="b"><v>{int(value)}</v></c>')
+                continue
+            
+            if isinstance(value, datetime):
+                value = (value - _EPOCH_DATETIME).total_seconds() / 86400
+                style = style or STYLE_DATE
+            elif isinstance(value, date):
+                value = (value - _EPOCH_DATE).days
+                style = style or STYLE_DATE
+            
+            style_attr = f' s="{style}"' if style else ''
+            parts.append(f'<c r="{ref}"{style_attr}><v>{_number_text(value)}</v></c>')
+        parts.append('</row>')
+        
+        self._stream.write(''.join(parts).encode('utf-8'))
+    
+    def _start_sheet(self):
+        """Buka entry worksheet dan tulis bagian sebelum sheetData."""
+        self._stream = self._zip.open('xl/worksheets/sheet1.xml', 'w')
+        
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n',
+            f'<worksheet xmlns="{_SPREADSHEET_NS}" xmlns:r="{_REL_NS}">',
+        ]
+        if self._freeze_rows:
+            top_left = f'A{self._freeze_rows + 1}'
+            parts.append(
+                '<sheetViews><sheetView workbookViewId="0">'
+                f'<pane ySplit="{self._freeze_rows}" topLeftCell="{top_left}" '
+                'activePane="bottomLeft" state="frozen"/>'
+                f'<selection pane="bottomLeft" activeCell="{top_left}" sqref="{top_left}"/>'
+                '</sheetView></sheetViews>'
+            )
+        if self._widths:
+            # Kolom berurutan dengan lebar sama digabung dalam satu <col>
+            widths = self._widths
+            parts.append('<cols>')
+            start = 0
+            for col in range(1, len(widths) + 1):
+                if col == len(widths) or widths[col] != widths[start]:
+                    parts.append(
+                        f'<col min="{start + 1}" max="{col}" '
+                        f'width="{widths[start]}" customWidth="1"/>'
+                    )
+                    start = col
+            parts.append('</cols>')
+        parts.append('<sheetData>')
+        
+        self._stream.write(''.join(parts).encode('utf-8'))
+    
+    def _write_package_parts(self, sheet_name):
+        """Tulis bagian statis arsip (content types, relasi, workbook, style)."""
+        workbook_xml = (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<workbook xmlns="{_SPREADSHEET_NS}" xmlns:r="{_REL_NS}">'
+            f'<sheets><sheet name={quoteattr(sheet_name)} sheetId="1" r:id="rId1"/></sheets>'
+            '</workbook>'
+        )
+        
+        writestr = self._zip.writestr
+        writestr('[Content_Types].xml', _CONTENT_TYPES_XML)
+        writestr('_rels/.rels', _ROOT_RELS_XML)
+        writestr('xl/workbook.xml', workbook_xml)
+        writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS_XML)
+        writestr('xl/styles.xml', _STYLES_XML)
+    
+    def close(self):
+        """Tutup worksheet dan arsip."""
+        if self._stream is None:
+            self._start_sheet()
+        self._stream.write(b'</sheetData></worksheet>')
+        self._stream.close()
+        self._zip.close()
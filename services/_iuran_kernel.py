@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Kernel perhitungan iuran BPJS Ketenagakerjaan berbasis numba.
+
+Dipakai EmployeeExportBpjsTk untuk batch karyawan yang besar. numba
+bersifat opsional: jika tidak terinstall, NUMBA_AVAILABLE bernilai False
+dan service tetap memakai jalur numpy.
+"""
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    _logger.info("numba not installed. Iuran BPJS TK will be computed with numpy.")
+
+# Urutan tarif pada argumen ``rates`` compute_iuran
+RATE_KEYS = ('jht_tk', 'jht_company', 'jkk', 'jkm', 'jp_tk', 'jp_company')
+
+
+if NUMBA_AVAILABLE:
+    # Signature eksplisit: kernel di-compile saat import (dan di-cache ke
+    # disk), bukan saat export pertama
+    @njit('float64[:, :](float64[:], float64[:], float64)', cache=True)
+    def compute_iuran(upah, rates, jp_max_wage):
+        """
+        Hitung komponen iuran untuk seluruh karyawan.
+        
+        Args:
+            upah: Array upah per karyawan
+            rates: Array tarif sesuai urutan RATE_KEYS
+            jp_max_wage: Batas upah untuk perhitungan JP
+        
+        Returns:
+            Array (n, 12) dengan kolom sesuai urutan IURAN_COLUMNS[4:]
+        """
+        n = upah.shape[0]
+        out = np.empty((n, 12))
+        for i in range(n):
+            wage = upah[i]
+            jp_wage = min(wage, jp_max_wage)
+            
+            jht_tk = wage * rates[0]
+            jht_company = wage * rates[1]
+            jkk = wage * rates[2]
+            jkm = wage * rates[3]
+            jp_tk = jp_wage * rates[4]
+            jp_company = jp_wage * rates[5]
+            total_tk = jht_tk + jp_tk
+            total_company = jht_company + jkk + jkm + jp_company
+            
+            out[i, 0] = wage
+            out[i, 1] = jht_tk
+            out[i, 2] = jht_company
+            out[i, 3] = jht_tk + jht_company
+            out[i, 4] = jkk
+            out[i, 5] = jkm
+            out[i, 6] = jp_tk
+            out[i, 7] = jp_company
+            out[i, 8] = jp_tk + jp_company
+            out[i, 9] = total_tk
+            out[i, 10] = total_company
+            out[i, 11] = total_tk + total_company
+        return out
+else:
+    compute_iuran = None
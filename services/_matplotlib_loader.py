@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+Import matplotlib secara lazy untuk service render grafik.
+
+Import matplotlib/pyplot lambat dan memuat banyak module, sehingga tidak
+dilakukan saat worker Odoo memuat module ini; service memanggil
+load_matplotlib() saat grafik pertama akan di-render. Backend di-set ke Agg
+(non-interaktif).
+"""
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# (matplotlib, matplotlib.pyplot) setelah import berhasil, False jika
+# matplotlib tidak terinstall, None jika belum dicoba
+_MATPLOTLIB = None
+
+
+def load_matplotlib():
+    """
+    Import matplotlib (backend Agg) sekali per proses.
+
+    Returns:
+        tuple: (matplotlib, matplotlib.pyplot), atau None jika matplotlib
+            tidak terinstall
+    """
+    global _MATPLOTLIB
+
+    if _MATPLOTLIB is None:
+        try:
+            import matplotlib
+            matplotlib.use('Agg')  # Use non-interactive backend
+            import matplotlib.pyplot as plt
+            _MATPLOTLIB = (matplotlib, plt)
+        except ImportError:
+            _MATPLOTLIB = False
+            _logger.warning("matplotlib not installed. Graph rendering will use fallback.")
+    return _MATPLOTLIB or None
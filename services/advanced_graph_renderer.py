@@ -18,20 +18,37 @@ from datetime import datetime, date
 from odoo.exceptions import UserError
 from odoo import _
 
+from ._matplotlib_loader import load_matplotlib
+
 _logger = logging.getLogger(__name__)
 
-# Check matplotlib availability
 try:
-    import matplotlib
-    matplotlib.use('Agg')  # Non-interactive backend
-    import matplotlib.pyplot as plt
-    import matplotlib.patches as mpatches
-    from matplotlib.figure import Figure
     import numpy as np
-    HAS_MATPLOTLIB = True
+    NUMPY_AVAILABLE = True
 except ImportError:
-    HAS_MATPLOTLIB = False
-    _logger.warning("matplotlib not installed. Install with: pip install matplotlib numpy")
+    NUMPY_AVAILABLE = False
+
+# matplotlib di-import saat renderer pertama dibuat (lihat _load_matplotlib),
+# bukan saat module dimuat worker Odoo
+plt = None
+HAS_MATPLOTLIB = False
+
+
+def _load_matplotlib():
+    """
+    Import matplotlib jika belum; rendering juga memerlukan numpy.
+    
+    Returns:
+        bool: True jika matplotlib dan numpy tersedia
+    """
+    global plt, HAS_MATPLOTLIB
+    
+    if not HAS_MATPLOTLIB and NUMPY_AVAILABLE:
+        loaded = load_matplotlib()
+        if loaded:
+            plt = loaded[1]
+            HAS_MATPLOTLIB = True
+    return HAS_MATPLOTLIB
 
 
 class AdvancedGraphRenderer:
@@ -63,7 +80,7 @@ class AdvancedGraphRenderer:
         self.dpi = self.DEFAULT_DPI
         self.figsize = self.DEFAULT_FIGSIZE
         
-        if not HAS_MATPLOTLIB:
+        if not _load_matplotlib():
             _logger.warning("Matplotlib not available. Graph rendering will be limited.")
     
     def set_dpi(self, dpi):
@@ -435,7 +452,7 @@ class AdvancedGraphRenderer:
                     'base64': base64.b64encode(content).decode('utf-8'),
                 })
             except Exception as e:
-                _logger.error(f"Error rendering chart {graph_def.get('code')}: {e}")
+                _logger.error("Error rendering chart %s: %s", graph_def.get('code'), e)
                 # Add error placeholder
                 results.append({
                     'content': None,
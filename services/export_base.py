@@ -14,6 +14,14 @@ import logging
 
 _logger = logging.getLogger(__name__)
 
+# WeasyPrint: render PDF di dalam proses; OSError jika library pango/cairo
+# tidak terpasang. Tanpa WeasyPrint, service PDF memakai wkhtmltopdf.
+try:
+    from weasyprint import HTML as WeasyHTML, CSS as WeasyCSS
+    HAS_WEASYPRINT = True
+except (ImportError, OSError):
+    HAS_WEASYPRINT = False
+
 # Daftar field sensitif yang memerlukan akses khusus
 SENSITIVE_FIELDS = [
     'x_nik', 'x_kk_number', 'identification_id', 'passport_id',
@@ -160,7 +168,7 @@ class EmployeeExportBase:
                 **kwargs
             })
         except Exception as e:
-            _logger.error(f"Failed to create audit log: {e}")
+            _logger.error("Failed to create audit log: %s", e)
     
     def set_date_format(self, date_format):
         """Set format tanggal untuk export."""
@@ -172,18 +180,19 @@ class EmployeeExportBase:
         self.empty_value = empty_value
         return self
     
-    def generate_filename(self, prefix='export', extension='xlsx'):
+    def generate_filename(self, prefix='export', extension='xlsx', timestamp=None):
         """
         Generate nama file dengan timestamp.
         
         Args:
             prefix (str): Prefix nama file
             extension (str): Extension file
+            timestamp (datetime): Waktu export (default: sekarang)
             
         Returns:
             str: Nama file dengan format prefix_YYYYMMDD_HHMMSS.extension
         """
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = (timestamp or datetime.now()).strftime('%Y%m%d_%H%M%S')
         return f"{prefix}_{timestamp}.{extension}"
     
     def format_value(self, value, field_type=None):
@@ -260,7 +269,7 @@ class EmployeeExportBase:
             return str(value)
             
         except Exception as e:
-            _logger.warning(f"Error formatting service_length '{value}': {e}")
+            _logger.warning("Error formatting service_length '%s': %s", value, e)
             return str(value) if value else self.empty_value
     
     def get_field_value(self, record, field_path):
@@ -294,7 +303,7 @@ class EmployeeExportBase:
             return value
             
         except Exception as e:
-            _logger.warning(f"Error getting field value for {field_path}: {e}")
+            _logger.warning("Error getting field value for %s: %s", field_path, e)
             return None
     
     def get_formatted_field_value(self, record, field_path):
@@ -357,7 +366,7 @@ class EmployeeExportBase:
             
             return str(value)
         except Exception as e:
-            _logger.warning(f"Error getting selection label for {field_name}: {e}")
+            _logger.warning("Error getting selection label for %s: %s", field_name, e)
             return self.empty_value
     
     def validate_employees(self, employees):
@@ -403,6 +412,35 @@ class EmployeeExportBase:
             'exported_by': self.env.user.name,
             'company': self.env.company.name,
         }
+    
+    # ===== PDF Methods =====
+    
+    def _html_to_pdf_weasyprint(self, html_content, orientation):
+        """
+        Convert HTML to PDF using WeasyPrint.
+        
+        Ukuran halaman dan margin disamakan dengan argumen wkhtmltopdf.
+        Pemanggil memeriksa HAS_WEASYPRINT dan fallback ke wkhtmltopdf jika
+        method ini gagal.
+        
+        Args:
+            html_content (str): HTML content
+            orientation (str): 'landscape' atau 'portrait'
+            
+        Returns:
+            bytes: PDF content
+            
+        Raises:
+            ValueError: Jika WeasyPrint menghasilkan PDF kosong
+        """
+        page_css = WeasyCSS(string=f'@page {{ size: A4 {orientation}; margin: 10mm; }}')
+        
+        pdf_content = WeasyHTML(string=html_content).write_pdf(stylesheets=[page_css])
+        
+        if not pdf_content:
+            raise ValueError("WeasyPrint produced empty PDF")
+        
+        return pdf_content
 
 
 # Field mapping untuk berbagai kategori data
@@ -12,9 +12,10 @@ Format export mengikuti template resmi dari BPJS Kesehatan untuk:
 - Laporan data peserta aktif
 """
 
-from io import BytesIO
 from datetime import datetime, date
 import logging
+import re
+import tempfile
 
 from .export_base import EmployeeExportBase
 
@@ -27,6 +28,18 @@ except ImportError:
     XLSXWRITER_AVAILABLE = False
     _logger.warning("xlsxwriter not installed. Excel export will not be available.")
 
+# Pola komponen alamat di dalam teks alamat_ktp, mis.
+# "Jl. Foo RT 003/RW 005 Kel. Bar, Kota Qux 12345". Di-compile sekali
+# di level module agar tidak di-compile ulang per karyawan.
+_RT_RE = re.compile(r'\bRT[\s.:]*0*(\d{1,3})', re.I)
+_RW_RE = re.compile(r'\bRW[\s.:]*0*(\d{1,3})', re.I)
+_POS_RE = re.compile(r'\b(\d{5})\b')
+_ALAMAT_PATTERNS = (
+    ('rt', _RT_RE),
+    ('rw', _RW_RE),
+    ('kode_pos', _POS_RE),
+)
+
 
 class EmployeeExportBpjsKes(EmployeeExportBase):
     """
@@ -92,9 +105,92 @@ class EmployeeExportBpjsKes(EmployeeExportBase):
         'cerai': 'C',
     }
     
+    # Suffix nama file per tipe export
+    TYPE_SUFFIX = {
+        'active': 'peserta_aktif',
+        'new': 'pendaftaran_baru',
+        'update': 'perubahan_data',
+        'inactive': 'penonaktifan',
+    }
+    
+    # Judul laporan per tipe export
+    TITLES = {
+        'active': 'LAPORAN DATA PESERTA BPJS KESEHATAN AKTIF',
+        'new': 'DATA PENDAFTARAN PESERTA BPJS KESEHATAN BARU',
+        'update': 'DATA PERUBAHAN PESERTA BPJS KESEHATAN',
+        'inactive': 'DATA PENONAKTIFAN PESERTA BPJS KESEHATAN',
+    }
+    
+    # Field hr.employee yang dibaca sekaligus via read() di awal export
+    EMPLOYEE_FIELDS = (
+        'nik', 'name', 'place_of_birth', 'birthday', 'gender', 'status_kawin',
+        'alamat_ktp', 'rt', 'rw', 'kelurahan', 'kecamatan', 'kota', 'provinsi',
+        'kode_pos', 'mobile_phone', 'work_email',
+        'spouse_name', 'spouse_nik', 'spouse_birthday',
+    )
+    
+    # Field tanggal dari EMPLOYEE_FIELDS yang ditulis dengan write_datetime
+    DATE_FIELDS = ('birthday', 'spouse_birthday')
+    
+    # Jumlah karyawan yang dibaca per read() saat menulis baris
+    READ_CHUNK_SIZE = 1000
+    
+    # Batas ukuran output yang disimpan di RAM sebelum di-spill ke disk
+    SPOOL_MAX_SIZE = 16 * 1024 * 1024
+    
+    # Komponen alamat yang diambil dari field terpisah jika ada di model
+    ALAMAT_FIELDS = ('rt', 'rw', 'kelurahan', 'kecamatan', 'kota', 'provinsi', 'kode_pos')
+    
+    # Spesifikasi format Excel; objek format dibuat per workbook di _setup_formats
+    _FMT_SPECS = {
+        'header': {
+            'bold': True,
+            'bg_color': '#00A65A',  # BPJS Green
+            'font_color': 'white',
+            'border': 1,
+            'align': 'center',
+            'valign': 'vcenter',
+            'text_wrap': True,
+        },
+        'cell': {
+            'border': 1,
+            'valign': 'vcenter',
+        },
+        'cell_center': {
+            'border': 1,
+            'align': 'center',
+            'valign': 'vcenter',
+        },
+        'date': {
+            'border': 1,
+            'valign': 'vcenter',
+            'num_format': 'dd-mm-yyyy',
+        },
+        'number': {
+            'border': 1,
+            'valign': 'vcenter',
+            'num_format': '#,##0',
+        },
+        'title': {
+            'bold': True,
+            'font_size': 14,
+            'align': 'center',
+            'valign': 'vcenter',
+        },
+        'info': {
+            'italic': True,
+            'font_color': '#666666',
+        },
+        'warning': {
+            'bold': True,
+            'font_color': '#FF0000',
+        },
+    }
+    
     def __init__(self, env):
         """Initialize BPJS Kesehatan export service."""
         super().__init__(env)
+        self._alamat_fields = ()
         
         if not XLSXWRITER_AVAILABLE:
             raise ImportError(
@@ -102,7 +198,7 @@ class EmployeeExportBpjsKes(EmployeeExportBase):
                 "Silakan install dengan: pip install xlsxwriter"
             )
     
-    def export(self, employees, export_type='active', include_family=True):
+    def export(self, employees, export_type='active', include_family=True, sink=None):
         """
         Export data BPJS Kesehatan.
         
@@ -110,91 +206,203 @@ class EmployeeExportBpjsKes(EmployeeExportBase):
             employees: hr.employee recordset
             export_type (str): Tipe export ('active', 'new', 'update', 'inactive')
             include_family (bool): Include data keluarga
+            sink: File-like writable (optional). Jika diberikan, workbook
+                ditulis langsung ke sink dan bytes tidak dikembalikan.
             
         Returns:
-            tuple: (bytes, filename)
+            tuple: (bytes, filename), atau (None, filename) jika sink diberikan
         """
         self.validate_employees(employees)
         
-        output = BytesIO()
-        workbook = xlsxwriter.Workbook(output, {'in_memory': True})
+        # Generate filename
+        suffix = self.TYPE_SUFFIX.get(export_type, 'data')
+        filename = self.generate_filename(f'bpjs_kesehatan_{suffix}', 'xlsx')
+        
+        if sink is not None:
+            self._write_workbook(sink, employees, export_type, include_family)
+            return None, filename
+        
+        # File kecil tetap di RAM, file besar otomatis dipindah ke disk
+        with tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_SIZE) as output:
+            self._write_workbook(output, employees, export_type, include_family)
+            output.seek(0)
+            return output.read(), filename
+    
+    def _write_workbook(self, output, employees, export_type, include_family):
+        """
+        Tulis seluruh sheet BPJS Kesehatan ke file-like output.
+        
+        Args:
+            output: File-like writable tujuan workbook
+            employees: hr.employee recordset
+            export_type (str): Tipe export
+            include_family (bool): Include data keluarga
+        """
+        # Satu timestamp untuk seluruh sheet agar konsisten
+        export_ts = datetime.now()
+        total_count = len(employees)
+        
+        # constant_memory: baris di-flush ke temp file begitu baris berikutnya
+        # ditulis, sehingga memory tidak tumbuh linear dengan jumlah karyawan.
+        # Konsekuensinya semua sheet harus ditulis berurutan dari atas ke bawah.
+        workbook = xlsxwriter.Workbook(output, {
+            'constant_memory': True,
+            'in_memory': False,
+            'tmpdir': tempfile.gettempdir(),
+        })
         
         # Setup formats
         formats = self._setup_formats(workbook)
         
+        # Schema tidak berubah selama export, cukup dicek sekali
+        self._alamat_fields = tuple(
+            f for f in self.ALAMAT_FIELDS if f in employees._fields
+        )
+        
         # Create sheets
-        self._write_main_sheet(workbook, formats, employees, export_type)
+        faskes_by_emp = self._write_main_sheet(workbook, formats, employees, export_type,
+                                               export_ts, total_count,
+                                               collect_family=include_family)
         
-        if include_family:
-            self._write_family_sheet(workbook, formats, employees)
+        if include_family and faskes_by_emp:
+            # Sheet keluarga hanya untuk karyawan yang punya tanggungan;
+            # dilewati sama sekali jika tidak ada satupun
+            family_employees = employees.filtered(lambda e: e.id in faskes_by_emp)
+            self._write_family_sheet(workbook, formats, family_employees, faskes_by_emp)
         
         # Info sheet
-        self._write_info_sheet(workbook, formats, employees, export_type)
+        self._write_info_sheet(workbook, formats, export_type, export_ts, total_count)
         
         workbook.close()
-        output.seek(0)
+    
+    def _read_employee_data(self, employees):
+        """
+        Baca semua field karyawan yang dibutuhkan dalam satu query.
         
-        # Generate filename
-        type_suffix = {
-            'active': 'peserta_aktif',
-            'new': 'pendaftaran_baru',
-            'update': 'perubahan_data',
-            'inactive': 'penonaktifan',
-        }
-        suffix = type_suffix.get(export_type, 'data')
-        filename = self.generate_filename(f'bpjs_kesehatan_{suffix}', 'xlsx')
+        Nilai ``gender`` dan ``status_kawin`` dinormalisasi ke lowercase di
+        sini, sehingga lookup ke GENDER_MAP/MARITAL_MAP per baris tidak perlu
+        memanggil ``lower()`` lagi. Field tanggal yang datang sebagai string
+        ISO dikonversi ke ``date`` sekali di sini agar bisa ditulis dengan
+        ``write_datetime``. Field many2one (mis. ``kota`` atau ``provinsi``
+        dari module lain) dibaca ``read()`` sebagai ``(id, name)`` dan diganti
+        dengan name-nya, sama seperti get_formatted_field_value.
         
-        return output.getvalue(), filename
+        Args:
+            employees: hr.employee recordset
+            
+        Returns:
+            dict: {employee_id: dict hasil read()}
+        """
+        field_names = [f for f in self.EMPLOYEE_FIELDS if f in employees._fields]
+        many2one_fields = [
+            f for f in field_names if employees._fields[f].type == 'many2one'
+        ]
+        emp_data = {}
+        for vals in employees.read(field_names):
+            for field_name in many2one_fields:
+                vals[field_name] = vals[field_name] and vals[field_name][1]
+            vals['gender'] = (vals.get('gender') or '').lower()
+            vals['status_kawin'] = (vals.get('status_kawin') or '').lower()
+            for field_name in self.DATE_FIELDS:
+                if isinstance(vals.get(field_name), str):
+                    vals[field_name] = self._to_date(vals[field_name])
+            emp_data[vals['id']] = vals
+        return emp_data
     
-    def _setup_formats(self, workbook):
-        """Setup Excel formats."""
+    @staticmethod
+    def _to_date(value):
+        """
+        Konversi string tanggal ISO ke date.
+        
+        Args:
+            value (str): String tanggal, mis. '1990-01-31'
+            
+        Returns:
+            date: Hasil konversi, atau None jika format tidak valid
+        """
+        try:
+            return date.fromisoformat(value[:10])
+        except ValueError:
+            return None
+    
+    def _fast_val(self, record, field_name):
+        """
+        Ambil nilai field skalar langsung dari record.
+        
+        Jalur cepat pengganti get_formatted_field_value untuk field non-relasi
+        di hot loop: tanpa parsing dot-notation maupun pengecekan recordset.
+        Nilai non-string tetap diformat via format_value.
+        
+        Args:
+            record: Odoo record
+            field_name (str): Nama field (tanpa dot notation)
+            
+        Returns:
+            str: Nilai field
+        """
+        value = getattr(record, field_name, None)
+        if isinstance(value, str):
+            return value
+        return self.format_value(value)
+    
+    def _iter_employee_rows(self, employees, include_bpjs=True):
+        """
+        Iterasi data karyawan per chunk READ_CHUNK_SIZE.
+        
+        Data karyawan dan BPJS Kesehatan dibaca per chunk, sehingga yang
+        tersimpan di memory hanya data satu chunk, bukan seluruh karyawan.
+        
+        Args:
+            employees: hr.employee recordset
+            include_bpjs (bool): Ikut baca record BPJS Kesehatan
+            
+        Yields:
+            tuple: (employee record, dict hasil read(), hr.bpjs record atau None)
+        """
+        chunk_size = self.READ_CHUNK_SIZE
+        for start in range(0, len(employees), chunk_size):
+            chunk = employees[start:start + chunk_size]
+            emp_data = self._read_employee_data(chunk)
+            bpjs_kes_by_emp = self._get_bpjs_kes_by_employee(chunk) if include_bpjs else {}
+            for emp in chunk:
+                yield emp, emp_data[emp.id], bpjs_kes_by_emp.get(emp.id)
+    
+    def _get_bpjs_kes_by_employee(self, employees):
+        """
+        Index record BPJS Kesehatan per karyawan.
+        
+        Semua ``bpjs_ids`` di-prefetch dalam satu batch, lalu dicari sekali
+        per karyawan sehingga writer cukup melakukan lookup dict.
+        
+        Args:
+            employees: hr.employee recordset
+            
+        Returns:
+            dict: {employee_id: hr.bpjs record atau None}
+        """
+        if 'bpjs_ids' not in employees._fields:
+            return {}
+        
+        employees.mapped('bpjs_ids')
         return {
-            'header': workbook.add_format({
-                'bold': True,
-                'bg_color': '#00A65A',  # BPJS Green
-                'font_color': 'white',
-                'border': 1,
-                'align': 'center',
-                'valign': 'vcenter',
-                'text_wrap': True,
-            }),
-            'cell': workbook.add_format({
-                'border': 1,
-                'valign': 'vcenter',
-            }),
-            'cell_center': workbook.add_format({
-                'border': 1,
-                'align': 'center',
-                'valign': 'vcenter',
-            }),
-            'date': workbook.add_format({
-                'border': 1,
-                'valign': 'vcenter',
-                'num_format': 'dd-mm-yyyy',
-            }),
-            'number': workbook.add_format({
-                'border': 1,
-                'valign': 'vcenter',
-                'num_format': '#,##0',
-            }),
-            'title': workbook.add_format({
-                'bold': True,
-                'font_size': 14,
-                'align': 'center',
-                'valign': 'vcenter',
-            }),
-            'info': workbook.add_format({
-                'italic': True,
-                'font_color': '#666666',
-            }),
-            'warning': workbook.add_format({
-                'bold': True,
-                'font_color': '#FF0000',
-            }),
+            emp.id: next((b for b in emp.bpjs_ids if b.bpjs_type == 'kesehatan'), None)
+            for emp in employees
         }
     
-    def _write_main_sheet(self, workbook, formats, employees, export_type):
-        """Write main data sheet."""
+    def _setup_formats(self, workbook):
+        """Setup Excel formats."""
+        return {k: workbook.add_format(spec) for k, spec in self._FMT_SPECS.items()}
+    
+    def _write_main_sheet(self, workbook, formats, employees, export_type,
+                          export_ts, total_count, collect_family=False):
+        """
+        Write main data sheet.
+        
+        Returns:
+            dict: {employee_id: (faskes_code, faskes_name, kelas)} untuk
+                karyawan yang memiliki pasangan atau anak (hanya diisi jika
+                ``collect_family``)
+        """
         sheet = workbook.add_worksheet('Data Peserta')
         
         # Write title
@@ -203,123 +411,167 @@ class EmployeeExportBpjsKes(EmployeeExportBase):
                          title, formats['title'])
         
         # Write export info
-        info = f"Tanggal Export: {datetime.now().strftime('%d-%m-%Y %H:%M')} | Total: {len(employees)} karyawan"
+        info = f"Tanggal Export: {export_ts.strftime('%d-%m-%Y %H:%M')} | Total: {total_count} karyawan"
         sheet.merge_range(1, 0, 1, len(self.HEADER_COLUMNS) - 1,
                          info, formats['info'])
         
         # Write headers
-        for col, header in enumerate(self.HEADER_COLUMNS):
-            sheet.write(3, col, header, formats['header'])
+        sheet.write_row(3, 0, self.HEADER_COLUMNS, formats['header'])
         
         # Freeze panes
         sheet.freeze_panes(4, 0)
         
+        # Auto-fit columns (sebelum data karena mode constant_memory)
+        self._auto_fit_columns(sheet, len(self.HEADER_COLUMNS))
+        
+        # Nilai yang sama untuk semua baris di-resolve sekali di luar loop
+        company = self.env.company
+        company_name = company.name or ''
+        company_code = getattr(company, 'bpjs_code', '') or ''
+        fmt_cell = formats['cell']
+        fmt_center = formats['cell_center']
+        fmt_date = formats['date']
+        
+        # Karyawan dengan tanggungan dicatat sambil jalan untuk sheet keluarga,
+        # berikut data faskes-nya agar tidak dibaca ulang di sana
+        faskes_by_emp = {}
+        has_children = collect_family and 'child_ids' in employees._fields
+        
         # Write data
         row = 4
-        for idx, emp in enumerate(employees, 1):
-            self._write_employee_row(sheet, formats, row, idx, emp)
+        rows = self._iter_employee_rows(employees)
+        for idx, (emp, row_data, bpjs_kes) in enumerate(rows, 1):
+            faskes = self._get_faskes_values(bpjs_kes)
+            self._write_employee_row(
+                sheet, row, idx, emp, row_data, bpjs_kes, faskes,
+                company_code, company_name, fmt_cell, fmt_center, fmt_date,
+            )
+            if collect_family and (row_data.get('spouse_name')
+                                   or (has_children and emp.child_ids)):
+                faskes_by_emp[emp.id] = faskes
             row += 1
         
-        # Auto-fit columns
-        self._auto_fit_columns(sheet, len(self.HEADER_COLUMNS))
+        return faskes_by_emp
+    
+    def _get_faskes_values(self, bpjs_kes):
+        """
+        Ambil data faskes dari record BPJS Kesehatan.
+        
+        Args:
+            bpjs_kes: hr.bpjs record (atau None)
+            
+        Returns:
+            tuple: (faskes_code, faskes_name, kelas)
+        """
+        if not bpjs_kes:
+            return ('', '', '')
+        fast_val = self._fast_val
+        return (
+            fast_val(bpjs_kes, 'faskes_code'),
+            fast_val(bpjs_kes, 'faskes_tk1'),
+            fast_val(bpjs_kes, 'kelas'),
+        )
     
     def _get_title(self, export_type):
         """Get report title based on export type."""
-        titles = {
-            'active': 'LAPORAN DATA PESERTA BPJS KESEHATAN AKTIF',
-            'new': 'DATA PENDAFTARAN PESERTA BPJS KESEHATAN BARU',
-            'update': 'DATA PERUBAHAN PESERTA BPJS KESEHATAN',
-            'inactive': 'DATA PENONAKTIFAN PESERTA BPJS KESEHATAN',
-        }
-        return titles.get(export_type, 'DATA PESERTA BPJS KESEHATAN')
-    
-    def _write_employee_row(self, sheet, formats, row, idx, emp):
-        """Write single employee row."""
-        # Get BPJS Kesehatan data
-        bpjs_kes = None
-        if hasattr(emp, 'bpjs_ids') and emp.bpjs_ids:
-            for bpjs in emp.bpjs_ids:
-                if self.get_field_value(bpjs, 'bpjs_type') == 'kesehatan':
-                    bpjs_kes = bpjs
-                    break
+        return self.TITLES.get(export_type, 'DATA PESERTA BPJS KESEHATAN')
+    
+    def _write_employee_row(self, sheet, row, idx, emp, row_data, bpjs_kes, faskes,
+                            company_code, company_name, fmt_cell, fmt_center, fmt_date):
+        """
+        Write single employee row.
         
-        # Parse alamat
-        alamat_data = self._parse_alamat(emp)
+        Kolom 1-27 ditulis sekaligus dengan ``write_row`` memakai format
+        ``fmt_cell``; kolom NO, tanggal, dan kolom rata tengah kemudian
+        ditimpa dengan writer bertipe. Nilai kosong ditulis sebagai cell
+        blank berformat.
+        
+        Args:
+            sheet: Worksheet tujuan
+            row (int): Index baris
+            idx (int): Nomor urut karyawan
+            emp: hr.employee record
+            row_data (dict): Hasil read() untuk karyawan ini
+            bpjs_kes: hr.bpjs record BPJS Kesehatan karyawan (atau None)
+            faskes (tuple): (faskes_code, faskes_name, kelas) dari _get_faskes_values
+            company_code (str): Kode BPJS perusahaan
+            company_name (str): Nama perusahaan
+            fmt_cell, fmt_center, fmt_date: Format cell yang sudah di-resolve
+        """
+        fmt = self.format_value
         
-        # Gender mapping
-        gender = self.get_field_value(emp, 'gender') or ''
-        gender_code = self.GENDER_MAP.get(gender.lower(), '')
+        # Parse alamat
+        alamat = self._parse_alamat(row_data)
         
-        # Marital status mapping
-        marital = self.get_field_value(emp, 'status_kawin') or ''
-        marital_code = self.MARITAL_MAP.get(marital.lower(), 'TK')
+        # Gender & marital status mapping (sudah lowercase dari read)
+        gender_code = self.GENDER_MAP.get(row_data['gender'], '')
+        marital_code = self.MARITAL_MAP.get(row_data['status_kawin'], 'TK')
         
         # Birthday
-        birthday = self.get_field_value(emp, 'birthday')
+        birthday = row_data.get('birthday')
         
         # BPJS data
-        bpjs_number = self.get_formatted_field_value(bpjs_kes, 'number') if bpjs_kes else ''
-        kelas = self.get_formatted_field_value(bpjs_kes, 'kelas') if bpjs_kes else ''
-        faskes_code = self.get_formatted_field_value(bpjs_kes, 'faskes_code') if bpjs_kes else ''
-        faskes_name = self.get_formatted_field_value(bpjs_kes, 'faskes_tk1') if bpjs_kes else ''
-        tgl_aktif = self.get_field_value(bpjs_kes, 'date_start') if bpjs_kes else None
-        
-        # Write row data
-        data = [
-            idx,                                                    # NO
-            self.get_formatted_field_value(emp, 'nik'),            # NIK
-            self.get_formatted_field_value(emp, 'name'),           # NAMA LENGKAP
-            self.get_formatted_field_value(emp, 'place_of_birth'), # TEMPAT LAHIR
-            birthday,                                               # TANGGAL LAHIR
-            gender_code,                                            # JENIS KELAMIN
-            marital_code,                                           # STATUS PERKAWINAN
-            alamat_data.get('alamat', ''),                         # ALAMAT
-            alamat_data.get('rt', ''),                             # RT
-            alamat_data.get('rw', ''),                             # RW
-            alamat_data.get('kelurahan', ''),                      # KELURAHAN
-            alamat_data.get('kecamatan', ''),                      # KECAMATAN
-            alamat_data.get('kota', ''),                           # KOTA/KAB
-            alamat_data.get('provinsi', ''),                       # PROVINSI
-            alamat_data.get('kode_pos', ''),                       # KODE POS
-            self.get_formatted_field_value(emp, 'mobile_phone'),   # NO HP
-            self.get_formatted_field_value(emp, 'work_email'),     # EMAIL
-            bpjs_number,                                            # NO KARTU BPJS
-            kelas,                                                  # KELAS RAWAT
-            faskes_code,                                            # KODE FASKES TK1
-            faskes_name,                                            # NAMA FASKES TK1
-            tgl_aktif,                                              # TGL MULAI AKTIF
-            'AKTIF',                                                # STATUS KEPESERTAAN
-            '',                                                     # GAJI (optional)
-            self.env.company.bpjs_code if hasattr(self.env.company, 'bpjs_code') else '',  # KODE PERUSAHAAN
-            self.env.company.name,                                  # NAMA PERUSAHAAN
-            'TK',                                                   # HUBUNGAN KELUARGA (TK=Tenaga Kerja)
-            '',                                                     # NIK PESERTA UTAMA
-        ]
-        
-        for col, value in enumerate(data):
-            if col == 4 and value:  # TANGGAL LAHIR
-                sheet.write(row, col, value, formats['date'])
-            elif col == 21 and value:  # TGL MULAI AKTIF
-                sheet.write(row, col, value, formats['date'])
-            elif col == 0:  # NO
-                sheet.write(row, col, value, formats['cell_center'])
-            elif col in [5, 6]:  # JENIS KELAMIN, STATUS
-                sheet.write(row, col, value, formats['cell_center'])
-            else:
-                sheet.write(row, col, value if value else '', formats['cell'])
-    
-    def _parse_alamat(self, emp):
+        bpjs_number = self._fast_val(bpjs_kes, 'number') if bpjs_kes else ''
+        faskes_code, faskes_name, kelas = faskes
+        tgl_aktif = getattr(bpjs_kes, 'date_start', None) if bpjs_kes else None
+        
+        sheet.write_row(row, 1, (
+            fmt(row_data.get('nik')),             # NIK
+            fmt(row_data.get('name')),            # NAMA LENGKAP
+            fmt(row_data.get('place_of_birth')),  # TEMPAT LAHIR
+            None,                                 # TANGGAL LAHIR (ditimpa)
+            None,                                 # JENIS KELAMIN (ditimpa)
+            None,                                 # STATUS PERKAWINAN (ditimpa)
+            alamat['alamat'],
+            alamat['rt'],
+            alamat['rw'],
+            alamat['kelurahan'],
+            alamat['kecamatan'],
+            alamat['kota'],
+            alamat['provinsi'],
+            alamat['kode_pos'],
+            fmt(row_data.get('mobile_phone')),    # NO HP
+            fmt(row_data.get('work_email')),      # EMAIL
+            bpjs_number,                          # NO KARTU BPJS
+            kelas,                                # KELAS RAWAT
+            faskes_code,                          # KODE FASKES TK1
+            faskes_name,                          # NAMA FASKES TK1
+            None,                                 # TGL MULAI AKTIF (ditimpa)
+            'AKTIF',                              # STATUS KEPESERTAAN
+            None,                                 # GAJI (optional)
+            company_code,                         # KODE PERUSAHAAN
+            company_name,                         # NAMA PERUSAHAAN
+            'TK',                                 # HUBUNGAN KELUARGA (TK=Tenaga Kerja)
+            None,                                 # NIK PESERTA UTAMA
+        ), fmt_cell)
+        
+        # Kolom dengan format khusus
+        sheet.write_number(row, 0, idx, fmt_center)
+        if isinstance(birthday, date):
+            sheet.write_datetime(row, 4, birthday, fmt_date)
+        if gender_code:
+            sheet.write_string(row, 5, gender_code, fmt_center)
+        else:
+            sheet.write_blank(row, 5, None, fmt_center)
+        sheet.write_string(row, 6, marital_code, fmt_center)
+        if isinstance(tgl_aktif, date):
+            sheet.write_datetime(row, 21, tgl_aktif, fmt_date)
+    
+    def _parse_alamat(self, row_data):
         """
         Parse alamat dari field alamat_ktp.
         
+        Args:
+            row_data (dict): Hasil read() untuk karyawan
+            
         Returns:
             dict: Parsed alamat components
         """
-        alamat_ktp = self.get_formatted_field_value(emp, 'alamat_ktp') or ''
+        fmt = self.format_value
         
         # Default values
         result = {
-            'alamat': alamat_ktp,
+            'alamat': fmt(row_data.get('alamat_ktp')),
             'rt': '',
             'rw': '',
             'kelurahan': '',
@@ -329,26 +581,31 @@ class EmployeeExportBpjsKes(EmployeeExportBase):
             'kode_pos': '',
         }
         
-        # Try to get from separate fields if available
-        if hasattr(emp, 'rt'):
-            result['rt'] = self.get_formatted_field_value(emp, 'rt')
-        if hasattr(emp, 'rw'):
-            result['rw'] = self.get_formatted_field_value(emp, 'rw')
-        if hasattr(emp, 'kelurahan'):
-            result['kelurahan'] = self.get_formatted_field_value(emp, 'kelurahan')
-        if hasattr(emp, 'kecamatan'):
-            result['kecamatan'] = self.get_formatted_field_value(emp, 'kecamatan')
-        if hasattr(emp, 'kota'):
-            result['kota'] = self.get_formatted_field_value(emp, 'kota')
-        if hasattr(emp, 'provinsi'):
-            result['provinsi'] = self.get_formatted_field_value(emp, 'provinsi')
-        if hasattr(emp, 'kode_pos'):
-            result['kode_pos'] = self.get_formatted_field_value(emp, 'kode_pos')
+        # Ambil dari field terpisah yang tersedia (lihat _alamat_fields)
+        for field_name in self._alamat_fields:
+            result[field_name] = fmt(row_data.get(field_name))
+        
+        # Lengkapi RT/RW/kode pos dari teks alamat jika field terpisah kosong
+        alamat_ktp = row_data.get('alamat_ktp')
+        if alamat_ktp:
+            for field_name, pattern in _ALAMAT_PATTERNS:
+                if not row_data.get(field_name):
+                    match = pattern.search(alamat_ktp)
+                    if match:
+                        result[field_name] = match.group(1)
         
         return result
     
-    def _write_family_sheet(self, workbook, formats, employees):
-        """Write family data sheet for BPJS family members."""
+    def _write_family_sheet(self, workbook, formats, employees, faskes_by_emp):
+        """
+        Write family data sheet for BPJS family members.
+        
+        Args:
+            workbook: xlsxwriter Workbook
+            formats (dict): Format cell dari _setup_formats
+            employees: hr.employee recordset yang memiliki tanggungan
+            faskes_by_emp (dict): Data faskes per karyawan dari _write_main_sheet
+        """
         sheet = workbook.add_worksheet('Data Keluarga')
         
         headers = [
@@ -365,36 +622,27 @@ class EmployeeExportBpjsKes(EmployeeExportBase):
                          formats['title'])
         
         # Write headers
-        for col, header in enumerate(headers):
-            sheet.write(2, col, header, formats['header'])
+        sheet.write_row(2, 0, headers, formats['header'])
         
         sheet.freeze_panes(3, 0)
+        self._auto_fit_columns(sheet, len(headers))
         
         # Write data
         row = 3
         no = 1
+        gender_get = self.GENDER_MAP.get
+        fast_val = self._fast_val
         
-        for emp in employees:
-            emp_nik = self.get_formatted_field_value(emp, 'nik')
-            emp_name = self.get_formatted_field_value(emp, 'name')
-            
-            # Get BPJS Kesehatan data for faskes reference
-            bpjs_kes = None
-            if hasattr(emp, 'bpjs_ids') and emp.bpjs_ids:
-                for bpjs in emp.bpjs_ids:
-                    if self.get_field_value(bpjs, 'bpjs_type') == 'kesehatan':
-                        bpjs_kes = bpjs
-                        break
-            
-            faskes_code = self.get_formatted_field_value(bpjs_kes, 'faskes_code') if bpjs_kes else ''
-            faskes_name = self.get_formatted_field_value(bpjs_kes, 'faskes_tk1') if bpjs_kes else ''
-            kelas = self.get_formatted_field_value(bpjs_kes, 'kelas') if bpjs_kes else ''
+        for emp, row_data, _bpjs in self._iter_employee_rows(employees, include_bpjs=False):
+            emp_nik = self.format_value(row_data.get('nik'))
+            emp_name = self.format_value(row_data.get('name'))
+            faskes_code, faskes_name, kelas = faskes_by_emp.get(emp.id, ('', '', ''))
             
             # Write spouse if exists
-            spouse_name = self.get_field_value(emp, 'spouse_name')
+            spouse_name = row_data.get('spouse_name')
             if spouse_name:
-                spouse_nik = self.get_formatted_field_value(emp, 'spouse_nik')
-                spouse_birthday = self.get_field_value(emp, 'spouse_birthday')
+                spouse_nik = self.format_value(row_data.get('spouse_nik'))
+                spouse_birthday = row_data.get('spouse_birthday')
                 
                 data = [
                     no, emp_nik, emp_name,
@@ -405,8 +653,11 @@ class EmployeeExportBpjsKes(EmployeeExportBase):
                 ]
                 
                 for col, value in enumerate(data):
-                    if col in [6] and value:  # TANGGAL LAHIR
-                        sheet.write(row, col, value, formats['date'])
+                    if col == 6:  # TANGGAL LAHIR
+                        if isinstance(value, date):
+                            sheet.write_datetime(row, col, value, formats['date'])
+                        else:
+                            sheet.write_blank(row, col, None, formats['cell'])
                     elif col == 0:
                         sheet.write(row, col, value, formats['cell_center'])
                     else:
@@ -418,22 +669,25 @@ class EmployeeExportBpjsKes(EmployeeExportBase):
             # Write children
             if hasattr(emp, 'child_ids') and emp.child_ids:
                 for child in emp.child_ids:
-                    child_birthday = self.get_field_value(child, 'birth_date')
-                    child_gender = self.get_field_value(child, 'gender') or ''
-                    gender_code = self.GENDER_MAP.get(child_gender.lower(), '')
+                    child_birthday = getattr(child, 'birth_date', None)
+                    child_gender = getattr(child, 'gender', None) or ''
+                    gender_code = gender_get(child_gender.lower(), '')
                     
                     data = [
                         no, emp_nik, emp_name,
-                        self.get_formatted_field_value(child, 'nik') if hasattr(child, 'nik') else '',
-                        self.get_formatted_field_value(child, 'name'),
+                        fast_val(child, 'nik') if hasattr(child, 'nik') else '',
+                        fast_val(child, 'name'),
                         '', child_birthday, gender_code,
                         'ANAK', '', kelas,
                         faskes_code, faskes_name
                     ]
                     
                     for col, value in enumerate(data):
-                        if col in [6] and value:
-                            sheet.write(row, col, value, formats['date'])
+                        if col == 6:
+                            if isinstance(value, date):
+                                sheet.write_datetime(row, col, value, formats['date'])
+                            else:
+                                sheet.write_blank(row, col, None, formats['cell'])
                         elif col == 0:
                             sheet.write(row, col, value, formats['cell_center'])
                         else:
@@ -441,10 +695,8 @@ class EmployeeExportBpjsKes(EmployeeExportBase):
                     
                     row += 1
                     no += 1
-        
-        self._auto_fit_columns(sheet, len(headers))
     
-    def _write_info_sheet(self, workbook, formats, employees, export_type):
+    def _write_info_sheet(self, workbook, formats, export_type, export_ts, total_count):
         """Write information sheet."""
         sheet = workbook.add_worksheet('Informasi')
         
@@ -456,12 +708,12 @@ class EmployeeExportBpjsKes(EmployeeExportBase):
         
         row = 3
         info_data = [
-            ('Tanggal Export', datetime.now().strftime('%d-%m-%Y %H:%M:%S')),
+            ('Tanggal Export', export_ts.strftime('%d-%m-%Y %H:%M:%S')),
             ('Diekspor Oleh', self.env.user.name),
             ('Perusahaan', self.env.company.name),
             ('Tipe Export', export_type.upper()),
             ('', ''),
-            ('Total Karyawan', len(employees)),
+            ('Total Karyawan', total_count),
         ]
         
         for label, value in info_data:
@@ -483,17 +735,20 @@ class EmployeeExportBpjsKes(EmployeeExportBase):
             '5. Hubungan keluarga: TK=Tenaga Kerja, SUAMI/ISTRI, ANAK',
         ]
         
-        for note in notes:
-            sheet.write(row, 0, note, formats['info'])
-            row += 1
+        sheet.write_column(row, 0, notes, formats['info'])
     
     def _auto_fit_columns(self, sheet, num_columns):
         """Auto-fit column widths."""
         widths = [5, 18, 30, 15, 12, 5, 5, 40, 5, 5, 15, 15, 15, 15, 8, 15, 25, 20, 5, 10, 30, 12, 10, 12, 15, 30, 15, 18]
         
-        for col in range(num_columns):
-            width = widths[col] if col < len(widths) else 15
-            sheet.set_column(col, col, width)
+        widths = widths[:num_columns] + [15] * (num_columns - len(widths))
+        
+        # Kolom berurutan dengan lebar sama digabung dalam satu set_column
+        start = 0
+        for col in range(1, num_columns + 1):
+            if col == num_columns or widths[col] != widths[start]:
+                sheet.set_column(start, col - 1, widths[start])
+                start = col
     
     def export_registration(self, employees):
         """Export untuk pendaftaran peserta baru."""
@@ -12,11 +12,14 @@ Format export mengikuti template resmi dari BPJS Ketenagakerjaan untuk:
 - Pengajuan klaim
 """
 
-from io import BytesIO
 from datetime import datetime, date
 import logging
+import tempfile
+from typing import NamedTuple
 
 from .export_base import EmployeeExportBase
+from ._iuran_kernel import NUMBA_AVAILABLE, RATE_KEYS, compute_iuran
+from ._fast_xlsx import StreamingWorkbook, STYLE_DATE, STYLE_HEADER, STYLE_NUMBER
 
 _logger = logging.getLogger(__name__)
 
@@ -27,6 +30,28 @@ except ImportError:
     XLSXWRITER_AVAILABLE = False
     _logger.warning("xlsxwriter not installed. Excel export will not be available.")
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+class IuranRow(NamedTuple):
+    """Komponen iuran BPJS TK satu karyawan (urutan IURAN_COLUMNS[4:])."""
+    upah: float
+    jht_tk: float
+    jht_company: float
+    total_jht: float
+    jkk: float
+    jkm: float
+    jp_tk: float
+    jp_company: float
+    total_jp: float
+    total_tk: float
+    total_company: float
+    grand_total: float
+
 
 class EmployeeExportBpjsTk(EmployeeExportBase):
     """
@@ -90,6 +115,133 @@ class EmployeeExportBpjsTk(EmployeeExportBase):
         'GRAND TOTAL',
     ]
     
+    # Key format per kolom HEADER_COLUMNS (urutan sama)
+    HEADER_COLUMN_FORMATS = (
+        'cell_center',                          # NO
+        'cell', 'cell', 'cell', 'cell',         # NIK .. TEMPAT LAHIR
+        'date',                                 # TANGGAL LAHIR
+        'cell_center', 'cell_center',           # JENIS KELAMIN, STATUS PERKAWINAN
+        'cell', 'cell', 'cell', 'cell', 'cell',  # ALAMAT .. PROVINSI
+        'cell', 'cell', 'cell', 'cell',         # KODE POS .. NAMA IBU KANDUNG
+        'date',                                 # TGL MULAI BEKERJA
+        'currency',                             # UPAH
+        'cell',                                 # STATUS KEPESERTAAN
+        'cell_center', 'cell_center', 'cell_center', 'cell_center',  # JHT .. JP
+        'cell', 'cell', 'cell',                 # KODE/NAMA/NPWP PERUSAHAAN
+    )
+    
+    # Key format per kolom IURAN_COLUMNS (urutan sama)
+    IURAN_COLUMN_FORMATS = ('cell_center', 'cell', 'cell', 'cell') + ('currency',) * 12
+    
+    # Nama method writer bertipe per kolom, di-resolve ke worksheet saat
+    # menulis sehingga xlsxwriter tidak perlu menebak tipe setiap cell
+    HEADER_COLUMN_WRITERS = (
+        'write_number',                         # NO
+        'write_string', 'write_string', 'write_string', 'write_string',
+        'write_datetime',                       # TANGGAL LAHIR
+        'write_string', 'write_string',
+        'write_string', 'write_string', 'write_string', 'write_string', 'write_string',
+        'write_string', 'write_string', 'write_string', 'write_string',
+        'write_datetime',                       # TGL MULAI BEKERJA
+        'write_number',                         # UPAH
+        'write_string',
+        'write_string', 'write_string', 'write_string', 'write_string',
+        'write_string', 'write_string', 'write_string',
+    )
+    IURAN_COLUMN_WRITERS = (
+        ('write_number',) + ('write_string',) * 3 + ('write_number',) * 12
+    )
+    
+    # Komponen alamat yang diambil dari field terpisah jika ada di model
+    ALAMAT_FIELDS = ('kelurahan', 'kecamatan', 'kota', 'provinsi', 'kode_pos')
+    
+    # Spesifikasi format Excel; objek format dibuat per workbook di _setup_formats
+    _FMT_SPECS = {
+        'header': {
+            'bold': True,
+            'bg_color': '#1565C0',  # BPJS TK Blue
+            'font_color': 'white',
+            'border': 1,
+            'align': 'center',
+            'valign': 'vcenter',
+            'text_wrap': True,
+        },
+        'cell': {
+            'border': 1,
+            'valign': 'vcenter',
+        },
+        'cell_center': {
+            'border': 1,
+            'align': 'center',
+            'valign': 'vcenter',
+        },
+        'date': {
+            'border': 1,
+            'valign': 'vcenter',
+            'num_format': 'dd-mm-yyyy',
+        },
+        'currency': {
+            'border': 1,
+            'valign': 'vcenter',
+            'num_format': '#,##0',
+        },
+        'currency_bold': {
+            'border': 1,
+            'bold': True,
+            'valign': 'vcenter',
+            'num_format': '#,##0',
+        },
+        'title': {
+            'bold': True,
+            'font_size': 14,
+            'align': 'center',
+            'valign': 'vcenter',
+        },
+        'info': {
+            'italic': True,
+            'font_color': '#666666',
+        },
+        'warning': {
+            'bold': True,
+            'font_color': '#FF0000',
+        },
+        'total': {
+            'bold': True,
+            'bg_color': '#E3F2FD',
+            'border': 1,
+            'valign': 'vcenter',
+            'num_format': '#,##0',
+        },
+    }
+    
+    # Style StreamingWorkbook untuk key format HEADER_COLUMN_FORMATS
+    # (key lain memakai style default)
+    _FAST_STYLES = {
+        'date': STYLE_DATE,
+        'currency': STYLE_NUMBER,
+    }
+    
+    # Isi statis sheet Informasi (sudah dalam bentuk teks akhir)
+    _PROGRAMS_STATIC = (
+        ('JHT - Jaminan Hari Tua', '2% TK + 3.7% Perusahaan'),
+        ('JKK - Jaminan Kecelakaan Kerja', '0.24% - 1.74% Perusahaan (tergantung risiko)'),
+        ('JKM - Jaminan Kematian', '0.3% Perusahaan'),
+        ('JP - Jaminan Pensiun', '1% TK + 2% Perusahaan (max upah Rp 9.077.600)'),
+    )
+    _NOTES_STATIC = (
+        '1. NO KPJ adalah Nomor Kartu Peserta Jamsostek',
+        '2. Pastikan data NIK sudah benar sebelum disubmit',
+        '3. Format tanggal: DD-MM-YYYY',
+        '4. Upah yang dilaporkan adalah upah pokok + tunjangan tetap',
+        '5. Batas maksimal upah untuk JP: Rp 9.077.600 (per Januari 2024)',
+    )
+    
+    # Batas ukuran output yang disimpan di RAM sebelum di-spill ke disk
+    SPOOL_MAX_SIZE = 8 * 1024 * 1024
+    
+    # Field tanggal dari EMPLOYEE_FIELDS yang ditulis dengan write_datetime
+    DATE_FIELDS = ('birthday', 'first_contract_date')
+    
     # Persentase iuran (default)
     IURAN_RATE = {
         'jht_tk': 0.02,       # 2% dari TK
@@ -100,6 +252,13 @@ class EmployeeExportBpjsTk(EmployeeExportBase):
         'jp_company': 0.02,    # 2% dari perusahaan
     }
     
+    # Batas upah maksimal untuk perhitungan JP (Rp 9.077.600)
+    JP_MAX_WAGE = 9077600
+    
+    # Jumlah karyawan minimal untuk memakai kernel numba (di bawah ini
+    # overhead pemanggilan kernel tidak sebanding)
+    NUMBA_MIN_BATCH = 512
+    
     # Mapping jenis kelamin
     GENDER_MAP = {
         'male': 'L',
@@ -116,9 +275,18 @@ class EmployeeExportBpjsTk(EmployeeExportBase):
         'divorced': 'C',
     }
     
+    # Field hr.employee yang dibaca sekaligus via read() di awal export
+    EMPLOYEE_FIELDS = (
+        'nik', 'name', 'place_of_birth', 'birthday', 'gender', 'status_kawin',
+        'alamat_ktp', 'kelurahan', 'kecamatan', 'kota', 'provinsi', 'kode_pos',
+        'mobile_phone', 'work_email', 'nama_ibu', 'first_contract_date',
+    )
+    
     def __init__(self, env):
         """Initialize BPJS Ketenagakerjaan export service."""
         super().__init__(env)
+        self._alamat_fields = ()
+        self._company_cache = {}
         
         if not XLSXWRITER_AVAILABLE:
             raise ImportError(
@@ -126,7 +294,8 @@ class EmployeeExportBpjsTk(EmployeeExportBase):
                 "Silakan install dengan: pip install xlsxwriter"
             )
     
-    def export(self, employees, export_type='active', include_iuran=False):
+    def export(self, employees, export_type='active', include_iuran=False, sink=None,
+               fast=False):
         """
         Export data BPJS Ketenagakerjaan.
         
@@ -134,103 +303,227 @@ class EmployeeExportBpjsTk(EmployeeExportBase):
             employees: hr.employee recordset
             export_type (str): Tipe export ('active', 'new', 'mutation', 'resign')
             include_iuran (bool): Include perhitungan iuran
+            sink: File-like writable (optional). Jika diberikan, workbook
+                ditulis langsung ke sink dan bytes tidak dikembalikan.
+            fast (bool): Tulis hanya sheet data peserta dengan writer XML
+                streaming (lihat _write_fast_workbook). Diabaikan jika
+                include_iuran aktif.
             
         Returns:
-            tuple: (bytes, filename)
+            tuple: (bytes, filename), atau (None, filename) jika sink diberikan
         """
         self.validate_employees(employees)
         
-        output = BytesIO()
-        workbook = xlsxwriter.Workbook(output, {'in_memory': True})
+        # Generate filename
+        type_suffix = {
+            'active': 'peserta_aktif',
+            'new': 'pendaftaran_baru',
+            'mutation': 'mutasi',
+            'resign': 'pengunduran_diri',
+        }
+        suffix = type_suffix.get(export_type, 'data')
+        filename = self.generate_filename(f'bpjs_tk_{suffix}', 'xlsx')
+        
+        if sink is not None:
+            self._write_workbook(sink, employees, export_type, include_iuran, fast)
+            return None, filename
+        
+        # File kecil tetap di RAM, file besar otomatis dipindah ke disk
+        with tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_SIZE) as output:
+            self._write_workbook(output, employees, export_type, include_iuran, fast)
+            output.seek(0)
+            return output.read(), filename
+    
+    def _write_workbook(self, output, employees, export_type, include_iuran, fast=False):
+        """
+        Tulis seluruh sheet BPJS Ketenagakerjaan ke file-like output.
+        
+        Args:
+            output: File-like writable tujuan workbook
+            employees: hr.employee recordset
+            export_type (str): Tipe export
+            include_iuran (bool): Include perhitungan iuran
+            fast (bool): Pakai jalur cepat _write_fast_workbook
+        """
+        if fast and not include_iuran:
+            self._write_fast_workbook(output, employees)
+            return
+        
+        # Satu timestamp untuk seluruh sheet agar konsisten
+        export_ts = datetime.now()
+        
+        # constant_memory: baris di-flush ke temp file begitu baris berikutnya
+        # ditulis, sehingga memory tidak tumbuh linear dengan jumlah karyawan.
+        # Konsekuensinya semua sheet harus ditulis berurutan dari atas ke bawah.
+        # write_row memakai write() generik; string data karyawan jangan
+        # ditafsirkan sebagai formula atau URL
+        workbook = xlsxwriter.Workbook(output, {
+            'constant_memory': True,
+            'in_memory': False,
+            'tmpdir': tempfile.gettempdir(),
+            'strings_to_formulas': False,
+            'strings_to_urls': False,
+        })
         
         # Setup formats
         formats = self._setup_formats(workbook)
         
+        # Data karyawan dibaca sekali, dipakai sheet utama dan sheet iuran
+        emp_rows = self._prefetch_employees(employees)
+        
         # Create sheets
-        self._write_main_sheet(workbook, formats, employees, export_type)
+        self._write_main_sheet(workbook, formats, emp_rows, export_type, export_ts)
         
         if include_iuran:
-            self._write_iuran_sheet(workbook, formats, employees)
+            self._write_iuran_sheet(workbook, formats, emp_rows, export_ts)
         
         # Info sheet
-        self._write_info_sheet(workbook, formats, employees, export_type)
+        self._write_info_sheet(workbook, formats, employees, export_type, export_ts)
         
         workbook.close()
-        output.seek(0)
+    
+    def _write_fast_workbook(self, output, employees):
+        """
+        Tulis sheet data peserta dengan StreamingWorkbook.
         
-        # Generate filename
-        type_suffix = {
-            'active': 'peserta_aktif',
-            'new': 'pendaftaran_baru',
-            'mutation': 'mutasi',
-            'resign': 'pengunduran_diri',
+        Jalur cepat untuk export besar: XML sheet ditulis langsung ke ZIP
+        baris per baris tanpa xlsxwriter. Isinya hanya header kolom dan data
+        peserta (tanpa judul, border, maupun sheet informasi).
+        
+        Args:
+            output: File-like writable tujuan workbook
+            employees: hr.employee recordset
+        """
+        emp_rows = self._prefetch_employees(employees)
+        num_columns = len(self.HEADER_COLUMNS)
+        styles = [self._FAST_STYLES.get(key, 0) for key in self.HEADER_COLUMN_FORMATS]
+        
+        workbook = StreamingWorkbook(output, 'Data Peserta')
+        workbook.set_column_widths(self._get_column_widths(num_columns))
+        workbook.freeze_rows(1)
+        workbook.write_row(self.HEADER_COLUMNS, [STYLE_HEADER] * num_columns)
+        
+        for data in self._iter_employee_rows(emp_rows):
+            workbook.write_row(data, styles)
+        
+        workbook.close()
+    
+    def _prefetch_employees(self, employees):
+        """
+        Baca semua data karyawan yang dibutuhkan export dalam satu batch.
+        
+        Field karyawan dibaca dengan satu ``read()`` (many2one, mis. ``kota``
+        dari module lain, diganti name-nya), nomor KPJ dengan satu
+        ``search_read`` (lihat _get_kpj_by_employee), dan payroll di-prefetch
+        sekali untuk seluruh recordset. Hasilnya dipakai baik oleh
+        sheet utama maupun sheet iuran, sehingga setiap karyawan hanya
+        ditelusuri sekali.
+        
+        Args:
+            employees: hr.employee recordset
+            
+        Returns:
+            list: Dict per karyawan (urutan sama dengan recordset) berisi hasil
+                read() ditambah ``kpj`` (nomor BPJS TK) dan ``upah``;
+                ``gender`` dan ``status_kawin`` sudah dalam lowercase
+        """
+        field_names = [f for f in self.EMPLOYEE_FIELDS if f in employees._fields]
+        many2one_fields = [
+            f for f in field_names if employees._fields[f].type == 'many2one'
+        ]
+        
+        # Schema tidak berubah selama export, cukup dicek sekali
+        self._alamat_fields = tuple(
+            f for f in self.ALAMAT_FIELDS if f in employees._fields
+        )
+        
+        # Data perusahaan sama untuk semua baris; dibaca sekali per export
+        company = self.env.company
+        self._company_cache = {
+            'code': getattr(company, 'bpjs_tk_code', '') or '',
+            'name': company.name or '',
+            'vat': company.vat or '',
         }
-        suffix = type_suffix.get(export_type, 'data')
-        filename = self.generate_filename(f'bpjs_tk_{suffix}', 'xlsx')
         
-        return output.getvalue(), filename
+        kpj_by_emp = self._get_kpj_by_employee(employees)
+        has_payroll = 'payroll_id' in employees._fields
+        if has_payroll:
+            employees.mapped('payroll_id')
+        
+        emp_rows = []
+        for emp, vals in zip(employees, employees.read(field_names)):
+            for field_name in many2one_fields:
+                vals[field_name] = vals[field_name] and vals[field_name][1]
+            for field_name in self.DATE_FIELDS:
+                if isinstance(vals.get(field_name), str):
+                    vals[field_name] = self._to_date(vals[field_name])
+            
+            # Normalisasi sekali di sini agar lookup GENDER_MAP/MARITAL_MAP
+            # pada penyusunan baris tidak perlu .lower() lagi
+            vals['gender'] = (vals.get('gender') or '').lower()
+            vals['status_kawin'] = (vals.get('status_kawin') or '').lower()
+            
+            upah = 0
+            if has_payroll and emp.payroll_id:
+                upah = emp.payroll_id.wage or 0
+            
+            vals['kpj'] = kpj_by_emp.get(emp.id, '')
+            vals['upah'] = upah
+            emp_rows.append(vals)
+        return emp_rows
+    
+    def _get_kpj_by_employee(self, employees):
+        """
+        Index nomor KPJ (BPJS Ketenagakerjaan) per karyawan.
+        
+        Record BPJS Ketenagakerjaan seluruh karyawan diambil dengan satu
+        ``search_read`` pada model ``bpjs_ids``, sehingga tidak ada
+        penelusuran ``bpjs_ids`` per karyawan.
+        
+        Args:
+            employees: hr.employee recordset
+            
+        Returns:
+            dict: {employee_id: nomor KPJ yang sudah di-format}
+        """
+        field = employees._fields.get('bpjs_ids')
+        if field is None:
+            return {}
+        
+        inverse_name = field.inverse_name
+        records = self.env[field.comodel_name].search_read(
+            [(inverse_name, 'in', employees.ids), ('bpjs_type', '=', 'ketenagakerjaan')],
+            ['number', inverse_name],
+        )
+        
+        # Urutan search_read mengikuti _order model, sama seperti bpjs_ids;
+        # record pertama per karyawan yang dipakai
+        kpj_by_emp = {}
+        for rec in records:
+            kpj_by_emp.setdefault(rec[inverse_name][0], self.format_value(rec['number']))
+        return kpj_by_emp
+    
+    @staticmethod
+    def _to_date(value):
+        """
+        Konversi string tanggal ISO ke date.
+        
+        Args:
+            value (str): String tanggal, mis. '1990-01-31'
+            
+        Returns:
+            date: Hasil konversi, atau None jika format tidak valid
+        """
+        try:
+            return date.fromisoformat(value[:10])
+        except ValueError:
+            return None
     
     def _setup_formats(self, workbook):
         """Setup Excel formats."""
-        return {
-            'header': workbook.add_format({
-                'bold': True,
-                'bg_color': '#1565C0',  # BPJS TK Blue
-                'font_color': 'white',
-                'border': 1,
-                'align': 'center',
-                'valign': 'vcenter',
-                'text_wrap': True,
-            }),
-            'cell': workbook.add_format({
-                'border': 1,
-                'valign': 'vcenter',
-            }),
-            'cell_center': workbook.add_format({
-                'border': 1,
-                'align': 'center',
-                'valign': 'vcenter',
-            }),
-            'date': workbook.add_format({
-                'border': 1,
-                'valign': 'vcenter',
-                'num_format': 'dd-mm-yyyy',
-            }),
-            'currency': workbook.add_format({
-                'border': 1,
-                'valign': 'vcenter',
-                'num_format': '#,##0',
-            }),
-            'currency_bold': workbook.add_format({
-                'border': 1,
-                'bold': True,
-                'valign': 'vcenter',
-                'num_format': '#,##0',
-            }),
-            'title': workbook.add_format({
-                'bold': True,
-                'font_size': 14,
-                'align': 'center',
-                'valign': 'vcenter',
-            }),
-            'info': workbook.add_format({
-                'italic': True,
-                'font_color': '#666666',
-            }),
-            'warning': workbook.add_format({
-                'bold': True,
-                'font_color': '#FF0000',
-            }),
-            'total': workbook.add_format({
-                'bold': True,
-                'bg_color': '#E3F2FD',
-                'border': 1,
-                'valign': 'vcenter',
-                'num_format': '#,##0',
-            }),
-        }
+        return {k: workbook.add_format(spec) for k, spec in self._FMT_SPECS.items()}
     
-    def _write_main_sheet(self, workbook, formats, employees, export_type):
+    def _write_main_sheet(self, workbook, formats, emp_rows, export_type, export_ts):
         """Write main data sheet."""
         sheet = workbook.add_worksheet('Data Peserta')
         
@@ -240,25 +533,30 @@ class EmployeeExportBpjsTk(EmployeeExportBase):
                          title, formats['title'])
         
         # Write export info
-        info = f"Tanggal Export: {datetime.now().strftime('%d-%m-%Y %H:%M')} | Total: {len(employees)} karyawan"
+        info = f"Tanggal Export: {export_ts.strftime('%d-%m-%Y %H:%M')} | Total: {len(emp_rows)} karyawan"
         sheet.merge_range(1, 0, 1, len(self.HEADER_COLUMNS) - 1,
                          info, formats['info'])
         
         # Write headers
-        for col, header in enumerate(self.HEADER_COLUMNS):
-            sheet.write(3, col, header, formats['header'])
+        sheet.write_row(3, 0, self.HEADER_COLUMNS, formats['header'])
         
         # Freeze panes
         sheet.freeze_panes(4, 0)
         
+        # Auto-fit columns (sebelum data karena mode constant_memory)
+        self._auto_fit_columns(sheet, len(self.HEADER_COLUMNS))
+        
+        # Segmen kolom (format + writer) di-resolve sekali, bukan per cell
+        segments = self._get_row_segments(
+            sheet, formats, self.HEADER_COLUMN_FORMATS, self.HEADER_COLUMN_WRITERS,
+            bulk_writers=('write_string',),
+        )
+        
         # Write data
         row = 4
-        for idx, emp in enumerate(employees, 1):
-            self._write_employee_row(sheet, formats, row, idx, emp)
+        for data in self._iter_employee_rows(emp_rows):
+            self._write_segments(sheet, segments, row, data)
             row += 1
-        
-        # Auto-fit columns
-        self._auto_fit_columns(sheet, len(self.HEADER_COLUMNS))
     
     def _get_title(self, export_type):
         """Get report title based on export type."""
@@ -270,35 +568,108 @@ class EmployeeExportBpjsTk(EmployeeExportBase):
         }
         return titles.get(export_type, 'DATA PESERTA BPJS KETENAGAKERJAAN')
     
-    def _write_employee_row(self, sheet, formats, row, idx, emp):
-        """Write single employee row."""
-        # Get BPJS TK data
-        bpjs_tk = None
-        if hasattr(emp, 'bpjs_ids') and emp.bpjs_ids:
-            for bpjs in emp.bpjs_ids:
-                if self.get_field_value(bpjs, 'bpjs_type') == 'ketenagakerjaan':
-                    bpjs_tk = bpjs
-                    break
+    def _iter_employee_rows(self, emp_rows):
+        """
+        Susun baris data peserta (_build_employee_row) sesuai urutan karyawan.
+        
+        Args:
+            emp_rows (list): Data karyawan dari _prefetch_employees
+            
+        Yields:
+            list: Nilai per kolom sesuai urutan HEADER_COLUMNS
+        """
+        build_row = self._build_employee_row
+        for idx, emp_vals in enumerate(emp_rows, 1):
+            yield build_row(idx, emp_vals)
+    
+    def _get_row_segments(self, sheet, formats, format_keys, writer_names, bulk_writers):
+        """
+        Kelompokkan kolom menjadi segmen penulisan.
+        
+        Kolom berurutan dengan writer di ``bulk_writers`` dan key format
+        yang sama digabung menjadi satu segmen ``write_row``; kolom lain
+        menjadi segmen satu kolom dengan writer bertipe.
+        
+        Args:
+            sheet: Worksheet tujuan
+            formats (dict): Format cell dari _setup_formats
+            format_keys (tuple): Key format per kolom
+            writer_names (tuple): Nama method writer per kolom
+            bulk_writers (tuple): Writer yang boleh digabung dengan write_row
+            
+        Returns:
+            list: Tuple (start, end, writer atau None untuk write_row, format)
+        """
+        segments = []
+        num_columns = len(format_keys)
+        start = 0
+        while start < num_columns:
+            end = start + 1
+            name = writer_names[start]
+            if name in bulk_writers:
+                while (end < num_columns and writer_names[end] == name
+                       and format_keys[end] == format_keys[start]):
+                    end += 1
+                writer = None
+            else:
+                writer = getattr(sheet, name)
+            segments.append((start, end, writer, formats[format_keys[start]]))
+            start = end
+        return segments
+    
+    def _write_segments(self, sheet, segments, row, data):
+        """
+        Tulis satu baris data sesuai segmen dari _get_row_segments.
+        
+        Kolom string berurutan dengan format sama ditulis sekaligus dengan
+        ``write_row`` (string kosong menjadi cell blank berformat). Kolom
+        lain ditulis dengan writer bertipe; nilai kosong menjadi cell blank.
+        
+        Args:
+            sheet: Worksheet tujuan
+            segments (list): Hasil _get_row_segments
+            row (int): Index baris
+            data (sequence): Nilai per kolom
+        """
+        for start, end, writer, cell_format in segments:
+            if writer is None:
+                sheet.write_row(row, start, data[start:end], cell_format)
+            elif data[start]:
+                writer(row, start, data[start], cell_format)
+            else:
+                sheet.write_blank(row, start, None, cell_format)
+    
+    def _build_employee_row(self, idx, emp_vals):
+        """
+        Susun nilai satu baris data peserta sesuai urutan HEADER_COLUMNS.
+        
+        Args:
+            idx (int): Nomor urut karyawan
+            emp_vals (dict): Data karyawan dari _prefetch_employees
+            
+        Returns:
+            list: Nilai per kolom
+        """
+        fmt = self.format_value
+        company = self._company_cache
         
         # Parse alamat
-        alamat_data = self._parse_alamat(emp)
+        alamat_data = self._parse_alamat(emp_vals)
         
-        # Gender mapping
-        gender = self.get_field_value(emp, 'gender') or ''
-        gender_code = self.GENDER_MAP.get(gender.lower(), '')
+        # Gender mapping (sudah lowercase dari _prefetch_employees)
+        gender_code = self.GENDER_MAP.get(emp_vals['gender'], '')
         
         # Marital status mapping
-        marital = self.get_field_value(emp, 'status_kawin') or ''
-        marital_code = self.MARITAL_MAP.get(marital.lower(), 'TK')
+        marital_code = self.MARITAL_MAP.get(emp_vals['status_kawin'], 'TK')
         
         # Birthday
-        birthday = self.get_field_value(emp, 'birthday')
+        birthday = emp_vals.get('birthday')
         
         # First contract date
-        tgl_masuk = self.get_field_value(emp, 'first_contract_date')
+        tgl_masuk = emp_vals.get('first_contract_date')
         
         # BPJS data
-        kpj_number = self.get_formatted_field_value(bpjs_tk, 'number') if bpjs_tk else ''
+        kpj_number = emp_vals['kpj']
         
         # Program participation (default all Y for active)
         jht = 'Y'
@@ -306,18 +677,15 @@ class EmployeeExportBpjsTk(EmployeeExportBase):
         jkm = 'Y'
         jp = 'Y'
         
-        # Get upah/salary if available
-        upah = 0
-        if hasattr(emp, 'payroll_id') and emp.payroll_id:
-            upah = self.get_field_value(emp.payroll_id, 'wage') or 0
+        # Upah/salary (0 jika tidak tersedia)
+        upah = emp_vals['upah']
         
-        # Write row data
-        data = [
+        return [
             idx,                                                    # NO
-            self.get_formatted_field_value(emp, 'nik'),            # NIK
+            fmt(emp_vals.get('nik')),                              # NIK
             kpj_number,                                             # NO KPJ
-            self.get_formatted_field_value(emp, 'name'),           # NAMA LENGKAP
-            self.get_formatted_field_value(emp, 'place_of_birth'), # TEMPAT LAHIR
+            fmt(emp_vals.get('name')),                             # NAMA LENGKAP
+            fmt(emp_vals.get('place_of_birth')),                   # TEMPAT LAHIR
             birthday,                                               # TANGGAL LAHIR
             gender_code,                                            # JENIS KELAMIN
             marital_code,                                           # STATUS PERKAWINAN
@@ -327,9 +695,9 @@ class EmployeeExportBpjsTk(EmployeeExportBase):
             alamat_data.get('kota', ''),                           # KOTA/KAB
             alamat_data.get('provinsi', ''),                       # PROVINSI
             alamat_data.get('kode_pos', ''),                       # KODE POS
-            self.get_formatted_field_value(emp, 'mobile_phone'),   # NO HP
-            self.get_formatted_field_value(emp, 'work_email'),     # EMAIL
-            self.get_formatted_field_value(emp, 'nama_ibu'),       # NAMA IBU KANDUNG
+            fmt(emp_vals.get('mobile_phone')),                     # NO HP
+            fmt(emp_vals.get('work_email')),                       # EMAIL
+            fmt(emp_vals.get('nama_ibu')),                         # NAMA IBU KANDUNG
             tgl_masuk,                                              # TGL MULAI BEKERJA
             upah,                                                   # UPAH
             'AKTIF',                                                # STATUS KEPESERTAAN
@@ -337,26 +705,23 @@ class EmployeeExportBpjsTk(EmployeeExportBase):
             jkk,                                                    # JKK
             jkm,                                                    # JKM
             jp,                                                     # JP
-            self.env.company.bpjs_tk_code if hasattr(self.env.company, 'bpjs_tk_code') else '',  # KODE PERUSAHAAN
-            self.env.company.name,                                  # NAMA PERUSAHAAN
-            self.env.company.vat or '',                             # NPWP PERUSAHAAN
+            company['code'],                                        # KODE PERUSAHAAN
+            company['name'],                                        # NAMA PERUSAHAAN
+            company['vat'],                                         # NPWP PERUSAHAAN
         ]
-        
-        for col, value in enumerate(data):
-            if col in [5, 17] and value:  # TANGGAL
-                sheet.write(row, col, value, formats['date'])
-            elif col == 18 and value:  # UPAH
-                sheet.write(row, col, value, formats['currency'])
-            elif col == 0:  # NO
-                sheet.write(row, col, value, formats['cell_center'])
-            elif col in [6, 7, 20, 21, 22, 23]:  # Kode-kode
-                sheet.write(row, col, value, formats['cell_center'])
-            else:
-                sheet.write(row, col, value if value else '', formats['cell'])
     
-    def _parse_alamat(self, emp):
-        """Parse alamat dari field alamat_ktp."""
-        alamat_ktp = self.get_formatted_field_value(emp, 'alamat_ktp') or ''
+    def _parse_alamat(self, emp_vals):
+        """
+        Parse alamat dari field alamat_ktp.
+        
+        Args:
+            emp_vals (dict): Data karyawan dari _prefetch_employees
+            
+        Returns:
+            dict: Parsed alamat components
+        """
+        fmt = self.format_value
+        alamat_ktp = fmt(emp_vals.get('alamat_ktp'))
         
         result = {
             'alamat': alamat_ktp,
@@ -367,170 +732,130 @@ class EmployeeExportBpjsTk(EmployeeExportBase):
             'kode_pos': '',
         }
         
-        # Try to get from separate fields if available
-        if hasattr(emp, 'kelurahan'):
-            result['kelurahan'] = self.get_formatted_field_value(emp, 'kelurahan')
-        if hasattr(emp, 'kecamatan'):
-            result['kecamatan'] = self.get_formatted_field_value(emp, 'kecamatan')
-        if hasattr(emp, 'kota'):
-            result['kota'] = self.get_formatted_field_value(emp, 'kota')
-        if hasattr(emp, 'provinsi'):
-            result['provinsi'] = self.get_formatted_field_value(emp, 'provinsi')
-        if hasattr(emp, 'kode_pos'):
-            result['kode_pos'] = self.get_formatted_field_value(emp, 'kode_pos')
+        # Ambil dari field terpisah yang tersedia (lihat _alamat_fields)
+        for field_name in self._alamat_fields:
+            result[field_name] = fmt(emp_vals.get(field_name))
         
         return result
     
-    def _write_iuran_sheet(self, workbook, formats, employees):
+    def _write_iuran_sheet(self, workbook, formats, emp_rows, export_ts):
         """Write iuran calculation sheet."""
         sheet = workbook.add_worksheet('Laporan Iuran')
         
         # Write title
-        period = datetime.now().strftime('%B %Y')
+        period = export_ts.strftime('%B %Y')
         sheet.merge_range(0, 0, 0, len(self.IURAN_COLUMNS) - 1,
                          f'LAPORAN IURAN BPJS KETENAGAKERJAAN - {period.upper()}',
                          formats['title'])
         
         # Write headers
-        for col, header in enumerate(self.IURAN_COLUMNS):
-            sheet.write(2, col, header, formats['header'])
+        sheet.write_row(2, 0, self.IURAN_COLUMNS, formats['header'])
         
         sheet.freeze_panes(3, 0)
         
-        # Initialize totals
-        totals = {
-            'upah': 0,
-            'jht_tk': 0,
-            'jht_company': 0,
-            'total_jht': 0,
-            'jkk': 0,
-            'jkm': 0,
-            'jp_tk': 0,
-            'jp_company': 0,
-            'total_jp': 0,
-            'total_tk': 0,
-            'total_company': 0,
-            'grand_total': 0,
-        }
+        # Auto-fit columns (sebelum data karena mode constant_memory)
+        self._set_column_widths(
+            sheet, [5, 18, 18, 30, 15, 12, 12, 12, 12, 12, 12, 12, 12, 12, 12, 15])
+        
+        # Segmen kolom (format + writer) di-resolve sekali, bukan per cell;
+        # teks dan angka iuran ditulis per segmen dengan write_row
+        segments = self._get_row_segments(
+            sheet, formats, self.IURAN_COLUMN_FORMATS, self.IURAN_COLUMN_WRITERS,
+            bulk_writers=('write_string', 'write_number'),
+        )
+        fmt = self.format_value
+        
+        # Iuran seluruh karyawan dihitung sekaligus
+        iuran_rows, totals = self._calculate_iuran([vals['upah'] for vals in emp_rows])
         
         # Write data
         row = 3
-        for idx, emp in enumerate(employees, 1):
-            row_data = self._calculate_iuran(emp, idx)
-            
-            # Update totals
-            for key in totals:
-                if key in row_data:
-                    totals[key] += row_data[key]
+        for idx, (emp_vals, iuran) in enumerate(zip(emp_rows, iuran_rows), 1):
+            data = (
+                idx,
+                emp_vals['kpj'],
+                fmt(emp_vals.get('nik')),
+                fmt(emp_vals.get('name')),
+            ) + iuran
             
-            # Write row
-            data = [
-                row_data['no'],
-                row_data['kpj'],
-                row_data['nik'],
-                row_data['name'],
-                row_data['upah'],
-                row_data['jht_tk'],
-                row_data['jht_company'],
-                row_data['total_jht'],
-                row_data['jkk'],
-                row_data['jkm'],
-                row_data['jp_tk'],
-                row_data['jp_company'],
-                row_data['total_jp'],
-                row_data['total_tk'],
-                row_data['total_company'],
-                row_data['grand_total'],
-            ]
-            
-            for col, value in enumerate(data):
-                if col == 0:  # NO
-                    sheet.write(row, col, value, formats['cell_center'])
-                elif col in [1, 2, 3]:  # Text
-                    sheet.write(row, col, value, formats['cell'])
-                else:  # Currency
-                    sheet.write(row, col, value, formats['currency'])
+            # Teks kosong jadi cell blank; angka 0 tetap ditulis
+            self._write_segments(sheet, segments, row, data)
             
             row += 1
         
         # Write total row
         row += 1
-        sheet.write(row, 0, '', formats['total'])
-        sheet.write(row, 1, '', formats['total'])
-        sheet.write(row, 2, '', formats['total'])
-        sheet.write(row, 3, 'TOTAL', formats['total'])
-        sheet.write(row, 4, totals['upah'], formats['total'])
-        sheet.write(row, 5, totals['jht_tk'], formats['total'])
-        sheet.write(row, 6, totals['jht_company'], formats['total'])
-        sheet.write(row, 7, totals['total_jht'], formats['total'])
-        sheet.write(row, 8, totals['jkk'], formats['total'])
-        sheet.write(row, 9, totals['jkm'], formats['total'])
-        sheet.write(row, 10, totals['jp_tk'], formats['total'])
-        sheet.write(row, 11, totals['jp_company'], formats['total'])
-        sheet.write(row, 12, totals['total_jp'], formats['total'])
-        sheet.write(row, 13, totals['total_tk'], formats['total'])
-        sheet.write(row, 14, totals['total_company'], formats['total'])
-        sheet.write(row, 15, totals['grand_total'], formats['total'])
-        
-        # Auto-fit columns
-        widths = [5, 18, 18, 30, 15, 12, 12, 12, 12, 12, 12, 12, 12, 12, 12, 15]
-        for col, width in enumerate(widths):
-            sheet.set_column(col, col, width)
-    
-    def _calculate_iuran(self, emp, idx):
-        """Calculate iuran for single employee."""
-        # Get KPJ number
-        kpj = ''
-        if hasattr(emp, 'bpjs_ids') and emp.bpjs_ids:
-            for bpjs in emp.bpjs_ids:
-                if self.get_field_value(bpjs, 'bpjs_type') == 'ketenagakerjaan':
-                    kpj = self.get_formatted_field_value(bpjs, 'number')
-                    break
-        
-        # Get upah
-        upah = 0
-        if hasattr(emp, 'payroll_id') and emp.payroll_id:
-            upah = self.get_field_value(emp.payroll_id, 'wage') or 0
-        
-        # Calculate iuran
-        jht_tk = upah * self.IURAN_RATE['jht_tk']
-        jht_company = upah * self.IURAN_RATE['jht_company']
+        sheet.write_row(row, 0, ('', '', '', 'TOTAL') + totals, formats['total'])
+    
+    def _calculate_iuran(self, upah_values):
+        """
+        Calculate iuran for all employees at once.
+        
+        Batch besar (>= NUMBA_MIN_BATCH) memakai kernel numba jika tersedia.
+        Selain itu, jika numpy tersedia rumus iuran dievaluasi sekali atas
+        array upah seluruh karyawan; jika tidak, dihitung per karyawan dengan
+        rumus yang sama (_iuran_components).
+        
+        Args:
+            upah_values (list): Upah per karyawan
+            
+        Returns:
+            tuple: (list IuranRow per karyawan, IuranRow total per komponen)
+        """
+        if not upah_values:
+            return [], IuranRow._make([0] * 12)
+        
+        if NUMBA_AVAILABLE and len(upah_values) >= self.NUMBA_MIN_BATCH:
+            upah = np.asarray(upah_values, dtype=np.float64)
+            rates = np.array([self.IURAN_RATE[key] for key in RATE_KEYS], dtype=np.float64)
+            result = compute_iuran(upah, rates, float(self.JP_MAX_WAGE))
+            totals = IuranRow._make(result.sum(axis=0).tolist())
+            return [IuranRow._make(values) for values in result.tolist()], totals
+        
+        if NUMPY_AVAILABLE:
+            upah = np.asarray(upah_values, dtype=np.float64)
+            columns = self._iuran_components(upah, np.minimum(upah, self.JP_MAX_WAGE))
+            totals = IuranRow._make(float(values.sum()) for values in columns)
+            return list(map(IuranRow._make, zip(*(values.tolist() for values in columns)))), totals
+        
+        rows = [self._iuran_components(upah, min(upah, self.JP_MAX_WAGE))
+                for upah in upah_values]
+        totals = IuranRow._make(sum(values) for values in zip(*rows))
+        return rows, totals
+    
+    def _iuran_components(self, upah, jp_wage):
+        """
+        Rumus iuran BPJS TK; berlaku untuk angka tunggal maupun array numpy.
+        
+        Args:
+            upah: Upah karyawan
+            jp_wage: Upah untuk perhitungan JP (sudah dibatasi JP_MAX_WAGE)
+            
+        Returns:
+            IuranRow: Komponen iuran (berisi array jika input array)
+        """
+        rate = self.IURAN_RATE
+        jht_tk = upah * rate['jht_tk']
+        jht_company = upah * rate['jht_company']
         total_jht = jht_tk + jht_company
         
-        jkk = upah * self.IURAN_RATE['jkk']
-        jkm = upah * self.IURAN_RATE['jkm']
+        jkk = upah * rate['jkk']
+        jkm = upah * rate['jkm']
         
-        # JP has maximum wage cap (currently Rp 9.077.600)
-        jp_max_wage = 9077600
-        jp_wage = min(upah, jp_max_wage)
-        jp_tk = jp_wage * self.IURAN_RATE['jp_tk']
-        jp_company = jp_wage * self.IURAN_RATE['jp_company']
+        jp_tk = jp_wage * rate['jp_tk']
+        jp_company = jp_wage * rate['jp_company']
         total_jp = jp_tk + jp_company
         
         total_tk = jht_tk + jp_tk
         total_company = jht_company + jkk + jkm + jp_company
         grand_total = total_tk + total_company
         
-        return {
-            'no': idx,
-            'kpj': kpj,
-            'nik': self.get_formatted_field_value(emp, 'nik'),
-            'name': self.get_formatted_field_value(emp, 'name'),
-            'upah': upah,
-            'jht_tk': jht_tk,
-            'jht_company': jht_company,
-            'total_jht': total_jht,
-            'jkk': jkk,
-            'jkm': jkm,
-            'jp_tk': jp_tk,
-            'jp_company': jp_company,
-            'total_jp': total_jp,
-            'total_tk': total_tk,
-            'total_company': total_company,
-            'grand_total': grand_total,
-        }
+        return IuranRow(
+            upah, jht_tk, jht_company, total_jht, jkk, jkm,
+            jp_tk, jp_company, total_jp, total_tk, total_company, grand_total,
+        )
     
-    def _write_info_sheet(self, workbook, formats, employees, export_type):
+    def _write_info_sheet(self, workbook, formats, employees, export_type, export_ts):
         """Write information sheet."""
         sheet = workbook.add_worksheet('Informasi')
         
@@ -542,7 +867,7 @@ class EmployeeExportBpjsTk(EmployeeExportBase):
         
         row = 3
         info_data = [
-            ('Tanggal Export', datetime.now().strftime('%d-%m-%Y %H:%M:%S')),
+            ('Tanggal Export', export_ts.strftime('%d-%m-%Y %H:%M:%S')),
             ('Diekspor Oleh', self.env.user.name),
             ('Perusahaan', self.env.company.name),
             ('NPWP Perusahaan', self.env.company.vat or '-'),
@@ -562,16 +887,9 @@ class EmployeeExportBpjsTk(EmployeeExportBase):
         sheet.write(row, 0, 'PROGRAM BPJS KETENAGAKERJAAN:', formats['warning'])
         row += 1
         
-        programs = [
-            ('JHT', 'Jaminan Hari Tua', '2% TK + 3.7% Perusahaan'),
-            ('JKK', 'Jaminan Kecelakaan Kerja', '0.24% - 1.74% Perusahaan (tergantung risiko)'),
-            ('JKM', 'Jaminan Kematian', '0.3% Perusahaan'),
-            ('JP', 'Jaminan Pensiun', '1% TK + 2% Perusahaan (max upah Rp 9.077.600)'),
-        ]
-        
-        for code, name, rate in programs:
-            sheet.write(row, 0, f'{code} - {name}', formats['cell'])
-            sheet.write(row, 1, rate, formats['info'])
+        for program, rate in self._PROGRAMS_STATIC:
+            sheet.write_string(row, 0, program, formats['cell'])
+            sheet.write_string(row, 1, rate, formats['info'])
             row += 1
         
         # Notes
@@ -579,25 +897,41 @@ class EmployeeExportBpjsTk(EmployeeExportBase):
         sheet.write(row, 0, 'CATATAN:', formats['warning'])
         row += 1
         
-        notes = [
-            '1. NO KPJ adalah Nomor Kartu Peserta Jamsostek',
-            '2. Pastikan data NIK sudah benar sebelum disubmit',
-            '3. Format tanggal: DD-MM-YYYY',
-            '4. Upah yang dilaporkan adalah upah pokok + tunjangan tetap',
-            '5. Batas maksimal upah untuk JP: Rp 9.077.600 (per Januari 2024)',
-        ]
-        
-        for note in notes:
-            sheet.write(row, 0, note, formats['info'])
-            row += 1
+        sheet.write_column(row, 0, self._NOTES_STATIC, formats['info'])
     
     def _auto_fit_columns(self, sheet, num_columns):
         """Auto-fit column widths."""
-        widths = [5, 18, 18, 30, 15, 12, 5, 5, 40, 15, 15, 15, 15, 8, 15, 25, 25, 12, 15, 10, 5, 5, 5, 5, 15, 30, 20]
+        self._set_column_widths(sheet, self._get_column_widths(num_columns))
+    
+    def _set_column_widths(self, sheet, widths):
+        """
+        Set lebar kolom mulai kolom A.
+        
+        Kolom berurutan dengan lebar sama digabung dalam satu set_column.
         
-        for col in range(num_columns):
-            width = widths[col] if col < len(widths) else 15
-            sheet.set_column(col, col, width)
+        Args:
+            sheet: Worksheet tujuan
+            widths (list): Lebar per kolom
+        """
+        num_columns = len(widths)
+        start = 0
+        for col in range(1, num_columns + 1):
+            if col == num_columns or widths[col] != widths[start]:
+                sheet.set_column(start, col - 1, widths[start])
+                start = col
+    
+    def _get_column_widths(self, num_columns):
+        """
+        Lebar kolom sheet data peserta.
+        
+        Args:
+            num_columns (int): Jumlah kolom
+            
+        Returns:
+            list: Lebar per kolom (15 untuk kolom di luar daftar)
+        """
+        widths = [5, 18, 18, 30, 15, 12, 5, 5, 40, 15, 15, 15, 15, 8, 15, 25, 25, 12, 15, 10, 5, 5, 5, 5, 15, 30, 20]
+        return [widths[col] if col < len(widths) else 15 for col in range(num_columns)]
     
     def export_registration(self, employees):
         """Export untuk pendaftaran peserta baru."""
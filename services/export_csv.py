@@ -7,14 +7,23 @@ dengan fitur UTF-8 BOM, configurable delimiter, dan flattened data.
 """
 
 import csv
-from io import StringIO, BytesIO
+from io import BytesIO, TextIOWrapper
 from datetime import datetime, date
+from itertools import chain, islice
 import logging
+from operator import attrgetter
 
 from .export_base import EmployeeExportBase, FIELD_MAPPINGS
 
 _logger = logging.getLogger(__name__)
 
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 
 class EmployeeExportCsv(EmployeeExportBase):
     """
@@ -27,12 +36,161 @@ class EmployeeExportCsv(EmployeeExportBase):
     - Quoted fields untuk handle koma dalam value
     """
     
+    # Header tambahan per kategori export standar; urutan dict ini adalah
+    # urutan kolom di file
+    CATEGORY_HEADERS = {
+        'identity': [
+            'NIK', 'No. KK', 'Tempat Lahir', 'Tanggal Lahir', 'Usia',
+            'Jenis Kelamin', 'Agama', 'Gol. Darah', 'Status Nikah', 'Alamat KTP'
+        ],
+        'employment': [
+            'Unit Kerja', 'Jabatan', 'Area Kerja', 'Golongan', 'Grade',
+            'Tipe Pegawai', 'Jenis Pegawai', 'Status', 'Tgl Masuk', 'Masa Kerja'
+        ],
+        'family': [
+            'Nama Pasangan', 'NIK Pasangan', 'Tgl Lahir Pasangan',
+            'Jumlah Anak', 'Jml Anggota Keluarga'
+        ],
+        'bpjs': [
+            'No. BPJS Kesehatan', 'No. BPJS TK', 'Faskes TK1', 'Kelas BPJS'
+        ],
+        'education': [
+            'Pendidikan Terakhir', 'Institusi', 'Jurusan', 'Tahun Lulus'
+        ],
+        'payroll': [
+            'Nama Bank', 'No. Rekening', 'NPWP', 'EFIN'
+        ],
+        'training': [
+            'Jumlah Pelatihan'
+        ],
+        'reward_punishment': [
+            'Jumlah Reward', 'Jumlah Punishment'
+        ],
+    }
+    
+    # Method penyusun data per kategori, urutan sama dengan CATEGORY_HEADERS
+    CATEGORY_BUILDERS = {
+        'identity': '_get_identity_data',
+        'employment': '_get_employment_data',
+        'family': '_get_family_data',
+        'bpjs': '_get_bpjs_data',
+        'education': '_get_education_data',
+        'payroll': '_get_payroll_data',
+        'training': '_get_training_data',
+        'reward_punishment': '_get_reward_punishment_data',
+    }
+    
+    # Field (boleh dotted path) yang dibaca sekaligus per karyawan dengan
+    # attrgetter, urutan sesuai pemakaian di _get_*_data
+    CATEGORY_FIELD_PATHS = {
+        'base': ('nrp', 'name'),
+        'identity': (
+            'nik', 'no_kk', 'place_of_birth', 'birthday', 'age',
+            'blood_type', 'status_kawin', 'alamat_ktp',
+        ),
+        'employment': (
+            'department_id.name', 'job_id.name', 'area_kerja_id.name',
+            'golongan_id.name', 'grade_id.name', 'employee_type_id.name',
+            'employee_category_id.name', 'employment_status',
+            'first_contract_date', 'service_length',
+        ),
+        'family': ('spouse_name', 'spouse_nik', 'spouse_birthday', 'jlh_anggota_keluarga'),
+    }
+    
+    # Kolom kategori ber-field-path untuk fungsi baris hasil
+    # _compile_row_function, urutan sama dengan _get_*_data. Entry yang ada di
+    # CATEGORY_FIELD_PATHS di-format sesuai tipe field-nya; entry lain adalah
+    # ekspresi Python (nama variabel = path dengan '.' diganti '__')
+    COMPILED_ROW_COLUMNS = {
+        'identity': (
+            'nik', 'no_kk', 'place_of_birth', 'birthday', 'age',
+            "label(emp, 'gender')", "label(emp, 'religion')",
+            'blood_type', 'status_kawin', 'alamat_ktp',
+        ),
+        'employment': (
+            'department_id.name', 'job_id.name', 'area_kerja_id.name',
+            'golongan_id.name', 'grade_id.name', 'employee_type_id.name',
+            'employee_category_id.name', 'employment_status', 'first_contract_date',
+            'format_service_length(service_length, with_unit=True) if service_length else EMPTY',
+        ),
+        'family': (
+            'spouse_name', 'spouse_nik', 'spouse_birthday',
+            'len(emp.child_ids) if has_child_ids else 0', 'jlh_anggota_keluarga',
+        ),
+    }
+    
+    # Tipe field yang nilainya (str atau False) ditulis apa adanya
+    STRING_FIELD_TYPES = ('char', 'text', 'selection')
+    
+    # Field hr.employee di luar CATEGORY_FIELD_PATHS yang dibaca per kategori;
+    # untuk relasi, value berisi field record relasi yang ikut di-prefetch
+    CATEGORY_PREFETCH = {
+        'identity': {'gender': (), 'religion': ()},
+        'family': {'child_ids': ()},
+        'payroll': {'payroll_id': ('bank_name', 'bank_account', 'npwp', 'efin')},
+        'training': {'training_certificate_ids': ()},
+    }
+    
+    # Header export detail per kategori (lihat export_detailed)
+    DETAILED_HEADERS = {
+        'bpjs': ['No', 'NRP', 'Nama Karyawan', 'NIK', 'Jenis BPJS',
+                 'Nomor BPJS', 'Faskes TK1', 'Kelas'],
+        'education': ['No', 'NRP', 'Nama Karyawan', 'Jenjang', 'Institusi',
+                      'Jurusan', 'Tahun Masuk', 'Tahun Lulus'],
+        'family': ['No', 'NRP', 'Nama Karyawan', 'Nama Anak', 'Jenis Kelamin',
+                   'Tanggal Lahir', 'Usia'],
+        'training': ['No', 'NRP', 'Nama Karyawan', 'Nama Pelatihan', 'Jenis',
+                     'Metode', 'Tgl Mulai', 'Tgl Selesai'],
+        'reward_punishment': ['No', 'NRP', 'Nama Karyawan', 'Tipe', 'Kategori',
+                              'Tanggal', 'Keterangan'],
+    }
+    
+    # Jumlah karyawan minimal untuk menulis baris data dengan writer CSV
+    # pyarrow (jika terinstall), beserta jumlah baris per batch Arrow
+    ARROW_MIN_ROWS = 5000
+    ARROW_BATCH_SIZE = 1024
+    
+    # Relasi hr.employee yang keberadaannya dicek sekali per export
+    # (lihat _reset_export_state), bukan dengan hasattr per karyawan
+    RELATION_FIELDS = (
+        'child_ids', 'bpjs_ids', 'education_ids',
+        'training_certificate_ids', 'reward_punishment_ids',
+    )
+    
+    # Ukuran chunk bytes yang di-yield export_stream
+    STREAM_CHUNK_SIZE = 64 * 1024
+    
+    # Label tipe dan kategori reward/punishment (export detail)
+    RP_TYPE_LABELS = {
+        'reward': 'Reward',
+        'punishment': 'Punishment',
+    }
+    REWARD_CATEGORY_LABELS = {
+        'gathering': 'Gathering',
+        'program_sekolah': 'Program Sekolah',
+        'program_yayasan': 'Program Yayasan',
+    }
+    PUNISHMENT_CATEGORY_LABELS = {
+        'st1': 'Surat Teguran 1',
+        'st2': 'Surat Teguran 2',
+        'st3': 'Surat Teguran 3',
+        'sp1': 'Surat Peringatan 1',
+        'sp2': 'Surat Peringatan 2',
+        'sp3': 'Surat Peringatan 3',
+    }
+    
     def __init__(self, env):
         """Initialize CSV export service."""
         super().__init__(env)
         self.delimiter = ','
         self.quotechar = '"'
         self.quoting = csv.QUOTE_MINIMAL
+        self._field_getters = {}
+        self._bpjs_by_emp = {}
+        self._rp_counts = {}
+        self._latest_education = {}
+        self._selection_cache = {}
+        self._has = dict.fromkeys(self.RELATION_FIELDS, False)
     
     def export(self, employees, categories=None, config=None, delimiter=','):
         """
@@ -54,39 +212,458 @@ class EmployeeExportCsv(EmployeeExportBase):
         
         self.delimiter = delimiter
         
-        # Build headers and data
+        self._reset_export_state(employees)
+        
+        # Isi cache ORM sekali untuk semua karyawan sebelum baris disusun
+        self._prefetch_categories(employees, categories)
+        
+        # Write CSV; baris data dibangkitkan satu per satu oleh _build_rows
+        buffer, stream, writer = self._create_writer()
         headers = self._build_headers(categories)
+        writer.writerow(headers)
         rows = self._build_rows(employees, categories)
+        if self._use_arrow_writer(len(employees)):
+            self._write_rows_arrow(buffer, rows, len(headers))
+        else:
+            writer.writerows(rows)
+        csv_bytes = self._finish_writer(buffer, stream)
+        
+        filename = self.generate_filename('export_karyawan', 'csv')
+        
+        return csv_bytes, filename
+    
+    def export_stream(self, employees, categories=None, config=None, delimiter=','):
+        """
+        Export data karyawan ke CSV sebagai iterator chunk bytes.
+        
+        Isi sama dengan export() (termasuk writer pyarrow untuk export
+        besar, lihat _use_arrow_writer), tetapi file tidak pernah ditampung
+        utuh di memory: baris ditulis ke buffer kecil yang di-yield setiap
+        mencapai STREAM_CHUNK_SIZE. Iterator membaca ORM, jadi harus habis
+        dikonsumsi selama transaksi request masih aktif.
+        
+        Args:
+            employees: hr.employee recordset
+            categories (list): List kategori yang akan di-export
+            config: hr.employee.export.config (optional)
+            delimiter (str): Delimiter character (',', ';', '\t')
+            
+        Returns:
+            tuple: (iterator bytes, filename)
+        """
+        self.validate_employees(employees)
+        
+        if categories is None:
+            categories = ['identity', 'employment']
+        
+        self.delimiter = delimiter
+        self._reset_export_state(employees)
+        self._prefetch_categories(employees, categories)
+        
+        filename = self.generate_filename('export_karyawan', 'csv')
+        
+        return self._iter_csv_chunks(employees, categories), filename
+    
+    def _iter_csv_chunks(self, employees, categories):
+        """
+        Tulis CSV (dengan BOM) dan yield isinya per chunk.
+        
+        Args:
+            employees: hr.employee recordset
+            categories (list): List kategori
+            
+        Yields:
+            bytes: Potongan isi CSV, minimal STREAM_CHUNK_SIZE kecuali chunk
+                terakhir
+        """
+        buffer, stream, writer = self._create_writer()
+        headers = self._build_headers(categories)
+        writer.writerow(headers)
+        
+        # Setiap langkah menulis satu baris (csv.writer) atau satu batch
+        # (pyarrow) ke buffer
+        rows = self._build_rows(employees, categories)
+        if self._use_arrow_writer(len(employees)):
+            steps = self._iter_arrow_batches(buffer, rows, len(headers))
+        else:
+            steps = (writer.writerow(row) for row in rows)
+        
+        chunk_size = self.STREAM_CHUNK_SIZE
+        for _ in steps:
+            if buffer.tell() >= chunk_size:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        
+        last_chunk = self._finish_writer(buffer, stream)
+        if last_chunk:
+            yield last_chunk
+    
+    def _reset_export_state(self, employees):
+        """
+        Reset cache per export dan cek relasi yang tersedia di model.
+        
+        Args:
+            employees: hr.employee recordset
+        """
+        self._selection_cache = {}
+        self._has = {name: name in employees._fields for name in self.RELATION_FIELDS}
+    
+    def _get_comodel_fields(self, employees, field_name):
+        """
+        Ambil ``_fields`` model relasi dari field hr.employee.
+        
+        Args:
+            employees: hr.employee recordset
+            field_name (str): Nama field relasi
+            
+        Returns:
+            dict: ``_fields`` model relasi (kosong jika field tidak ada)
+        """
+        field = employees._fields.get(field_name)
+        if field is None:
+            return {}
+        return self.env[field.comodel_name]._fields
+    
+    def _prefetch_categories(self, employees, categories):
+        """
+        Isi cache ORM dengan semua field yang dibaca kategori terpilih.
+        
+        Field hr.employee dibaca dengan satu ``read()``, relasi many2one
+        pada dotted path dan record relasi (CATEGORY_PREFETCH) dengan
+        ``mapped()``/``read()`` atas seluruh recordset, sehingga penyusunan
+        baris per karyawan tidak memicu query per record.
+        
+        Args:
+            employees: hr.employee recordset
+            categories (list): List kategori
+        """
+        model_fields = employees._fields
+        keys = ['base'] + [cat for cat in self.CATEGORY_HEADERS if cat in categories]
+        
+        field_names = {}
+        related_paths = []
+        relations = {}
+        for key in keys:
+            for path in self.CATEGORY_FIELD_PATHS.get(key, ()):
+                field_name = path.split('.', 1)[0]
+                field_names[field_name] = True
+                if field_name != path:
+                    related_paths.append(path)
+            for field_name, sub_fields in self.CATEGORY_PREFETCH.get(key, {}).items():
+                field_names[field_name] = True
+                if sub_fields:
+                    relations[field_name] = sub_fields
+        
+        employees.read([f for f in field_names if f in model_fields])
+        
+        for path in related_paths:
+            if path.split('.', 1)[0] in model_fields:
+                employees.mapped(path)
+        
+        for field_name, sub_fields in relations.items():
+            if field_name in model_fields:
+                related = employees.mapped(field_name)
+                related.read([f for f in sub_fields if f in related._fields])
+        
+        # BPJS, pendidikan dan reward/punishment dibaca/dihitung langsung per karyawan
+        # dengan satu query, tanpa menelusuri relasi per karyawan
+        self._bpjs_by_emp = {}
+        if 'bpjs' in categories:
+            records_by_emp = self._read_related(
+                employees, 'bpjs_ids', ['bpjs_type', 'number', 'faskes_tk1', 'kelas'])
+            # Record terakhir per jenis yang dipakai
+            self._bpjs_by_emp = {
+                emp_id: {rec['bpjs_type']: rec for rec in records}
+                for emp_id, records in records_by_emp.items()
+            }
+        
+        # Pendidikan terakhir = record pertama per karyawan menurut _order
+        # model relasi (sama dengan education_ids[0])
+        self._latest_education = {}
+        if 'education' in categories:
+            records_by_emp = self._read_related(
+                employees, 'education_ids', ['certificate', 'study_school', 'major', 'date_end'])
+            self._latest_education = {
+                emp_id: records[0] for emp_id, records in records_by_emp.items()
+            }
+        
+        self._rp_counts = {}
+        if 'reward_punishment' in categories:
+            self._rp_counts = self._count_related(employees, 'reward_punishment_ids', 'type')
+    
+    def _read_related(self, employees, field_name, fields):
+        """
+        Baca record one2many seluruh karyawan dengan satu ``search_read``.
+        
+        Args:
+            employees: hr.employee recordset
+            field_name (str): Nama field one2many di hr.employee
+            fields (list): Field record relasi yang dibaca; field yang tidak
+                ada di model relasi dilewati
+            
+        Returns:
+            dict: {employee_id: list dict record}, urutan record mengikuti
+                _order model relasi (sama seperti field one2many)
+        """
+        field = employees._fields.get(field_name)
+        if field is None:
+            return {}
+        
+        inverse_name = field.inverse_name
+        comodel = self.env[field.comodel_name]
+        records = comodel.search_read(
+            [(inverse_name, 'in', employees.ids)],
+            [f for f in fields if f != inverse_name and f in comodel._fields] + [inverse_name],
+        )
         
-        # Write CSV
-        output = StringIO()
+        records_by_emp = {}
+        for rec in records:
+            records_by_emp.setdefault(rec[inverse_name][0], []).append(rec)
+        return records_by_emp
+    
+    def _count_related(self, employees, field_name, groupby):
+        """
+        Hitung record one2many per karyawan dan per nilai ``groupby``.
+        
+        Args:
+            employees: hr.employee recordset
+            field_name (str): Nama field one2many di hr.employee
+            groupby (str): Field record relasi untuk pengelompokan
+            
+        Returns:
+            dict: {(employee_id, nilai groupby): jumlah record}
+        """
+        field = employees._fields.get(field_name)
+        if field is None:
+            return {}
+        
+        inverse_name = field.inverse_name
+        groups = self.env[field.comodel_name].read_group(
+            [(inverse_name, 'in', employees.ids)],
+            [inverse_name, groupby],
+            [inverse_name, groupby],
+            lazy=False,
+        )
+        return {
+            (group[inverse_name][0], group[groupby]): group['__count']
+            for group in groups
+        }
+    
+    def _format_date(self, value):
+        """
+        Format tanggal sebagai DD/MM/YYYY.
+        
+        Disusun langsung dari komponen tanggal, tanpa strftime yang mem-parse
+        format string di setiap pemanggilan.
+        
+        Args:
+            value (date): Tanggal (boleh kosong)
+            
+        Returns:
+            str: Tanggal ter-format atau empty_value
+        """
+        if not value:
+            return self.empty_value
+        return f"{value.day:02d}/{value.month:02d}/{value.year}"
+    
+    def _format_year(self, value):
+        """
+        Ambil tahun dari tanggal.
+        
+        Tanggal dari ``read()``/``search_read()`` di server berupa objek
+        date; string 'YYYY-MM-DD' (mis. dari data RPC/JSON) cukup di-slice
+        tanpa di-parse menjadi date.
+        
+        Args:
+            value (date|str): Tanggal (boleh kosong)
+            
+        Returns:
+            int|str: Tahun atau empty_value
+        """
+        if not value:
+            return self.empty_value
+        if isinstance(value, str):
+            return value[:4]
+        return value.year
+    
+    def _get_selection_label(self, record, field_name):
+        """
+        Label selection field seperti get_selection_label, dengan mapping
+        value -> label yang di-resolve sekali per model per export.
+        
+        Args:
+            record: Odoo record
+            field_name (str): Nama field selection
+            
+        Returns:
+            str: Label selection atau empty_value
+        """
+        return self._get_value_label(record, field_name, getattr(record, field_name, None))
+    
+    def _get_value_label(self, model, field_name, value):
+        """
+        Label selection untuk nilai yang sudah dibaca (mis. hasil
+        ``search_read``), memakai cache yang sama dengan _get_selection_label.
+        
+        Args:
+            model: Record atau recordset model pemilik field
+            field_name (str): Nama field selection
+            value: Nilai selection
+            
+        Returns:
+            str: Label selection atau empty_value
+        """
+        if not value:
+            return self.empty_value
+        
+        key = (model._name, field_name)
+        if key not in self._selection_cache:
+            labels = None
+            field = model._fields.get(field_name)
+            if field and hasattr(field, 'selection'):
+                try:
+                    selection = field.selection
+                    if callable(selection):
+                        selection = selection(model)
+                    labels = dict(selection)
+                except Exception as e:
+                    _logger.warning("Error getting selection label for %s: %s", field_name, e)
+                    return self.empty_value
+            self._selection_cache[key] = labels
+        
+        labels = self._selection_cache[key]
+        if labels is None:
+            return str(value)
+        return labels.get(value, value)
+    
+    def _format_read_value(self, value):
+        """
+        Format nilai hasil ``read()``/``search_read()``.
+        
+        Args:
+            value: Nilai field; many2one berupa tuple (id, name)
+            
+        Returns:
+            str: Nilai yang sudah di-format
+        """
+        if isinstance(value, tuple):
+            value = value[1]
+        return self.format_value(value)
+    
+    def _create_writer(self):
+        """
+        Buat csv.writer yang menulis langsung ke buffer bytes.
+        
+        Buffer diawali BOM UTF-8 untuk kompatibilitas Excel; teks di-encode
+        ke buffer saat ditulis sehingga tidak ada salinan string CSV utuh
+        yang perlu di-encode ulang di akhir.
+        
+        Returns:
+            tuple: (BytesIO buffer, TextIOWrapper stream, csv.writer)
+        """
+        buffer = BytesIO()
+        buffer.write(b'\xef\xbb\xbf')
+        stream = TextIOWrapper(buffer, encoding='utf-8', newline='', write_through=True)
         writer = csv.writer(
-            output,
+            stream,
             delimiter=self.delimiter,
             quotechar=self.quotechar,
             quoting=self.quoting
         )
+        return buffer, stream, writer
+    
+    def _use_arrow_writer(self, row_count):
+        """
+        Cek apakah baris data ditulis dengan _write_rows_arrow.
         
-        # Write header row
-        writer.writerow(headers)
+        Hanya untuk export besar dan dialect default (quotechar '"',
+        QUOTE_MINIMAL) yang didukung writer CSV pyarrow.
         
-        # Write data rows
-        for row in rows:
-            writer.writerow(row)
+        Args:
+            row_count (int): Jumlah baris data
+            
+        Returns:
+            bool: True jika memakai pyarrow
+        """
+        return (
+            PYARROW_AVAILABLE
+            and row_count >= self.ARROW_MIN_ROWS
+            and self.quotechar == '"'
+            and self.quoting == csv.QUOTE_MINIMAL
+        )
+    
+    def _write_rows_arrow(self, buffer, rows, num_columns):
+        """
+        Tulis baris data dengan writer CSV pyarrow (lihat _iter_arrow_batches).
         
-        # Convert to bytes with UTF-8 BOM
-        csv_content = output.getvalue()
-        # Add BOM for Excel compatibility
-        csv_bytes = b'\xef\xbb\xbf' + csv_content.encode('utf-8')
+        Args:
+            buffer: BytesIO tujuan (setelah header ditulis)
+            rows: Iterable baris data
+            num_columns (int): Jumlah kolom per baris
+        """
+        for _ in self._iter_arrow_batches(buffer, rows, num_columns):
+            pass
+    
+    def _iter_arrow_batches(self, buffer, rows, num_columns):
+        """
+        Tulis baris data dengan writer CSV pyarrow, per batch.
         
-        filename = self.generate_filename('export_karyawan', 'csv')
+        Baris dikonversi ke kolom string per ARROW_BATCH_SIZE baris lalu
+        ditulis oleh Arrow di native code, sehingga baris tetap di-stream
+        dari generator. Arrow memberi tanda kutip pada semua nilai string
+        (termasuk angka dan string kosong); isi yang terbaca csv.reader sama
+        dengan hasil csv.writer.
         
-        return csv_bytes, filename
+        Args:
+            buffer: BytesIO tujuan (setelah header ditulis)
+            rows: Iterable baris data
+            num_columns (int): Jumlah kolom per baris
+            
+        Yields:
+            None: Setelah setiap batch ditulis ke buffer
+        """
+        schema = pa.schema([(f'c{col}', pa.string()) for col in range(num_columns)])
+        options = pa_csv.WriteOptions(
+            include_header=False, delimiter=self.delimiter, eol='\r\n')
+        
+        rows = iter(rows)
+        with pa_csv.CSVWriter(buffer, schema, write_options=options) as arrow_writer:
+            while True:
+                batch = list(islice(rows, self.ARROW_BATCH_SIZE))
+                if not batch:
+                    break
+                columns = [
+                    pa.array([None if value is None else str(value) for value in column],
+                             type=pa.string())
+                    for column in zip(*batch)
+                ]
+                arrow_writer.write_batch(pa.record_batch(columns, schema=schema))
+                yield
+    
+    def _finish_writer(self, buffer, stream):
+        """
+        Ambil isi CSV dari writer hasil _create_writer.
+        
+        Args:
+            buffer: BytesIO buffer
+            stream: TextIOWrapper di atas buffer
+            
+        Returns:
+            bytes: Isi CSV (dengan BOM)
+        """
+        stream.flush()
+        # Lepas wrapper agar buffer tidak ikut tertutup
+        stream.detach()
+        return buffer.getvalue()
     
     def _build_headers(self, categories):
         """
         Build header row berdasarkan kategori yang dipilih.
         
+        Urutan kolom mengikuti CATEGORY_HEADERS (sama dengan urutan data
+        dari _get_category_builders), bukan urutan ``categories``.
+        
         Args:
             categories (list): List kategori
             
@@ -94,43 +671,48 @@ class EmployeeExportCsv(EmployeeExportBase):
             list: Header columns
         """
         headers = ['No', 'NRP', 'Nama Lengkap']
+        for cat, cat_headers in self.CATEGORY_HEADERS.items():
+            if cat in categories:
+                headers.extend(cat_headers)
+        return headers
+    
+    def _make_field_getter(self, model_fields, paths):
+        """
+        Buat getter yang membaca beberapa field record sekaligus.
         
-        # Mapping kategori ke header tambahan
-        category_headers = {
-            'identity': [
-                'NIK', 'No. KK', 'Tempat Lahir', 'Tanggal Lahir', 'Usia',
-                'Jenis Kelamin', 'Agama', 'Gol. Darah', 'Status Nikah', 'Alamat KTP'
-            ],
-            'employment': [
-                'Unit Kerja', 'Jabatan', 'Area Kerja', 'Golongan', 'Grade',
-                'Tipe Pegawai', 'Jenis Pegawai', 'Status', 'Tgl Masuk', 'Masa Kerja'
-            ],
-            'family': [
-                'Nama Pasangan', 'NIK Pasangan', 'Tgl Lahir Pasangan',
-                'Jumlah Anak', 'Jml Anggota Keluarga'
-            ],
-            'bpjs': [
-                'No. BPJS Kesehatan', 'No. BPJS TK', 'Faskes TK1', 'Kelas BPJS'
-            ],
-            'education': [
-                'Pendidikan Terakhir', 'Institusi', 'Jurusan', 'Tahun Lulus'
-            ],
-            'payroll': [
-                'Nama Bank', 'No. Rekening', 'NPWP', 'EFIN'
-            ],
-            'training': [
-                'Jumlah Pelatihan'
-            ],
-            'reward_punishment': [
-                'Jumlah Reward', 'Jumlah Punishment'
-            ],
-        }
+        Memakai satu operator.attrgetter untuk semua path. Path yang field
+        pertamanya tidak ada di model selalu bernilai None (seperti
+        get_field_value).
         
-        for cat in categories:
-            if cat in category_headers:
-                headers.extend(category_headers[cat])
+        Args:
+            model_fields (dict): ``_fields`` model record
+            paths (tuple): Path field, mis. ('nik', 'department_id.name')
+            
+        Returns:
+            callable: Fungsi record -> tuple nilai sesuai urutan ``paths``
+        """
+        available = [path.split('.', 1)[0] in model_fields for path in paths]
+        if all(available) and len(paths) > 1:
+            return attrgetter(*paths)
         
-        return headers
+        getters = [attrgetter(path) if ok else None for path, ok in zip(paths, available)]
+        return lambda record: tuple(get(record) if get else None for get in getters)
+    
+    def _get_category_builders(self, categories):
+        """
+        Resolve method penyusun data kategori sekali per export.
+        
+        Args:
+            categories (list): List kategori
+            
+        Returns:
+            list: Bound method ``_get_*_data`` sesuai urutan CATEGORY_BUILDERS
+        """
+        return [
+            getattr(self, method_name)
+            for cat, method_name in self.CATEGORY_BUILDERS.items()
+            if cat in categories
+        ]
     
     def _build_rows(self, employees, categories):
         """
@@ -140,113 +722,177 @@ class EmployeeExportCsv(EmployeeExportBase):
             employees: hr.employee recordset
             categories (list): List kategori
             
-        Returns:
-            list: List of row data
+        Yields:
+            list: Row data per karyawan
         """
-        rows = []
+        self._field_getters = {
+            key: self._make_field_getter(employees._fields, paths)
+            for key, paths in self.CATEGORY_FIELD_PATHS.items()
+        }
+        row_function = self._compile_row_function(employees, categories)
+        if row_function is not None:
+            for idx, emp in enumerate(employees, 1):
+                yield row_function(emp, idx)
+            return
         
+        builders = self._get_category_builders(categories)
         for idx, emp in enumerate(employees, 1):
-            row = self._build_employee_row(emp, idx, categories)
-            rows.append(row)
-        
-        return rows
+            yield self._build_employee_row(emp, idx, builders)
     
-    def _build_employee_row(self, emp, idx, categories):
+    def _get_path_field_type(self, model_fields, path):
         """
-        Build single row untuk satu karyawan.
+        Tipe field di ujung path, mis. 'char' untuk 'department_id.name'.
         
         Args:
-            emp: hr.employee record
-            idx (int): Nomor urut
-            categories (list): List kategori
+            model_fields (dict): ``_fields`` model awal
+            path (str): Path field dengan dot notation
             
         Returns:
-            list: Row data
+            str: Tipe field, atau None jika ada bagian path yang tidak ada
         """
-        row = [
-            idx,
-            self.get_formatted_field_value(emp, 'nrp'),
-            self.get_formatted_field_value(emp, 'name'),
-        ]
-        
-        if 'identity' in categories:
-            row.extend(self._get_identity_data(emp))
-        
-        if 'employment' in categories:
-            row.extend(self._get_employment_data(emp))
+        field = None
+        for part in path.split('.'):
+            if field is not None:
+                if not field.comodel_name:
+                    return None
+                model_fields = self.env[field.comodel_name]._fields
+            field = model_fields.get(part)
+            if field is None:
+                return None
+        return field.type
+    
+    def _compile_row_function(self, employees, categories):
+        """
+        Susun fungsi baris khusus untuk kombinasi kategori export ini.
         
-        if 'family' in categories:
-            row.extend(self._get_family_data(emp))
+        Kolom kategori di COMPILED_ROW_COLUMNS ditulis sebagai satu ekspresi
+        list yang formatnya sudah dipilih dari tipe field (string apa adanya,
+        tanggal via _format_date, lainnya via format_value), sehingga tidak
+        ada dispatch tipe dan pemanggilan _get_*_data per karyawan. Kategori
+        lain tetap memanggil method _get_*_data-nya. Hasilnya sama dengan
+        _build_employee_row.
         
-        if 'bpjs' in categories:
-            row.extend(self._get_bpjs_data(emp))
+        Args:
+            employees: hr.employee recordset
+            categories (list): List kategori
+            
+        Returns:
+            callable: Fungsi (emp, idx) -> list row, atau None jika ada field
+                path yang tidak tersedia di model (pakai jalur generik)
+        """
+        model_fields = employees._fields
+        namespace = {
+            'EMPTY': self.empty_value,
+            'fmt': self.format_value,
+            'fdate': self._format_date,
+            'label': self._get_selection_label,
+            'format_service_length': self._format_service_length,
+            'has_child_ids': self._has['child_ids'],
+        }
         
-        if 'education' in categories:
-            row.extend(self._get_education_data(emp))
+        def column_expr(path):
+            var = path.replace('.', '__')
+            field_type = self._get_path_field_type(model_fields, path)
+            if field_type in self.STRING_FIELD_TYPES:
+                return f"(EMPTY if {var} is False or {var} is None else {var})"
+            if field_type == 'date':
+                return f"fdate({var})"
+            return f"fmt({var})"
         
-        if 'payroll' in categories:
-            row.extend(self._get_payroll_data(emp))
+        lines = ['def _row(emp, idx):']
+        columns = ['idx']
+        keys = ['base'] + [cat for cat in self.CATEGORY_BUILDERS if cat in categories]
+        for key in keys:
+            paths = self.CATEGORY_FIELD_PATHS.get(key)
+            if paths is None:
+                # Kategori tanpa field path: kolom dari method _get_*_data
+                namespace[f'build_{key}'] = getattr(self, self.CATEGORY_BUILDERS[key])
+                columns.append(f'*build_{key}(emp)')
+                continue
+            
+            if any(self._get_path_field_type(model_fields, path) is None for path in paths):
+                return None
+            
+            namespace[f'get_{key}'] = self._field_getters[key]
+            variables = ', '.join(path.replace('.', '__') for path in paths)
+            lines.append(f'    ({variables},) = get_{key}(emp)')
+            for column in self.COMPILED_ROW_COLUMNS.get(key, paths):
+                columns.append(column_expr(column) if column in paths else column)
         
-        if 'training' in categories:
-            row.extend(self._get_training_data(emp))
+        lines.append('    return [')
+        lines.extend(f'        {column},' for column in columns)
+        lines.append('    ]')
         
-        if 'reward_punishment' in categories:
-            row.extend(self._get_reward_punishment_data(emp))
+        exec(compile('\n'.join(lines), '<csv_row>', 'exec'), namespace)
+        return namespace['_row']
+    
+    def _build_employee_row(self, emp, idx, builders):
+        """
+        Build single row untuk satu karyawan.
         
-        return row
+        Args:
+            emp: hr.employee record
+            idx (int): Nomor urut
+            builders (list): Hasil _get_category_builders
+            
+        Returns:
+            list: Row data
+        """
+        nrp, name = self._field_getters['base'](emp)
+        # Satu alokasi list untuk seluruh kolom, tanpa extend per kategori
+        return list(chain(
+            (idx, self.format_value(nrp), self.format_value(name)),
+            *[build(emp) for build in builders]
+        ))
     
     def _get_identity_data(self, emp):
         """Get identity data for CSV row."""
-        birthday = self.get_field_value(emp, 'birthday')
-        birthday_str = birthday.strftime('%d/%m/%Y') if birthday else self.empty_value
+        (nik, no_kk, place_of_birth, birthday, age,
+         blood_type, status_kawin, alamat_ktp) = self._field_getters['identity'](emp)
+        fmt = self.format_value
         
         return [
-            self.get_formatted_field_value(emp, 'nik'),
-            self.get_formatted_field_value(emp, 'no_kk'),
-            self.get_formatted_field_value(emp, 'place_of_birth'),
-            birthday_str,
-            self.get_formatted_field_value(emp, 'age'),
-            self.get_selection_label(emp, 'gender'),
-            self.get_selection_label(emp, 'religion'),
-            self.get_formatted_field_value(emp, 'blood_type'),
-            self.get_formatted_field_value(emp, 'status_kawin'),
-            self.get_formatted_field_value(emp, 'alamat_ktp'),
+            fmt(nik),
+            fmt(no_kk),
+            fmt(place_of_birth),
+            self._format_date(birthday),
+            fmt(age),
+            self._get_selection_label(emp, 'gender'),
+            self._get_selection_label(emp, 'religion'),
+            fmt(blood_type),
+            fmt(status_kawin),
+            fmt(alamat_ktp),
         ]
     
     def _get_employment_data(self, emp):
         """Get employment data for CSV row."""
-        first_contract = self.get_field_value(emp, 'first_contract_date')
-        tgl_masuk = first_contract.strftime('%d/%m/%Y') if first_contract else self.empty_value
+        values = self._field_getters['employment'](emp)
+        first_contract, service_length = values[-2:]
+        fmt = self.format_value
         
-        service_length = self.get_field_value(emp, 'service_length')
+        tgl_masuk = self._format_date(first_contract)
         masa_kerja = self._format_service_length(service_length, with_unit=True) if service_length else self.empty_value
         
-        return [
-            self.get_formatted_field_value(emp, 'department_id.name'),
-            self.get_formatted_field_value(emp, 'job_id.name'),
-            self.get_formatted_field_value(emp, 'area_kerja_id.name'),
-            self.get_formatted_field_value(emp, 'golongan_id.name'),
-            self.get_formatted_field_value(emp, 'grade_id.name'),
-            self.get_formatted_field_value(emp, 'employee_type_id.name'),
-            self.get_formatted_field_value(emp, 'employee_category_id.name'),
-            self.get_formatted_field_value(emp, 'employment_status'),
-            tgl_masuk,
-            masa_kerja,
-        ]
+        # Unit kerja, jabatan, area, golongan, grade, tipe, jenis, status
+        row = [fmt(value) for value in values[:-2]]
+        row.append(tgl_masuk)
+        row.append(masa_kerja)
+        return row
     
     def _get_family_data(self, emp):
         """Get family data for CSV row."""
-        spouse_birthday = self.get_field_value(emp, 'spouse_birthday')
-        spouse_birthday_str = spouse_birthday.strftime('%d/%m/%Y') if spouse_birthday else self.empty_value
+        (spouse_name, spouse_nik, spouse_birthday,
+         jlh_anggota_keluarga) = self._field_getters['family'](emp)
+        fmt = self.format_value
         
-        child_count = len(emp.child_ids) if hasattr(emp, 'child_ids') else 0
+        child_count = len(emp.child_ids) if self._has['child_ids'] else 0
         
         return [
-            self.get_formatted_field_value(emp, 'spouse_name'),
-            self.get_formatted_field_value(emp, 'spouse_nik'),
-            spouse_birthday_str,
+            fmt(spouse_name),
+            fmt(spouse_nik),
+            self._format_date(spouse_birthday),
             child_count,
-            self.get_formatted_field_value(emp, 'jlh_anggota_keluarga'),
+            fmt(jlh_anggota_keluarga),
         ]
     
     def _get_bpjs_data(self, emp):
@@ -256,38 +902,35 @@ class EmployeeExportCsv(EmployeeExportBase):
         faskes = self.empty_value
         kelas = self.empty_value
         
-        if hasattr(emp, 'bpjs_ids') and emp.bpjs_ids:
-            for bpjs in emp.bpjs_ids:
-                bpjs_type = self.get_field_value(bpjs, 'bpjs_type')
-                if bpjs_type == 'kesehatan':
-                    bpjs_kesehatan = self.get_formatted_field_value(bpjs, 'number')
-                    faskes = self.get_formatted_field_value(bpjs, 'faskes_tk1')
-                    kelas = self.get_formatted_field_value(bpjs, 'kelas')
-                elif bpjs_type == 'ketenagakerjaan':
-                    bpjs_tk = self.get_formatted_field_value(bpjs, 'number')
+        # Record BPJS per jenis dari _prefetch_categories
+        by_type = self._bpjs_by_emp.get(emp.id)
+        if by_type:
+            fmt = self._format_read_value
+            kesehatan = by_type.get('kesehatan')
+            if kesehatan:
+                bpjs_kesehatan = fmt(kesehatan['number'])
+                faskes = fmt(kesehatan['faskes_tk1'])
+                kelas = fmt(kesehatan['kelas'])
+            ketenagakerjaan = by_type.get('ketenagakerjaan')
+            if ketenagakerjaan:
+                bpjs_tk = fmt(ketenagakerjaan['number'])
         
         return [bpjs_kesehatan, bpjs_tk, faskes, kelas]
     
     def _get_education_data(self, emp):
         """Get education data for CSV row (latest education)."""
-        pendidikan = self.empty_value
-        institusi = self.empty_value
-        jurusan = self.empty_value
-        tahun_lulus = self.empty_value
-        
-        if hasattr(emp, 'education_ids') and emp.education_ids:
-            # Get latest education (assuming ordered by date_end desc)
-            latest_edu = emp.education_ids[0] if emp.education_ids else None
-            
-            if latest_edu:
-                pendidikan = self.get_formatted_field_value(latest_edu, 'certificate')
-                institusi = self.get_formatted_field_value(latest_edu, 'study_school')
-                jurusan = self.get_formatted_field_value(latest_edu, 'major')
-                
-                date_end = self.get_field_value(latest_edu, 'date_end')
-                tahun_lulus = date_end.year if date_end else self.empty_value
+        # Record pendidikan terakhir dari _prefetch_categories
+        latest_edu = self._latest_education.get(emp.id)
+        if not latest_edu:
+            return [self.empty_value] * 4
         
-        return [pendidikan, institusi, jurusan, tahun_lulus]
+        fmt = self._format_read_value
+        return [
+            fmt(latest_edu.get('certificate')),
+            fmt(latest_edu.get('study_school')),
+            fmt(latest_edu.get('major')),
+            self._format_year(latest_edu.get('date_end')),
+        ]
     
     def _get_payroll_data(self, emp):
         """Get payroll data for CSV row."""
@@ -307,25 +950,16 @@ class EmployeeExportCsv(EmployeeExportBase):
         """Get training data summary for CSV row."""
         training_count = 0
         
-        if hasattr(emp, 'training_certificate_ids') and emp.training_certificate_ids:
+        if self._has['training_certificate_ids'] and emp.training_certificate_ids:
             training_count = len(emp.training_certificate_ids)
         
         return [training_count]
     
     def _get_reward_punishment_data(self, emp):
         """Get reward/punishment data summary for CSV row."""
-        reward_count = 0
-        punishment_count = 0
-        
-        if hasattr(emp, 'reward_punishment_ids') and emp.reward_punishment_ids:
-            for rp in emp.reward_punishment_ids:
-                rp_type = self.get_field_value(rp, 'type')
-                if rp_type == 'reward':
-                    reward_count += 1
-                elif rp_type == 'punishment':
-                    punishment_count += 1
-        
-        return [reward_count, punishment_count]
+        # Jumlah per (karyawan, tipe) dari _prefetch_categories
+        counts = self._rp_counts
+        return [counts.get((emp.id, 'reward'), 0), counts.get((emp.id, 'punishment'), 0)]
     
     def export_detailed(self, employees, category, config=None, delimiter=','):
         """
@@ -345,185 +979,184 @@ class EmployeeExportCsv(EmployeeExportBase):
         """
         self.validate_employees(employees)
         self.delimiter = delimiter
-        
-        output = StringIO()
-        writer = csv.writer(
-            output,
-            delimiter=self.delimiter,
-            quotechar=self.quotechar,
-            quoting=self.quoting
-        )
+        self._reset_export_state(employees)
         
         if category == 'bpjs':
-            rows = self._export_bpjs_detailed(employees, writer)
+            rows = self._export_bpjs_detailed(employees)
         elif category == 'education':
-            rows = self._export_education_detailed(employees, writer)
+            rows = self._export_education_detailed(employees)
         elif category == 'family':
-            rows = self._export_children_detailed(employees, writer)
+            rows = self._export_children_detailed(employees)
         elif category == 'training':
-            rows = self._export_training_detailed(employees, writer)
+            rows = self._export_training_detailed(employees)
         elif category == 'reward_punishment':
-            rows = self._export_rp_detailed(employees, writer)
+            rows = self._export_rp_detailed(employees)
         else:
             # Fallback to standard export
             return self.export(employees, [category], config, delimiter)
         
-        # Convert to bytes with UTF-8 BOM
-        csv_content = output.getvalue()
-        csv_bytes = b'\xef\xbb\xbf' + csv_content.encode('utf-8')
+        # Generator rows dikonsumsi langsung oleh writerows
+        buffer, stream, writer = self._create_writer()
+        writer.writerow(self.DETAILED_HEADERS[category])
+        writer.writerows(rows)
+        csv_bytes = self._finish_writer(buffer, stream)
         
         filename = self.generate_filename(f'export_{category}_detail', 'csv')
         
         return csv_bytes, filename
     
-    def _export_bpjs_detailed(self, employees, writer):
-        """Export BPJS data in detailed format."""
-        headers = ['No', 'NRP', 'Nama Karyawan', 'NIK', 'Jenis BPJS',
-                   'Nomor BPJS', 'Faskes TK1', 'Kelas']
-        writer.writerow(headers)
+    def _export_bpjs_detailed(self, employees):
+        """Export BPJS data in detailed format. Yields row data."""
+        # Record BPJS semua karyawan dibaca dengan satu query
+        records_by_emp = self._read_related(
+            employees, 'bpjs_ids', ['bpjs_type', 'number', 'faskes_tk1', 'kelas'])
+        fmt = self._format_read_value
         
         no = 1
         for emp in employees:
-            if hasattr(emp, 'bpjs_ids') and emp.bpjs_ids:
-                for bpjs in emp.bpjs_ids:
+            records = records_by_emp.get(emp.id)
+            if records:
+                # Kolom karyawan di-format sekali, dipakai semua record BPJS
+                emp_nrp = self.get_formatted_field_value(emp, 'nrp')
+                emp_name = self.get_formatted_field_value(emp, 'name')
+                emp_nik = self.get_formatted_field_value(emp, 'nik')
+                for bpjs in records:
                     row = [
                         no,
-                        self.get_formatted_field_value(emp, 'nrp'),
-                        self.get_formatted_field_value(emp, 'name'),
-                        self.get_formatted_field_value(emp, 'nik'),
-                        self.get_formatted_field_value(bpjs, 'bpjs_type'),
-                        self.get_formatted_field_value(bpjs, 'number'),
-                        self.get_formatted_field_value(bpjs, 'faskes_tk1'),
-                        self.get_formatted_field_value(bpjs, 'kelas'),
+                        emp_nrp,
+                        emp_name,
+                        emp_nik,
+                        fmt(bpjs.get('bpjs_type')),
+                        fmt(bpjs.get('number')),
+                        fmt(bpjs.get('faskes_tk1')),
+                        fmt(bpjs.get('kelas')),
                     ]
-                    writer.writerow(row)
+                    yield row
                     no += 1
     
-    def _export_education_detailed(self, employees, writer):
-        """Export education data in detailed format."""
-        headers = ['No', 'NRP', 'Nama Karyawan', 'Jenjang', 'Institusi',
-                   'Jurusan', 'Tahun Masuk', 'Tahun Lulus']
-        writer.writerow(headers)
+    def _export_education_detailed(self, employees):
+        """Export education data in detailed format. Yields row data."""
+        records_by_emp = self._read_related(
+            employees, 'education_ids',
+            ['certificate', 'study_school', 'major', 'date_start', 'date_end'])
+        fmt = self._format_read_value
         
         no = 1
         for emp in employees:
-            if hasattr(emp, 'education_ids') and emp.education_ids:
-                for edu in emp.education_ids:
-                    date_start = self.get_field_value(edu, 'date_start')
-                    date_end = self.get_field_value(edu, 'date_end')
-                    
+            records = records_by_emp.get(emp.id)
+            if records:
+                emp_nrp = self.get_formatted_field_value(emp, 'nrp')
+                emp_name = self.get_formatted_field_value(emp, 'name')
+                for edu in records:
                     row = [
                         no,
-                        self.get_formatted_field_value(emp, 'nrp'),
-                        self.get_formatted_field_value(emp, 'name'),
-                        self.get_formatted_field_value(edu, 'certificate'),
-                        self.get_formatted_field_value(edu, 'study_school'),
-                        self.get_formatted_field_value(edu, 'major'),
-                        date_start.year if date_start else self.empty_value,
-                        date_end.year if date_end else self.empty_value,
+                        emp_nrp,
+                        emp_name,
+                        fmt(edu.get('certificate')),
+                        fmt(edu.get('study_school')),
+                        fmt(edu.get('major')),
+                        self._format_year(edu.get('date_start')),
+                        self._format_year(edu.get('date_end')),
                     ]
-                    writer.writerow(row)
+                    yield row
                     no += 1
     
-    def _export_children_detailed(self, employees, writer):
-        """Export children data in detailed format."""
-        headers = ['No', 'NRP', 'Nama Karyawan', 'Nama Anak', 'Jenis Kelamin',
-                   'Tanggal Lahir', 'Usia']
-        writer.writerow(headers)
+    def _export_children_detailed(self, employees):
+        """Export children data in detailed format. Yields row data."""
+        child_fields = self._get_comodel_fields(employees, 'child_ids')
+        has_gender = 'gender' in child_fields
+        has_age = 'age' in child_fields
+        child_model = self.env[employees._fields['child_ids'].comodel_name] if child_fields else None
+        
+        records_by_emp = self._read_related(
+            employees, 'child_ids', ['name', 'gender', 'birth_date', 'age'])
+        fmt = self._format_read_value
         
         no = 1
         for emp in employees:
-            if hasattr(emp, 'child_ids') and emp.child_ids:
-                for child in emp.child_ids:
-                    birth_date = self.get_field_value(child, 'birth_date')
-                    birth_str = birth_date.strftime('%d/%m/%Y') if birth_date else self.empty_value
+            records = records_by_emp.get(emp.id)
+            if records:
+                emp_nrp = self.get_formatted_field_value(emp, 'nrp')
+                emp_name = self.get_formatted_field_value(emp, 'name')
+                for child in records:
+                    birth_str = self._format_date(child.get('birth_date'))
                     
                     row = [
                         no,
-                        self.get_formatted_field_value(emp, 'nrp'),
-                        self.get_formatted_field_value(emp, 'name'),
-                        self.get_formatted_field_value(child, 'name'),
-                        self.get_selection_label(child, 'gender') if hasattr(child, 'gender') else self.empty_value,
+                        emp_nrp,
+                        emp_name,
+                        fmt(child.get('name')),
+                        self._get_value_label(child_model, 'gender', child['gender']) if has_gender else self.empty_value,
                         birth_str,
-                        self.get_formatted_field_value(child, 'age') if hasattr(child, 'age') else self.empty_value,
+                        fmt(child['age']) if has_age else self.empty_value,
                     ]
-                    writer.writerow(row)
+                    yield row
                     no += 1
     
-    def _export_training_detailed(self, employees, writer):
-        """Export training data in detailed format."""
-        headers = ['No', 'NRP', 'Nama Karyawan', 'Nama Pelatihan', 'Jenis',
-                   'Metode', 'Tgl Mulai', 'Tgl Selesai']
-        writer.writerow(headers)
+    def _export_training_detailed(self, employees):
+        """Export training data in detailed format. Yields row data."""
+        records_by_emp = self._read_related(
+            employees, 'training_certificate_ids',
+            ['name', 'jenis_pelatihan', 'metode', 'date_start', 'date_end'])
+        fmt = self._format_read_value
         
         no = 1
         for emp in employees:
-            if hasattr(emp, 'training_certificate_ids') and emp.training_certificate_ids:
-                for training in emp.training_certificate_ids:
-                    date_start = self.get_field_value(training, 'date_start')
-                    date_end = self.get_field_value(training, 'date_end')
-                    
+            records = records_by_emp.get(emp.id)
+            if records:
+                emp_nrp = self.get_formatted_field_value(emp, 'nrp')
+                emp_name = self.get_formatted_field_value(emp, 'name')
+                for training in records:
                     row = [
                         no,
-                        self.get_formatted_field_value(emp, 'nrp'),
-                        self.get_formatted_field_value(emp, 'name'),
-                        self.get_formatted_field_value(training, 'name'),
-                        self.get_formatted_field_value(training, 'jenis_pelatihan'),
-                        self.get_formatted_field_value(training, 'metode'),
-                        date_start.strftime('%d/%m/%Y') if date_start else self.empty_value,
-                        date_end.strftime('%d/%m/%Y') if date_end else self.empty_value,
+                        emp_nrp,
+                        emp_name,
+                        fmt(training.get('name')),
+                        fmt(training.get('jenis_pelatihan')),
+                        fmt(training.get('metode')),
+                        self._format_date(training.get('date_start')),
+                        self._format_date(training.get('date_end')),
                     ]
-                    writer.writerow(row)
+                    yield row
                     no += 1
     
-    def _export_rp_detailed(self, employees, writer):
-        """Export reward/punishment data in detailed format."""
-        headers = ['No', 'NRP', 'Nama Karyawan', 'Tipe', 'Kategori',
-                   'Tanggal', 'Keterangan']
-        writer.writerow(headers)
+    def _export_rp_detailed(self, employees):
+        """Export reward/punishment data in detailed format. Yields row data."""
+        records_by_emp = self._read_related(
+            employees, 'reward_punishment_ids',
+            ['type', 'reward_category', 'punishment_category', 'date', 'description'])
         
         no = 1
         for emp in employees:
-            if hasattr(emp, 'reward_punishment_ids') and emp.reward_punishment_ids:
-                for rp in emp.reward_punishment_ids:
-                    rp_date = self.get_field_value(rp, 'date')
-                    rp_type = self.get_field_value(rp, 'type')
+            records = records_by_emp.get(emp.id)
+            if records:
+                emp_nrp = self.get_formatted_field_value(emp, 'nrp')
+                emp_name = self.get_formatted_field_value(emp, 'name')
+                for rp in records:
+                    rp_type = rp.get('type')
                     
                     # Get type label
-                    type_label = 'Reward' if rp_type == 'reward' else ('Punishment' if rp_type == 'punishment' else self.empty_value)
+                    type_label = self.RP_TYPE_LABELS.get(rp_type, self.empty_value)
                     
                     # Get category based on type
                     category = self.empty_value
                     if rp_type == 'reward':
-                        reward_cat = self.get_field_value(rp, 'reward_category')
+                        reward_cat = rp.get('reward_category')
                         if reward_cat:
-                            category_map = {
-                                'gathering': 'Gathering',
-                                'program_sekolah': 'Program Sekolah',
-                                'program_yayasan': 'Program Yayasan',
-                            }
-                            category = category_map.get(reward_cat, reward_cat)
+                            category = self.REWARD_CATEGORY_LABELS.get(reward_cat, reward_cat)
                     elif rp_type == 'punishment':
-                        punishment_cat = self.get_field_value(rp, 'punishment_category')
+                        punishment_cat = rp.get('punishment_category')
                         if punishment_cat:
-                            category_map = {
-                                'st1': 'Surat Teguran 1',
-                                'st2': 'Surat Teguran 2',
-                                'st3': 'Surat Teguran 3',
-                                'sp1': 'Surat Peringatan 1',
-                                'sp2': 'Surat Peringatan 2',
-                                'sp3': 'Surat Peringatan 3',
-                            }
-                            category = category_map.get(punishment_cat, punishment_cat)
+                            category = self.PUNISHMENT_CATEGORY_LABELS.get(punishment_cat, punishment_cat)
                     
                     row = [
                         no,
-                        self.get_formatted_field_value(emp, 'nrp'),
-                        self.get_formatted_field_value(emp, 'name'),
+                        emp_nrp,
+                        emp_name,
                         type_label,
                         category,
-                        rp_date.strftime('%d/%m/%Y') if rp_date else self.empty_value,
-                        self.get_formatted_field_value(rp, 'description'),
+                        self._format_date(rp.get('date')),
+                        self._format_read_value(rp.get('description')),
                     ]
-                    writer.writerow(row)
+                    yield row
                     no += 1
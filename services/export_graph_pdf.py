@@ -7,31 +7,95 @@ Menggunakan matplotlib untuk rendering chart ke image,
 kemudian inject ke PDF template.
 """
 
-import base64
 import logging
-import tempfile
+import multiprocessing
 import os
+import shutil
+import tempfile
+import threading
+import time
+from bisect import bisect_right
+from calendar import monthrange
+from collections import Counter, OrderedDict
+from contextlib import nullcontext
+from copy import deepcopy
 from datetime import datetime, date
 from io import BytesIO
+from pathlib import Path
 
 from odoo.exceptions import UserError
 from odoo import _
+from odoo.tools import config
 
-from .export_base import EmployeeExportBase
+from .export_base import EmployeeExportBase, HAS_WEASYPRINT
+from ._distribution_kernel import NUMBA_AVAILABLE, bucket_counts
+from ._matplotlib_loader import load_matplotlib
 from ..models.graph_registry import GRAPH_REGISTRY, CHART_COLORS
 
 _logger = logging.getLogger(__name__)
 
-# Check matplotlib availability
+# matplotlib di-import saat chart pertama di-render (lihat _load_matplotlib),
+# bukan saat module dimuat worker Odoo
+matplotlib = plt = Image = None
+HAS_MATPLOTLIB = False
+
 try:
-    import matplotlib
-    matplotlib.use('Agg')  # Use non-interactive backend
-    import matplotlib.pyplot as plt
-    import matplotlib.patches as mpatches
-    HAS_MATPLOTLIB = True
+    import numpy as np
+    NUMPY_AVAILABLE = True
 except ImportError:
-    HAS_MATPLOTLIB = False
-    _logger.warning("matplotlib not installed. Graph export will use fallback.")
+    NUMPY_AVAILABLE = False
+
+
+# (service, chart_data) untuk _render_charts_parallel; diwariskan ke proses
+# anak saat fork, dan Figure per proses anak dibuat sekali lalu dipakai ulang
+_RENDER_JOB = None
+_WORKER_FIGURE = None
+
+# Cache hasil _calc_all_distributions per proses worker (LRU):
+# {cache key: (waktu hitung, analytics data)}
+_ANALYTICS_CACHE = OrderedDict()
+_ANALYTICS_CACHE_LOCK = threading.Lock()
+
+
+def _load_matplotlib():
+    """
+    Import matplotlib dan Pillow (dependency matplotlib) jika belum.
+    
+    Returns:
+        bool: True jika matplotlib tersedia
+    """
+    global matplotlib, plt, Image, HAS_MATPLOTLIB
+    
+    if not HAS_MATPLOTLIB:
+        loaded = load_matplotlib()
+        if loaded:
+            matplotlib, plt = loaded
+            from PIL import Image
+            HAS_MATPLOTLIB = True
+    return HAS_MATPLOTLIB
+
+
+def _render_chart_job(index):
+    """
+    Task pool _render_charts_parallel: render chart ke-``index``.
+    
+    Args:
+        index (int): Index chart pada _RENDER_JOB
+        
+    Returns:
+        bytes: Image data, atau None jika gagal
+    """
+    global _WORKER_FIGURE
+    
+    service, chart_data = _RENDER_JOB
+    if _WORKER_FIGURE is None:
+        _WORKER_FIGURE = plt.figure(
+            figsize=service._effective_figure_size, dpi=service._effective_dpi
+        )
+    
+    graph, data = chart_data[index]
+    with service._chart_rc_context():
+        return service._render_chart_image(graph, data, _WORKER_FIGURE)
 
 
 class EmployeeExportGraphPdf(EmployeeExportBase):
@@ -45,11 +109,91 @@ class EmployeeExportGraphPdf(EmployeeExportBase):
     - Cover page dan summary
     """
     
+    # Kelompok usia (tahun) dan masa kerja; batas bawah kelompok ke-2 dst.
+    AGE_GROUPS = ('< 25', '25-34', '35-44', '45-54', '≥ 55')
+    AGE_GROUP_EDGES = (25, 35, 45, 55)
+    TENURE_GROUPS = ('< 1 tahun', '1-3 tahun', '3-5 tahun', '5-10 tahun', '> 10 tahun')
+    TENURE_GROUP_EDGES = (1, 3, 5, 10)
+    
+    # Label chart agama dan status pernikahan; nilai lain memakai .title()
+    RELIGION_MAP = {
+        'islam': 'Islam',
+        'kristen': 'Kristen',
+        'katolik': 'Katolik',
+        'hindu': 'Hindu',
+        'budha': 'Buddha',
+        'konghucu': 'Konghucu',
+    }
+    MARITAL_MAP = {
+        'single': 'Lajang',
+        'married': 'Menikah',
+        'cohabitant': 'Tinggal Bersama',
+        'widower': 'Duda/Janda',
+        'divorced': 'Cerai',
+    }
+    
+    # Key data analytics yang bisa dihitung _calc_all_distributions
+    ANALYTICS_KEYS = (
+        'gender', 'age', 'department', 'religion', 'marital', 'employment_status',
+        'tenure', 'education', 'golongan', 'grade', 'training_type',
+        'training_method', 'kpi',
+    )
+    
+    # Kode grafik -> key data analytics yang dipakai chart
+    CHART_DATA_KEYS = {
+        'G01': 'gender',
+        'G02': 'age',
+        'G03': 'religion',
+        'G04': 'marital',
+        'G06': 'department',
+        'G08': 'golongan',
+        'G09': 'grade',
+        'G10': 'employment_status',
+        'G13': 'tenure',
+        'G14': 'tenure',  # Trend uses same data
+        'G16': 'education',
+        'G20': 'training_type',
+        'G21': 'training_method',
+    }
+    
+    # Jumlah nilai minimal untuk memakai kernel numba pada _bucket_counts (di
+    # bawah ini overhead pemanggilan kernel tidak sebanding)
+    NUMBA_MIN_VALUES = 5000
+    
+    # Render chart paralel (proses anak) mulai jumlah chart ini, dengan
+    # maksimal MAX_RENDER_PROCESSES proses
+    PARALLEL_MIN_CHARTS = 4
+    MAX_RENDER_PROCESSES = 4
+    
+    # Format image chart (options['image_format']) dan pil_kwargs savefig-nya;
+    # JPEG jauh lebih kecil dan cepat di-encode untuk chart berwarna solid
+    CHART_IMAGE_FORMATS = {
+        'jpg': {'quality': 85, 'optimize': True},
+        'png': {},
+    }
+    DEFAULT_IMAGE_FORMAT = 'jpg'
+    
+    # (DPI, ukuran figure inches) per layout_type, disesuaikan dengan lebar
+    # chart-box di HTML; layout lain memakai self.dpi dan self.figure_size
+    LAYOUT_CHART_SIZES = {
+        'single_column': (120, (8, 6)),
+        'two_columns': (90, (6, 4)),
+        'executive_summary': (90, (6, 4)),
+    }
+    
+    # Cache analytics: umur maksimal (detik) dan jumlah entri per proses
+    ANALYTICS_CACHE_TTL = 300
+    ANALYTICS_CACHE_SIZE = 32
+    
     def __init__(self, env):
         """Initialize graph PDF export service."""
         super().__init__(env)
         self.dpi = 150  # DPI untuk grafik
         self.figure_size = (8, 6)  # Ukuran default grafik (inches)
+        self.image_format = self.DEFAULT_IMAGE_FORMAT  # Format image grafik
+        # DPI dan ukuran yang dipakai render, diset _render_charts per layout
+        self._effective_dpi = self.dpi
+        self._effective_figure_size = self.figure_size
     
     def export(self, employees, graphs, options=None):
         """
@@ -72,11 +216,12 @@ class EmployeeExportGraphPdf(EmployeeExportBase):
             raise UserError(_('Minimal 1 grafik harus dipilih!'))
         
         try:
-            # Get analytics data
-            analytics_data = self._get_analytics_data(employees)
+            # Get analytics data (hanya yang dipakai grafik/summary terpilih)
+            needed = self._get_needed_analytics(graphs, options)
+            analytics_data = self._get_analytics_data(employees, needed)
             
             # Render charts to images
-            chart_images = self._render_charts(graphs, analytics_data)
+            chart_images = self._render_charts(graphs, analytics_data, options)
             
             # Generate PDF
             pdf_content = self._generate_pdf(employees, graphs, chart_images, analytics_data, options)
@@ -88,393 +233,632 @@ class EmployeeExportGraphPdf(EmployeeExportBase):
             return pdf_content, filename
             
         except Exception as e:
-            _logger.error(f"Error exporting graph PDF: {str(e)}")
+            _logger.error("Error exporting graph PDF: %s", e)
             raise
     
-    def _get_analytics_data(self, employees):
+    def _get_needed_analytics(self, graphs, options):
         """
-        Mengambil data analytics dari employees.
+        Key data analytics yang dipakai grafik terpilih dan summary.
         
         Args:
-            employees: hr.employee recordset
+            graphs: List of graph definitions
+            options: Dict with export options
             
         Returns:
-            dict: Data analytics untuk semua chart
+            set: Key ANALYTICS_KEYS
         """
-        Analytics = self.env['hr.employee.analytics']
-        
-        # Get basic analytics
-        data = {
-            'total': len(employees),
-            'active': len(employees.filtered(lambda e: e.active)),
+        needed = {
+            self.CHART_DATA_KEYS[graph['code']]
+            for graph in graphs if graph['code'] in self.CHART_DATA_KEYS
         }
+        if options.get('include_summary', True):
+            needed.add('kpi')
+        return needed
+    
+    def _get_analytics_data(self, employees, needed=None):
+        """
+        Mengambil data analytics dari employees.
         
-        # Gender distribution
-        data['gender'] = self._calc_gender_distribution(employees)
-        
-        # Age distribution
-        data['age'] = self._calc_age_distribution(employees)
-        
-        # Department distribution
-        data['department'] = self._calc_department_distribution(employees)
-        
-        # Religion distribution
-        data['religion'] = self._calc_religion_distribution(employees)
-        
-        # Marital status distribution
-        data['marital'] = self._calc_marital_distribution(employees)
-        
-        # Employment status
-        data['employment_status'] = self._calc_employment_status(employees)
-        
-        # Tenure distribution
-        data['tenure'] = self._calc_tenure_distribution(employees)
-        
-        # Education distribution
-        data['education'] = self._calc_education_distribution(employees)
-        
-        # Golongan distribution
-        data['golongan'] = self._calc_golongan_distribution(employees)
-        
-        # Grade distribution
-        data['grade'] = self._calc_grade_distribution(employees)
+        Hasil di-cache per proses (lihat _ANALYTICS_CACHE) sehingga export
+        berulang untuk karyawan yang sama tidak menghitung ulang semua
+        distribusi. Key memuat database, user, ID karyawan, key analytics
+        yang diminta, tanggal hari ini dan write_date terakhir karyawan;
+        entri kedaluwarsa setelah ANALYTICS_CACHE_TTL detik.
         
-        # Training type
-        data['training_type'] = self._calc_training_type_distribution(employees)
+        Args:
+            employees: hr.employee recordset
+            needed (set): Key ANALYTICS_KEYS yang dihitung; None untuk semua
+            
+        Returns:
+            dict: Data analytics untuk chart
+        """
+        if needed is None:
+            needed = set(self.ANALYTICS_KEYS)
+        today = date.today()
+        last_write = max(
+            (row['write_date'] for row in employees.read(['write_date']) if row.get('write_date')),
+            default=False,
+        )
+        key = (
+            self.env.cr.dbname, self.env.uid, tuple(sorted(employees.ids)),
+            frozenset(needed), today, last_write,
+        )
+        now = time.monotonic()
+        
+        with _ANALYTICS_CACHE_LOCK:
+            cached = _ANALYTICS_CACHE.get(key)
+            if cached and now - cached[0] < self.ANALYTICS_CACHE_TTL:
+                _ANALYTICS_CACHE.move_to_end(key)
+                return deepcopy(cached[1])
+        
+        analytics_data = self._calc_all_distributions(employees, today, needed)
+        
+        with _ANALYTICS_CACHE_LOCK:
+            _ANALYTICS_CACHE[key] = (now, deepcopy(analytics_data))
+            _ANALYTICS_CACHE.move_to_end(key)
+            while len(_ANALYTICS_CACHE) > self.ANALYTICS_CACHE_SIZE:
+                _ANALYTICS_CACHE.popitem(last=False)
+        
+        return analytics_data
+    
+    def _calc_all_distributions(self, employees, today, needed=None):
+        """
+        Hitung distribusi dan KPI karyawan.
         
-        # Training method
-        data['training_method'] = self._calc_training_method_distribution(employees)
+        Distribusi kategori (gender, status, departemen, agama, status
+        pernikahan, golongan, grade, pelatihan) dihitung di database dengan
+        read_group (lihat _count_groups). Usia, masa kerja dan pendidikan
+        memerlukan nilai per karyawan: field-nya dibaca dengan satu
+        ``read()`` dan diagregasi dalam satu kali iterasi. Ketersediaan field
+        opsional dicek sekali dari ``_fields``, bukan per karyawan. Field,
+        relasi dan distribusi yang tidak ada di ``needed`` tidak
+        dibaca/dihitung.
         
-        # KPI summary
-        data['kpi'] = self._calc_kpi_summary(employees)
+        Args:
+            employees: hr.employee recordset
+            today (date): Tanggal acuan usia dan masa kerja
+            needed (set): Key ANALYTICS_KEYS yang dihitung; None untuk semua
+            
+        Returns:
+            dict: Data analytics: 'total', 'active' dan key dari ``needed``
+                (format sama dengan _get_analytics_data)
+        """
+        if needed is None:
+            needed = set(self.ANALYTICS_KEYS)
+        
+        model_fields = employees._fields
+        need_gender = 'gender' in needed
+        need_kpi = 'kpi' in needed
+        need_age = 'age' in needed or need_kpi
+        need_tenure = ('tenure' in needed or need_kpi) and 'first_contract_date' in model_fields
+        need_religion = 'religion' in needed and 'religion' in model_fields
+        need_marital = 'marital' in needed
+        need_education = 'education' in needed and 'education_ids' in model_fields
+        need_golongan = 'golongan' in needed and 'golongan_id' in model_fields
+        need_grade = 'grade' in needed and 'grade_id' in model_fields
+        need_training = (
+            ('training_type' in needed or 'training_method' in needed)
+            and 'training_certificate_ids' in model_fields
+        )
+        
+        # Karyawan non-aktif ikut dihitung (active_test=False)
+        employee_model = employees.with_context(active_test=False)
+        employee_domain = [('id', 'in', employees.ids)]
+        
+        read_fields = ['active']
+        for field_name, field_needed in (
+            ('birthday', need_age),
+            ('first_contract_date', need_tenure),
+            ('education_ids', need_education),
+        ):
+            if field_needed and field_name in model_fields:
+                read_fields.append(field_name)
+        rows = employees.read(read_fields) if len(read_fields) > 1 else []
+        
+        certificates = self._read_related_values(employees, 'education_ids', 'certificate') if need_education else {}
         
-        return data
-    
-    def _calc_gender_distribution(self, employees):
-        """Hitung distribusi gender."""
-        male = len(employees.filtered(lambda e: e.gender == 'male'))
-        female = len(employees.filtered(lambda e: e.gender == 'female'))
-        other = len(employees) - male - female
+        edu_order = ['SD', 'SMP', 'SMA/SMK', 'D1', 'D2', 'D3', 'D4/S1', 'S2', 'S3']
         
-        return {
-            'labels': ['Pria', 'Wanita', 'Lainnya'] if other > 0 else ['Pria', 'Wanita'],
-            'data': [male, female, other] if other > 0 else [male, female],
-        }
-    
-    def _calc_age_distribution(self, employees):
-        """Hitung distribusi usia."""
-        from dateutil.relativedelta import relativedelta
-        today = date.today()
+        edu_count = {level: 0 for level in edu_order}
+        # Tanggal lahir/masuk dikumpulkan, lalu dikelompokkan sekaligus
+        birthdays = []
+        birthday_active = []
+        join_dates = []
+        join_date_active = []
+        
+        for row in rows:
+            active = row['active']
+            
+            # Usia
+            birthday = row['birthday'] if need_age else None
+            if birthday:
+                birthdays.append(birthday)
+                birthday_active.append(active)
+            
+            # Masa kerja
+            join_date = row['first_contract_date'] if need_tenure else None
+            if join_date:
+                join_dates.append(join_date)
+                join_date_active.append(active)
+            
+            # Pendidikan: sertifikat pertama yang dikenali
+            if need_education:
+                for edu_id in row['education_ids']:
+                    cert = certificates[edu_id]
+                    if cert in edu_count:
+                        edu_count[cert] += 1
+                        break
         
-        age_groups = {
-            '< 25': 0,
-            '25-34': 0,
-            '35-44': 0,
-            '45-54': 0,
-            '≥ 55': 0,
+        total = len(employees)
+        active_total = sum(
+            count for active, count in self._count_groups(employee_model, employee_domain, 'active')
+            if active
+        )
+        result = {
+            'total': total,
+            'active': active_total,
         }
         
-        for emp in employees:
-            if emp.birthday:
-                age = relativedelta(today, emp.birthday).years
-                if age < 25:
-                    age_groups['< 25'] += 1
-                elif age < 35:
-                    age_groups['25-34'] += 1
-                elif age < 45:
-                    age_groups['35-44'] += 1
-                elif age < 55:
-                    age_groups['45-54'] += 1
-                else:
-                    age_groups['≥ 55'] += 1
-        
-        return {
-            'labels': list(age_groups.keys()),
-            'data': list(age_groups.values()),
-        }
+        if need_gender:
+            gender_count = dict(self._count_groups(employee_model, employee_domain, 'gender'))
+            male = gender_count.get('male', 0)
+            female = gender_count.get('female', 0)
+            other = total - male - female
+            result['gender'] = {
+                'labels': ['Pria', 'Wanita', 'Lainnya'] if other > 0 else ['Pria', 'Wanita'],
+                'data': [male, female, other] if other > 0 else [male, female],
+            }
+        
+        # Usia dibulatkan ke arah nol seperti relativedelta.years
+        age_months = self._elapsed_months_many(birthdays, today)
+        tenure_months = self._elapsed_months_many(join_dates, today)
+        if NUMPY_AVAILABLE:
+            age_years = (age_months / 12).astype(np.int64)
+            tenure_years = tenure_months / 12
+        else:
+            age_years = [int(months / 12) for months in age_months]
+            tenure_years = [months / 12 for months in tenure_months]
+        
+        if 'age' in needed:
+            result['age'] = {
+                'labels': list(self.AGE_GROUPS),
+                'data': self._bucket_counts(age_years, self.AGE_GROUP_EDGES),
+            }
+        
+        # Distribusi kategori: hasil read_group digabung per label dengan
+        # Counter; urutan label mengikuti urutan grup read_group
+        if 'department' in needed:
+            dept_count = Counter()
+            for name, count in self._count_groups(employee_model, employee_domain, 'department_id'):
+                dept_count[name or 'Tidak Ada'] += count
+            # Departemen: urut jumlah terbanyak, maksimal 10
+            sorted_depts = dept_count.most_common(10)
+            result['department'] = {
+                'labels': [d[0] for d in sorted_depts],
+                'data': [d[1] for d in sorted_depts],
+            }
+        
+        if 'religion' in needed:
+            religion_count = Counter()
+            if need_religion:
+                for religion, count in self._count_groups(employee_model, employee_domain, 'religion'):
+                    if religion:
+                        religion_count[self.RELIGION_MAP.get(religion, religion.title())] += count
+            result['religion'] = {
+                'labels': list(religion_count.keys()) or ['Tidak Ada Data'],
+                'data': list(religion_count.values()) or [0],
+            }
+        
+        if need_marital:
+            marital_count = Counter()
+            for marital, count in self._count_groups(employee_model, employee_domain, 'marital'):
+                marital = marital or 'single'
+                marital_count[self.MARITAL_MAP.get(marital, marital.title())] += count
+            result['marital'] = {
+                'labels': list(marital_count.keys()),
+                'data': list(marital_count.values()),
+            }
+        
+        if 'employment_status' in needed:
+            result['employment_status'] = {
+                'labels': ['Aktif', 'Non-aktif'],
+                'data': [active_total, total - active_total],
+            }
+        
+        if 'tenure' in needed:
+            result['tenure'] = {
+                'labels': list(self.TENURE_GROUPS),
+                'data': self._bucket_counts(tenure_years, self.TENURE_GROUP_EDGES),
+            }
+        
+        if 'education' in needed:
+            # Pendidikan: hanya jenjang yang ada datanya
+            edu_filtered = {k: v for k, v in edu_count.items() if v > 0}
+            result['education'] = {
+                'labels': list(edu_filtered.keys()) or ['Tidak Ada Data'],
+                'data': list(edu_filtered.values()) or [0],
+            }
+        
+        if 'golongan' in needed:
+            gol_count = Counter()
+            if need_golongan:
+                for name, count in self._count_groups(employee_model, employee_domain, 'golongan_id'):
+                    if name:
+                        gol_count[name] += count
+            result['golongan'] = {
+                'labels': list(gol_count.keys()) or ['Tidak Ada Data'],
+                'data': list(gol_count.values()) or [0],
+            }
+        
+        if 'grade' in needed:
+            grade_count = Counter()
+            if need_grade:
+                for name, count in self._count_groups(employee_model, employee_domain, 'grade_id'):
+                    if name:
+                        grade_count[name] += count
+            result['grade'] = {
+                'labels': list(grade_count.keys()) or ['Tidak Ada Data'],
+                'data': list(grade_count.values()) or [0],
+            }
+        
+        training_model = training_domain = None
+        if need_training:
+            training_field = model_fields['training_certificate_ids']
+            training_model = self.env[training_field.comodel_name]
+            training_domain = [(training_field.inverse_name, 'in', employees.ids)]
+        if 'training_type' in needed:
+            type_count = Counter()
+            if need_training:
+                for value, count in self._count_groups(training_model, training_domain, 'jenis_pelatihan'):
+                    type_count[value or 'Lainnya'] += count
+            result['training_type'] = {
+                'labels': list(type_count.keys()) or ['Tidak Ada Data'],
+                'data': list(type_count.values()) or [0],
+            }
+        if 'training_method' in needed:
+            method_count = Counter()
+            if need_training:
+                for value, count in self._count_groups(training_model, training_domain, 'metode'):
+                    method_count[value or 'Lainnya'] += count
+            result['training_method'] = {
+                'labels': list(method_count.keys()) or ['Tidak Ada Data'],
+                'data': list(method_count.values()) or [0],
+            }
+        
+        if need_kpi:
+            # Rata-rata hanya untuk karyawan aktif
+            avg_age = self._mean_where(age_years, birthday_active)
+            avg_tenure = self._mean_where(tenure_years, join_date_active)
+            result['kpi'] = {
+                'total': total,
+                'active': active_total,
+                'inactive': total - active_total,
+                'avg_age': round(avg_age, 1),
+                'avg_tenure': round(avg_tenure, 1),
+            }
+        
+        return result
     
-    def _calc_department_distribution(self, employees):
-        """Hitung distribusi per departemen."""
-        dept_count = {}
-        for emp in employees:
-            dept_name = emp.department_id.name if emp.department_id else 'Tidak Ada'
-            dept_count[dept_name] = dept_count.get(dept_name, 0) + 1
+    def _elapsed_months(self, start, today, today_is_month_end):
+        """
+        Jumlah bulan penuh dari ``start`` sampai ``today``.
         
-        # Sort by count descending, limit top 10
-        sorted_depts = sorted(dept_count.items(), key=lambda x: x[1], reverse=True)[:10]
+        Hasil sama dengan ``years * 12 + months`` dari
+        ``relativedelta(today, start)``, tetapi dengan aritmetika integer.
+        Seperti relativedelta, tanggal akhir bulan dianggap genap sebulan
+        untuk tanggal mulai yang lebih besar (mis. 31 Jan -> 28 Feb).
         
-        return {
-            'labels': [d[0] for d in sorted_depts],
-            'data': [d[1] for d in sorted_depts],
-        }
+        Args:
+            start (date): Tanggal mulai (tanggal lahir/masuk)
+            today (date): Tanggal acuan
+            today_is_month_end (bool): True jika ``today`` hari terakhir bulan
+            
+        Returns:
+            int: Jumlah bulan (negatif jika ``start`` setelah ``today``)
+        """
+        if start > today:
+            # Jarang (tanggal di masa depan); pakai relativedelta apa adanya
+            from dateutil.relativedelta import relativedelta
+            delta = relativedelta(today, start)
+            return delta.years * 12 + delta.months
+        
+        months = (today.year - start.year) * 12 + today.month - start.month
+        if today.day < start.day and not today_is_month_end:
+            months -= 1
+        return months
     
-    def _calc_religion_distribution(self, employees):
-        """Hitung distribusi agama."""
-        religion_map = {
-            'islam': 'Islam',
-            'kristen': 'Kristen',
-            'katolik': 'Katolik',
-            'hindu': 'Hindu',
-            'budha': 'Buddha',
-            'konghucu': 'Konghucu',
-        }
+    def _elapsed_months_many(self, dates, today):
+        """
+        _elapsed_months untuk banyak tanggal sekaligus.
         
-        religion_count = {}
-        for emp in employees:
-            religion = getattr(emp, 'religion', False)
-            if religion:
-                label = religion_map.get(religion, religion.title())
-                religion_count[label] = religion_count.get(label, 0) + 1
+        Dengan numpy, komponen tanggal diambil dari array ``datetime64`` dan
+        selisih bulan dihitung vektor; tanggal setelah ``today`` (jarang)
+        tetap lewat _elapsed_months.
         
-        return {
-            'labels': list(religion_count.keys()) or ['Tidak Ada Data'],
-            'data': list(religion_count.values()) or [0],
-        }
+        Args:
+            dates (list): Tanggal mulai (date)
+            today (date): Tanggal acuan
+            
+        Returns:
+            numpy.ndarray|list: Jumlah bulan per tanggal (int), array jika
+                numpy tersedia
+        """
+        today_is_month_end = today.day == monthrange(today.year, today.month)[1]
+        if not NUMPY_AVAILABLE:
+            return [self._elapsed_months(start, today, today_is_month_end) for start in dates]
+        
+        starts = np.array(dates, dtype='datetime64[D]')
+        start_months = starts.astype('datetime64[M]')
+        years = start_months.astype(np.int64) // 12 + 1970
+        months = start_months.astype(np.int64) % 12 + 1
+        days = (starts - start_months).astype(np.int64) + 1
+        
+        elapsed = (today.year - years) * 12 + today.month - months
+        if not today_is_month_end:
+            elapsed -= today.day < days
+        
+        future = np.flatnonzero(starts > np.datetime64(today))
+        for idx in future:
+            elapsed[idx] = self._elapsed_months(dates[idx], today, today_is_month_end)
+        return elapsed
     
-    def _calc_marital_distribution(self, employees):
-        """Hitung distribusi status pernikahan."""
-        marital_map = {
-            'single': 'Lajang',
-            'married': 'Menikah',
-            'cohabitant': 'Tinggal Bersama',
-            'widower': 'Duda/Janda',
-            'divorced': 'Cerai',
-        }
+    def _mean_where(self, values, mask):
+        """
+        Rata-rata nilai yang flag-nya True.
         
-        marital_count = {}
-        for emp in employees:
-            marital = emp.marital or 'single'
-            label = marital_map.get(marital, marital.title())
-            marital_count[label] = marital_count.get(label, 0) + 1
+        Args:
+            values: Nilai (list atau array numpy)
+            mask (list): Flag per nilai
+            
+        Returns:
+            float: Rata-rata, 0 jika tidak ada nilai yang dipilih
+        """
+        if NUMPY_AVAILABLE:
+            selected = np.asarray(values)[np.asarray(mask, dtype=bool)]
+            return float(selected.mean()) if selected.size else 0
         
-        return {
-            'labels': list(marital_count.keys()),
-            'data': list(marital_count.values()),
-        }
+        selected = [value for value, flag in zip(values, mask) if flag]
+        return sum(selected) / len(selected) if selected else 0
     
-    def _calc_employment_status(self, employees):
-        """Hitung distribusi status kepegawaian."""
-        status_count = {'Aktif': 0, 'Non-aktif': 0}
+    def _bucket_counts(self, values, edges):
+        """
+        Hitung jumlah nilai per kelompok.
         
-        for emp in employees:
-            if emp.active:
-                status_count['Aktif'] += 1
-            else:
-                status_count['Non-aktif'] += 1
+        Nilai dalam jumlah besar (>= NUMBA_MIN_VALUES) dihitung dengan kernel
+        numba jika tersedia, selain itu dengan searchsorted/bincount numpy.
         
-        return {
-            'labels': list(status_count.keys()),
-            'data': list(status_count.values()),
-        }
+        Args:
+            values: Nilai (list atau array numpy)
+            edges (tuple): Batas bawah kelompok ke-2 dst., urut naik
+            
+        Returns:
+            list: Jumlah per kelompok (len(edges) + 1 elemen)
+        """
+        if NUMBA_AVAILABLE and len(values) >= self.NUMBA_MIN_VALUES:
+            return bucket_counts(
+                np.asarray(values, dtype=np.float64), np.asarray(edges, dtype=np.float64)
+            ).tolist()
+        
+        if NUMPY_AVAILABLE:
+            groups = np.searchsorted(edges, values, side='right')
+            return np.bincount(groups, minlength=len(edges) + 1).tolist()
+        
+        counts = [0] * (len(edges) + 1)
+        for value in values:
+            counts[bisect_right(edges, value)] += 1
+        return counts
     
-    def _calc_tenure_distribution(self, employees):
-        """Hitung distribusi masa kerja."""
-        from dateutil.relativedelta import relativedelta
-        today = date.today()
-        
-        tenure_groups = {
-            '< 1 tahun': 0,
-            '1-3 tahun': 0,
-            '3-5 tahun': 0,
-            '5-10 tahun': 0,
-            '> 10 tahun': 0,
-        }
+    def _count_groups(self, model, domain, field_name):
+        """
+        Hitung record per nilai ``field_name`` dengan read_group (GROUP BY di
+        database).
         
-        for emp in employees:
-            join_date = getattr(emp, 'first_contract_date', None)
+        Args:
+            model: Model yang dihitung
+            domain (list): Domain record
+            field_name (str): Field pengelompokan
             
-            if join_date:
-                tenure = relativedelta(today, join_date)
-                years = tenure.years + (tenure.months / 12)
-                
-                if years < 1:
-                    tenure_groups['< 1 tahun'] += 1
-                elif years < 3:
-                    tenure_groups['1-3 tahun'] += 1
-                elif years < 5:
-                    tenure_groups['3-5 tahun'] += 1
-                elif years < 10:
-                    tenure_groups['5-10 tahun'] += 1
-                else:
-                    tenure_groups['> 10 tahun'] += 1
-        
-        return {
-            'labels': list(tenure_groups.keys()),
-            'data': list(tenure_groups.values()),
-        }
+        Returns:
+            list: (nilai, jumlah) sesuai urutan grup read_group; nilai
+                many2one berupa name record relasi, nilai kosong False. Jika
+                ``field_name`` tidak ada di model, semua record dihitung
+                dengan nilai None
+        """
+        field = model._fields.get(field_name)
+        if field is None:
+            count = model.search_count(domain)
+            return [(None, count)] if count else []
+        
+        groups = model.read_group(domain, [field_name], [field_name], lazy=False)
+        if field.type != 'many2one':
+            return [(group[field_name], group['__count']) for group in groups]
+        
+        # many2one dari read_group berisi display_name; chart memakai name
+        related = self.env[field.comodel_name].browse(
+            [group[field_name][0] for group in groups if group[field_name]]
+        )
+        names = {rec['id']: rec['name'] for rec in related.read(['name'])}
+        return [
+            (names[group[field_name][0]] if group[field_name] else False, group['__count'])
+            for group in groups
+        ]
     
-    def _calc_education_distribution(self, employees):
-        """Hitung distribusi tingkat pendidikan."""
-        edu_order = ['SD', 'SMP', 'SMA/SMK', 'D1', 'D2', 'D3', 'D4/S1', 'S2', 'S3']
-        edu_count = {level: 0 for level in edu_order}
-        
-        for emp in employees:
-            if hasattr(emp, 'education_ids') and emp.education_ids:
-                # Get highest education
-                for edu in emp.education_ids:
-                    cert = getattr(edu, 'certificate', '')
-                    if cert in edu_count:
-                        edu_count[cert] += 1
-                        break
-        
-        # Filter out zeros
-        filtered = {k: v for k, v in edu_count.items() if v > 0}
+    def _read_related_values(self, employees, field_name, value_field):
+        """
+        Baca satu field dari semua record relasi karyawan sekaligus.
         
-        return {
-            'labels': list(filtered.keys()) or ['Tidak Ada Data'],
-            'data': list(filtered.values()) or [0],
-        }
+        Args:
+            employees: hr.employee recordset
+            field_name (str): Field relasi di hr.employee
+            value_field (str): Field record relasi yang dibaca
+            
+        Returns:
+            dict: {id record relasi: nilai}; bernilai None untuk semua record
+                jika ``value_field`` tidak ada di model relasi
+        """
+        related = employees.mapped(field_name)
+        if value_field not in related._fields:
+            return dict.fromkeys(related.ids)
+        return {rec['id']: rec[value_field] for rec in related.read([value_field])}
     
-    def _calc_golongan_distribution(self, employees):
-        """Hitung distribusi golongan."""
-        gol_count = {}
+    def _render_charts(self, graphs, analytics_data, options=None):
+        """
+        Render semua chart ke images.
         
-        for emp in employees:
-            if hasattr(emp, 'golongan_id') and emp.golongan_id:
-                gol_name = emp.golongan_id.name
-                gol_count[gol_name] = gol_count.get(gol_name, 0) + 1
+        matplotlib di-import di sini saat pertama dipakai. Jika memenuhi
+        syarat _can_render_parallel, chart di-render paralel di proses anak;
+        jika tidak (atau pool gagal), berurutan di proses ini.
         
-        return {
-            'labels': list(gol_count.keys()) or ['Tidak Ada Data'],
-            'data': list(gol_count.values()) or [0],
-        }
-    
-    def _calc_grade_distribution(self, employees):
-        """Hitung distribusi grade."""
-        grade_count = {}
+        Args:
+            graphs: List of graph definitions
+            analytics_data: Dict data analytics
+            options: Dict with export options (image_format: 'jpg'/'png',
+                layout_type menentukan DPI dan ukuran chart)
+            
+        Returns:
+            dict: {graph_code: image bytes atau None}
+        """
+        image_format = (options or {}).get('image_format', self.DEFAULT_IMAGE_FORMAT)
+        if image_format not in self.CHART_IMAGE_FORMATS:
+            raise UserError(_('Format image grafik tidak valid: %s') % image_format)
+        self.image_format = image_format
+        
+        layout = (options or {}).get('layout_type', 'two_columns')
+        self._effective_dpi, self._effective_figure_size = self.LAYOUT_CHART_SIZES.get(
+            layout, (self.dpi, self.figure_size)
+        )
+        
+        chart_data = [
+            (graph, self._get_chart_data(graph['code'], analytics_data))
+            for graph in graphs
+        ]
+        
+        has_matplotlib = _load_matplotlib()
+        if has_matplotlib and self._can_render_parallel(len(chart_data)):
+            try:
+                return self._render_charts_parallel(chart_data)
+            except Exception as e:
+                _logger.warning("Parallel chart rendering failed, rendering serially: %s", e)
         
-        for emp in employees:
-            if hasattr(emp, 'grade_id') and emp.grade_id:
-                grade_name = emp.grade_id.name
-                grade_count[grade_name] = grade_count.get(grade_name, 0) + 1
+        chart_images = {}
         
-        return {
-            'labels': list(grade_count.keys()) or ['Tidak Ada Data'],
-            'data': list(grade_count.values()) or [0],
-        }
-    
-    def _calc_training_type_distribution(self, employees):
-        """Hitung distribusi jenis pelatihan."""
-        type_count = {}
+        # Satu Figure dipakai ulang untuk semua chart (di-clear per chart),
+        # sehingga canvas Agg dan cache font tidak dibuat ulang
+        fig = None
+        if has_matplotlib:
+            fig = plt.figure(figsize=self._effective_figure_size, dpi=self._effective_dpi)
         
-        for emp in employees:
-            if hasattr(emp, 'training_certificate_ids'):
-                for training in emp.training_certificate_ids:
-                    t_type = getattr(training, 'jenis_pelatihan', 'Lainnya') or 'Lainnya'
-                    type_count[t_type] = type_count.get(t_type, 0) + 1
+        try:
+            with self._chart_rc_context():
+                for graph, data in chart_data:
+                    chart_images[graph['code']] = self._render_chart_image(graph, data, fig)
+        finally:
+            if fig is not None:
+                plt.close(fig)
         
-        return {
-            'labels': list(type_count.keys()) or ['Tidak Ada Data'],
-            'data': list(type_count.values()) or [0],
-        }
+        return chart_images
     
-    def _calc_training_method_distribution(self, employees):
-        """Hitung distribusi metode pelatihan."""
-        method_count = {}
-        
-        for emp in employees:
-            if hasattr(emp, 'training_certificate_ids'):
-                for training in emp.training_certificate_ids:
-                    method = getattr(training, 'metode', 'Lainnya') or 'Lainnya'
-                    method_count[method] = method_count.get(method, 0) + 1
+    def _render_chart_image(self, graph, data, fig):
+        """
+        Render satu chart; error dicatat dan chart dianggap tidak tersedia.
         
-        return {
-            'labels': list(method_count.keys()) or ['Tidak Ada Data'],
-            'data': list(method_count.values()) or [0],
-        }
+        Args:
+            graph (dict): Definisi grafik
+            data (dict): Data chart
+            fig: matplotlib Figure yang dipakai ulang (None tanpa matplotlib)
+            
+        Returns:
+            bytes: Image data, atau None jika gagal/tidak tersedia
+        """
+        try:
+            if HAS_MATPLOTLIB:
+                # Render using matplotlib
+                return self._render_matplotlib_chart(graph, data, fig)
+            # Fallback: generate placeholder
+            return self._render_placeholder_chart(graph, data)
+        except Exception as e:
+            _logger.error("Error rendering chart %s: %s", graph['code'], e)
+            return None
     
-    def _calc_kpi_summary(self, employees):
-        """Hitung KPI summary."""
-        from dateutil.relativedelta import relativedelta
-        today = date.today()
-        
-        active = employees.filtered(lambda e: e.active)
+    def _can_render_parallel(self, chart_count):
+        """
+        Cek apakah chart boleh di-render paralel dengan fork.
         
-        # Average age
-        ages = []
-        for emp in active:
-            if emp.birthday:
-                ages.append(relativedelta(today, emp.birthday).years)
-        avg_age = sum(ages) / len(ages) if ages else 0
+        Hanya untuk server prefork (``workers`` > 0): worker threaded
+        menjalankan banyak thread sehingga fork tidak aman. Proses anak tidak
+        menyentuh ORM/cursor; hasilnya hanya bytes image.
         
-        # Average tenure
-        tenures = []
-        for emp in active:
-            join_date = getattr(emp, 'first_contract_date', None)
-            if join_date:
-                tenure = relativedelta(today, join_date)
-                tenures.append(tenure.years + (tenure.months / 12))
-        avg_tenure = sum(tenures) / len(tenures) if tenures else 0
-        
-        return {
-            'total': len(employees),
-            'active': len(active),
-            'inactive': len(employees) - len(active),
-            'avg_age': round(avg_age, 1),
-            'avg_tenure': round(avg_tenure, 1),
-        }
+        Args:
+            chart_count (int): Jumlah chart
+            
+        Returns:
+            bool: True jika memakai _render_charts_parallel
+        """
+        return (
+            chart_count >= self.PARALLEL_MIN_CHARTS
+            and (os.cpu_count() or 1) > 1
+            and 'fork' in multiprocessing.get_all_start_methods()
+            and bool(config.get('workers'))
+        )
     
-    def _render_charts(self, graphs, analytics_data):
+    def _render_charts_parallel(self, chart_data):
         """
-        Render semua chart ke images.
+        Render chart di pool proses anak (fork), satu task per chart.
+        
+        Service dan data chart diwariskan ke proses anak lewat fork (lihat
+        _render_chart_job), bukan di-pickle; yang dikirim balik hanya
+        bytes image.
         
         Args:
-            graphs: List of graph definitions
-            analytics_data: Dict data analytics
+            chart_data (list): List (graph, data)
             
         Returns:
-            dict: {graph_code: base64_image}
+            dict: {graph_code: image bytes atau None}
         """
-        chart_images = {}
+        global _RENDER_JOB
         
-        for graph in graphs:
-            code = graph['code']
-            chart_type = graph['chart_type']
-            
-            try:
-                # Get data for this graph
-                data = self._get_chart_data(code, analytics_data)
-                
-                if HAS_MATPLOTLIB:
-                    # Render using matplotlib
-                    img_data = self._render_matplotlib_chart(graph, data)
-                else:
-                    # Fallback: generate placeholder
-                    img_data = self._render_placeholder_chart(graph, data)
-                
-                chart_images[code] = img_data
-                
-            except Exception as e:
-                _logger.error(f"Error rendering chart {code}: {str(e)}")
-                chart_images[code] = None
+        processes = min(len(chart_data), os.cpu_count() or 1, self.MAX_RENDER_PROCESSES)
+        _RENDER_JOB = (self, chart_data)
+        try:
+            with multiprocessing.get_context('fork').Pool(processes) as pool:
+                images = pool.map(_render_chart_job, range(len(chart_data)))
+        finally:
+            _RENDER_JOB = None
         
-        return chart_images
+        return {graph['code']: image for (graph, _data), image in zip(chart_data, images)}
+    
+    def _chart_rc_context(self):
+        """
+        rcParams matplotlib selama render chart export.
+        
+        Returns:
+            Context manager (tanpa efek jika matplotlib tidak tersedia)
+        """
+        if not HAS_MATPLOTLIB:
+            return nullcontext()
+        return matplotlib.rc_context({
+            'path.simplify': True,
+            'agg.path.chunksize': 10000,
+        })
     
     def _get_chart_data(self, code, analytics_data):
         """Get chart data based on code."""
-        data_mapping = {
-            'G01': analytics_data.get('gender', {}),
-            'G02': analytics_data.get('age', {}),
-            'G03': analytics_data.get('religion', {}),
-            'G04': analytics_data.get('marital', {}),
-            'G06': analytics_data.get('department', {}),
-            'G08': analytics_data.get('golongan', {}),
-            'G09': analytics_data.get('grade', {}),
-            'G10': analytics_data.get('employment_status', {}),
-            'G13': analytics_data.get('tenure', {}),
-            'G14': analytics_data.get('tenure', {}),  # Trend uses same data
-            'G16': analytics_data.get('education', {}),
-            'G20': analytics_data.get('training_type', {}),
-            'G21': analytics_data.get('training_method', {}),
-        }
-        return data_mapping.get(code, {'labels': [], 'data': []})
+        key = self.CHART_DATA_KEYS.get(code)
+        if key is None:
+            return {'labels': [], 'data': []}
+        return analytics_data.get(key, {})
     
-    def _render_matplotlib_chart(self, graph, data):
+    def _render_matplotlib_chart(self, graph, data, fig):
         """
         Render chart menggunakan matplotlib.
         
+        Args:
+            graph (dict): Definisi grafik
+            data (dict): Data chart (labels, data)
+            fig: matplotlib Figure yang dipakai ulang; isinya di-clear dulu
+        
         Returns:
-            bytes: PNG image data
+            bytes: Image data dalam format self.image_format
         """
         code = graph['code']
         chart_type = graph['chart_type']
@@ -484,8 +868,9 @@ class EmployeeExportGraphPdf(EmployeeExportBase):
         labels = data.get('labels', [])
         values = data.get('data', [])
         
-        # Create figure
-        fig, ax = plt.subplots(figsize=self.figure_size, dpi=self.dpi)
+        # Bersihkan figure dari chart sebelumnya
+        fig.clf()
+        ax = fig.add_subplot(111)
         
         if chart_type == 'pie':
             if sum(values) > 0:
@@ -509,9 +894,7 @@ class EmployeeExportGraphPdf(EmployeeExportBase):
             ax.set_ylabel('Jumlah')
             
             # Add value labels on bars
-            for bar, val in zip(bars, values):
-                ax.text(bar.get_x() + bar.get_width()/2, bar.get_height(),
-                       str(val), ha='center', va='bottom', fontsize=9)
+            ax.bar_label(bars, labels=[str(val) for val in values], fontsize=9)
                 
         elif chart_type == 'line':
             x = range(len(labels))
@@ -524,14 +907,23 @@ class EmployeeExportGraphPdf(EmployeeExportBase):
         # Set title
         ax.set_title(title, fontsize=14, fontweight='bold', color='#714B67')
         
-        # Tight layout
-        plt.tight_layout()
+        # Tight layout sekali; tanpa bbox_inches='tight' yang mengukur dan
+        # me-render ulang figure saat disimpan
+        fig.tight_layout(pad=0.5)
         
         # Save to bytes
         buffer = BytesIO()
-        plt.savefig(buffer, format='png', dpi=self.dpi, bbox_inches='tight',
-                   facecolor='white', edgecolor='none')
-        plt.close(fig)
+        if self.image_format == 'jpg':
+            # Render canvas Agg sekali lalu encode langsung dengan Pillow
+            fig.set_facecolor('white')
+            fig.canvas.draw()
+            image = Image.frombuffer('RGBA', fig.canvas.get_width_height(),
+                                     fig.canvas.buffer_rgba(), 'raw', 'RGBA', 0, 1)
+            image.convert('RGB').save(buffer, 'JPEG', **self.CHART_IMAGE_FORMATS['jpg'])
+        else:
+            fig.savefig(buffer, format=self.image_format, dpi=self._effective_dpi,
+                        facecolor='white', edgecolor='none',
+                        pil_kwargs=dict(self.CHART_IMAGE_FORMATS[self.image_format]))
         
         buffer.seek(0)
         return buffer.getvalue()
@@ -545,20 +937,56 @@ class EmployeeExportGraphPdf(EmployeeExportBase):
         """
         Generate PDF dengan grafik.
         
+        Image chart ditulis ke direktori sementara dan direferensikan dari
+        HTML sebagai URL file://, bukan di-embed base64; direktori dihapus
+        setelah PDF jadi.
+        
         Returns:
             bytes: PDF content
         """
-        # Build HTML content
-        html = self._build_html_report(employees, graphs, chart_images, analytics_data, options)
+        tmp_dir = tempfile.mkdtemp(prefix='yhc_graph_')
+        try:
+            chart_urls = self._write_chart_files(chart_images, tmp_dir)
+            
+            # Build HTML content
+            html = self._build_html_report(employees, graphs, chart_urls, analytics_data, options)
+            
+            # Convert to PDF (WeasyPrint atau wkhtmltopdf)
+            return self._html_to_pdf(html, options)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    def _write_chart_files(self, chart_images, directory):
+        """
+        Tulis image chart ke file.
         
-        # Convert to PDF using wkhtmltopdf
-        return self._html_to_pdf(html, options)
+        Args:
+            chart_images (dict): {graph_code: image bytes atau None}
+            directory (str): Direktori tujuan
+            
+        Returns:
+            dict: {graph_code: URL file:// image}; chart tanpa image dilewati
+        """
+        chart_urls = {}
+        for code, img_data in chart_images.items():
+            if not img_data:
+                continue
+            path = os.path.join(directory, f'chart_{code}.{self.image_format}')
+            with open(path, 'wb') as f:
+                f.write(img_data)
+            chart_urls[code] = Path(path).as_uri()
+        return chart_urls
     
-    def _build_html_report(self, employees, graphs, chart_images, analytics_data, options):
-        """Build HTML report content."""
+    def _build_html_report(self, employees, graphs, chart_urls, analytics_data, options):
+        """
+        Build HTML report content.
+        
+        Args:
+            chart_urls (dict): {graph_code: URL image} dari _write_chart_files
+        """
         kpi = analytics_data.get('kpi', {})
         
-        html = f"""
+        parts = [f"""
         <!DOCTYPE html>
         <html>
         <head>
@@ -677,11 +1105,11 @@ class EmployeeExportGraphPdf(EmployeeExportBase):
             </style>
         </head>
         <body>
-        """
+        """]
         
         # Cover page
         if options.get('include_cover', True):
-            html += f"""
+            parts.append(f"""
             <div class="cover-page">
                 <div class="cover-title">{options.get('report_title', 'Laporan Analytics Karyawan')}</div>
                 <div class="cover-subtitle">{self.env.company.name}</div>
@@ -692,11 +1120,11 @@ class EmployeeExportGraphPdf(EmployeeExportBase):
                     <p>Oleh: {self.env.user.name}</p>
                 </div>
             </div>
-            """
+            """)
         
         # Summary page
         if options.get('include_summary', True):
-            html += f"""
+            parts.append(f"""
             <div class="summary-page">
                 <div class="summary-title">Ringkasan Karyawan</div>
                 <div class="kpi-grid">
@@ -718,58 +1146,80 @@ class EmployeeExportGraphPdf(EmployeeExportBase):
                     </div>
                 </div>
             </div>
-            """
+            """)
         
         # Charts
         layout = options.get('layout_type', 'two_columns')
         chart_class = 'single' if layout == 'single_column' else ''
         
-        html += '<div class="charts-container">'
+        parts.append('<div class="charts-container">')
         
         for i, graph in enumerate(graphs):
             code = graph['code']
-            img_data = chart_images.get(code)
+            img_url = chart_urls.get(code)
             
-            if img_data:
-                img_b64 = base64.b64encode(img_data).decode('utf-8')
-                html += f"""
+            if img_url:
+                parts.append(f"""
                 <div class="chart-box {chart_class}">
                     <div class="chart-title">{graph['name']}</div>
-                    <img class="chart-image" src="data:image/png;base64,{img_b64}" alt="{graph['name']}"/>
+                    <img class="chart-image" src="{img_url}" alt="{graph['name']}"/>
                     <div class="chart-description">{graph.get('description', '')}</div>
                 </div>
-                """
+                """)
             else:
-                html += f"""
+                parts.append(f"""
                 <div class="chart-box {chart_class}">
                     <div class="chart-title">{graph['name']}</div>
                     <p style="color: #999; padding: 50px;">Grafik tidak tersedia</p>
                     <div class="chart-description">{graph.get('description', '')}</div>
                 </div>
-                """
+                """)
             
             # Page break for single column layout
             if layout == 'single_column' and i < len(graphs) - 1:
-                html += '<div class="page-break"></div>'
+                parts.append('<div class="page-break"></div>')
         
-        html += '</div>'
+        parts.append('</div>')
         
         # Footer
-        html += f"""
+        parts.append(f"""
             <div class="footer">
                 <p>Dokumen ini dihasilkan oleh sistem YHC Employee Export</p>
                 <p>{self.env.company.name} - {datetime.now().strftime('%d/%m/%Y %H:%M')}</p>
             </div>
         </body>
         </html>
-        """
+        """)
         
-        return html
+        return ''.join(parts)
     
     def _html_to_pdf(self, html_content, options):
+        """
+        Convert HTML to PDF.
+        
+        Memakai WeasyPrint di dalam proses worker jika tersedia (tanpa
+        fork/exec wkhtmltopdf); jika tidak tersedia atau gagal, memakai
+        wkhtmltopdf.
+        
+        Returns:
+            bytes: PDF content
+        """
+        if HAS_WEASYPRINT:
+            try:
+                return self._html_to_pdf_weasyprint(
+                    html_content, options.get('page_orientation', 'landscape'))
+            except Exception as e:
+                _logger.warning("WeasyPrint failed, falling back to wkhtmltopdf: %s", e)
+        
+        return self._html_to_pdf_wkhtmltopdf(html_content, options)
+    
+    def _html_to_pdf_wkhtmltopdf(self, html_content, options):
         """
         Convert HTML to PDF using wkhtmltopdf.
         
+        HTML dikirim lewat stdin dan PDF dibaca dari stdout, tanpa file
+        sementara.
+        
         Returns:
             bytes: PDF content
         """
@@ -777,49 +1227,31 @@ class EmployeeExportGraphPdf(EmployeeExportBase):
         
         orientation = options.get('page_orientation', 'landscape')
         
-        # Write HTML to temp file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as f:
-            f.write(html_content)
-            html_path = f.name
-        
-        # Create temp file for PDF
-        pdf_fd, pdf_path = tempfile.mkstemp(suffix='.pdf')
-        os.close(pdf_fd)
-        
-        try:
-            # Run wkhtmltopdf
-            cmd = [
-                'wkhtmltopdf',
-                '--orientation', orientation.title(),
-                '--page-size', 'A4',
-                '--margin-top', '10mm',
-                '--margin-bottom', '10mm',
-                '--margin-left', '10mm',
-                '--margin-right', '10mm',
-                '--encoding', 'UTF-8',
-                '--enable-local-file-access',
-                '--quiet',
-                html_path,
-                pdf_path
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, timeout=120)
-            
-            if result.returncode != 0:
-                _logger.warning(f"wkhtmltopdf warning: {result.stderr.decode('utf-8', errors='ignore')}")
-            
-            # Read PDF content
-            with open(pdf_path, 'rb') as f:
-                pdf_content = f.read()
-            
-            if not pdf_content:
-                raise UserError(_('Gagal generate PDF'))
-            
-            return pdf_content
-            
-        finally:
-            # Cleanup
-            if os.path.exists(html_path):
-                os.unlink(html_path)
-            if os.path.exists(pdf_path):
-                os.unlink(pdf_path)
+        # Run wkhtmltopdf; '-' sebagai input dan output
+        cmd = [
+            'wkhtmltopdf',
+            '--orientation', orientation.title(),
+            '--page-size', 'A4',
+            '--margin-top', '10mm',
+            '--margin-bottom', '10mm',
+            '--margin-left', '10mm',
+            '--margin-right', '10mm',
+            '--encoding', 'UTF-8',
+            '--enable-local-file-access',
+            '--quiet',
+            '-',
+            '-'
+        ]
+        
+        result = subprocess.run(cmd, input=html_content.encode('utf-8'),
+                                capture_output=True, timeout=120)
+        
+        if result.returncode != 0:
+            _logger.warning("wkhtmltopdf warning: %s", result.stderr.decode('utf-8', errors='ignore'))
+        
+        pdf_content = result.stdout
+        
+        if not pdf_content:
+            raise UserError(_('Gagal generate PDF'))
+        
+        return pdf_content
@@ -6,7 +6,10 @@ Service ini menangani export data karyawan ke format JSON
 dengan fitur nested structure, pretty print, dan ISO date formatting.
 """
 
+import codecs
+import io
 import json
+import operator
 from datetime import datetime, date
 import logging
 
@@ -14,6 +17,12 @@ from .export_base import EmployeeExportBase, FIELD_MAPPINGS
 
 _logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 class DateTimeEncoder(json.JSONEncoder):
     """Custom JSON encoder untuk handle datetime objects."""
@@ -35,13 +44,69 @@ class EmployeeExportJson(EmployeeExportBase):
     - Metadata export
     """
     
+    # Field kategori identity, dibaca sekaligus oleh _read_identity_fields
+    IDENTITY_FIELDS = (
+        'nik', 'no_kk', 'gelar', 'place_of_birth', 'birthday', 'age',
+        'gender', 'religion', 'blood_type', 'status_kawin', 'alamat_ktp',
+        'alamat_domisili',
+    )
+    
+    # Field selection identity yang ditulis beserta labelnya
+    SELECTION_LABEL_FIELDS = ('gender', 'religion')
+    
+    # Field hr.employee yang dibaca per kategori (lihat _get_*_data); untuk
+    # relasi, value berisi field record relasi yang ikut di-prefetch.
+    # Identity dibaca terpisah (IDENTITY_FIELDS)
+    CATEGORY_PREFETCH = {
+        'base': {'nrp': (), 'name': ()},
+        'employment': {
+            'department_id': ('name',), 'job_id': ('name',),
+            'area_kerja_id': ('name',), 'golongan_id': ('name',),
+            'grade_id': ('name',), 'employee_type_id': ('name',),
+            'employee_category_id': ('name',), 'employment_status': (),
+            'first_contract_date': (), 'service_length': (), 'work_email': (),
+            'work_phone': (), 'mobile_phone': (),
+        },
+        'family': {
+            'status_kawin': (), 'spouse_name': (), 'spouse_nik': (),
+            'spouse_birthday': (), 'jlh_anggota_keluarga': (),
+            'child_ids': ('name', 'gender', 'birth_date', 'age', 'status'),
+        },
+        'bpjs': {
+            'bpjs_ids': ('bpjs_type', 'number', 'faskes_tk1', 'kelas', 'status'),
+        },
+        'education': {
+            'education_ids': ('certificate', 'study_school', 'major',
+                              'date_start', 'date_end'),
+        },
+        'payroll': {
+            'payroll_id': ('bank_name', 'bank_account', 'npwp', 'efin'),
+        },
+        'training': {
+            'training_certificate_ids': ('name', 'jenis_pelatihan', 'metode',
+                                         'date_start', 'date_end'),
+        },
+        'reward_punishment': {
+            'reward_punishment_ids': ('type', 'name', 'date', 'description'),
+        },
+    }
+    
     def __init__(self, env):
         """Initialize JSON export service."""
         super().__init__(env)
         self.pretty_print = True
         self.indent = 2
+        # Hilangkan key bernilai None dan blok kategori yang kosong
+        self.omit_empty = False
+        # Hasil _read_identity_fields untuk export yang sedang berjalan
+        self._identity_rows = {}
+        # {field_name: {value: label}} dari _build_selection_labels
+        self._selection_labels = {}
+        # {model_name: set(field_name)} untuk _get_value
+        self._model_fields = {}
     
-    def export(self, employees, categories=None, config=None, pretty=True):
+    def export(self, employees, categories=None, config=None, pretty=True,
+               omit_empty=False):
         """
         Export data karyawan ke format JSON.
         
@@ -50,6 +115,8 @@ class EmployeeExportJson(EmployeeExportBase):
             categories (list): List kategori yang akan di-export
             config: hr.employee.export.config (optional)
             pretty (bool): Pretty print dengan indentation
+            omit_empty (bool): Hilangkan key bernilai None dan blok
+                kategori yang kosong (payload lebih kecil)
             
         Returns:
             tuple: (bytes, filename)
@@ -60,41 +127,113 @@ class EmployeeExportJson(EmployeeExportBase):
             categories = ['identity', 'employment']
         
         self.pretty_print = pretty
+        self.omit_empty = omit_empty
         
-        # Build JSON structure
-        export_data = {
-            'metadata': self._build_metadata(employees, categories),
-            'employees': self._build_employees_data(employees, categories),
-        }
-        
-        # Convert to JSON string
-        if self.pretty_print:
-            json_str = json.dumps(export_data, cls=DateTimeEncoder, 
-                                  indent=self.indent, ensure_ascii=False)
-        else:
-            json_str = json.dumps(export_data, cls=DateTimeEncoder, 
-                                  ensure_ascii=False)
+        # Satu waktu export untuk metadata dan nama file
+        export_date = datetime.now()
         
-        # Convert to bytes
-        json_bytes = json_str.encode('utf-8')
+        # Build dan tulis JSON per karyawan
+        buf = io.BytesIO()
+        self._stream_json(
+            buf,
+            self._build_metadata(employees, categories, export_date),
+            self._iter_employees_data(employees, categories),
+            self.pretty_print,
+        )
+        json_bytes = buf.getvalue()
         
-        filename = self.generate_filename('export_karyawan', 'json')
+        filename = self.generate_filename('export_karyawan', 'json', export_date)
         
         return json_bytes, filename
     
-    def _build_metadata(self, employees, categories):
+    def _use_orjson(self, pretty):
+        """orjson dipakai jika terinstall dan format indent didukung."""
+        return ORJSON_AVAILABLE and (not pretty or self.indent == 2)
+    
+    def _stream_json(self, buf, metadata, rows, pretty=True):
+        """
+        Tulis ``{"metadata": ..., "employees": [...]}`` ke buffer per karyawan.
+        
+        Data karyawan diserialisasi satu per satu dari iterator, sehingga
+        hanya satu dict karyawan yang ada di memori. Hasilnya sama dengan
+        _dumps atas dict export utuh: untuk pretty print, newline hasil
+        serialisasi metadata/karyawan diberi indentasi sesuai level-nya
+        (newline di dalam string JSON selalu di-escape).
+        
+        Args:
+            buf: File-like biner tujuan
+            metadata (dict): Metadata export
+            rows: Iterator data karyawan (dict)
+            pretty (bool): Pretty print dengan indentation
+        """
+        if pretty:
+            unit = b' ' * self.indent
+            nl1 = b'\n' + unit
+            nl2 = nl1 + unit
+            buf.write(b'{' + nl1 + b'"metadata": ')
+            buf.write(self._dumps(metadata, pretty).replace(b'\n', nl1))
+            buf.write(b',' + nl1 + b'"employees": [')
+            first = True
+            for row in rows:
+                buf.write(nl2 if first else b',' + nl2)
+                buf.write(self._dumps(row, pretty).replace(b'\n', nl2))
+                first = False
+            buf.write(b']\n}' if first else nl1 + b']\n}')
+            return
+        
+        # Separator mengikuti serializer yang dipakai _dumps
+        item_sep, key_sep = (b',', b':') if self._use_orjson(pretty) else (b', ', b': ')
+        buf.write(b'{"metadata"' + key_sep + self._dumps(metadata, pretty))
+        buf.write(item_sep + b'"employees"' + key_sep + b'[')
+        first = True
+        for row in rows:
+            if not first:
+                buf.write(item_sep)
+            buf.write(self._dumps(row, pretty))
+            first = False
+        buf.write(b']}')
+    
+    def _dumps(self, data, pretty=True):
+        """
+        Serialisasi data export ke JSON (UTF-8).
+        
+        Memakai orjson jika terinstall: langsung menghasilkan bytes, tanpa
+        string perantara dan encode ulang. orjson hanya mendukung indent 2;
+        untuk indent lain (atau tanpa orjson) json.dump menulis potongan
+        teks yang di-encode langsung ke buffer bytes (DateTimeEncoder), tanpa
+        menyimpan seluruh JSON sebagai string terlebih dulu.
+        
+        Args:
+            data: Data export (dict/list)
+            pretty (bool): Pretty print dengan indentation
+            
+        Returns:
+            bytes: JSON content
+        """
+        if self._use_orjson(pretty):
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+        
+        buf = io.BytesIO()
+        writer = codecs.getwriter('utf-8')(buf)
+        json.dump(data, writer, cls=DateTimeEncoder,
+                  indent=self.indent if pretty else None,
+                  ensure_ascii=False)
+        return buf.getvalue()
+    
+    def _build_metadata(self, employees, categories, export_date=None):
         """
         Build metadata untuk export.
         
         Args:
             employees: hr.employee recordset
             categories (list): List kategori
+            export_date (datetime): Waktu export (default: sekarang)
             
         Returns:
             dict: Metadata
         """
         return {
-            'export_date': datetime.now().isoformat(),
+            'export_date': (export_date or datetime.now()).isoformat(),
             'exported_by': {
                 'id': self.env.user.id,
                 'name': self.env.user.name,
@@ -109,24 +248,131 @@ class EmployeeExportJson(EmployeeExportBase):
             'version': '1.0',
         }
     
-    def _build_employees_data(self, employees, categories):
+    def _iter_employees_data(self, employees, categories):
         """
-        Build data karyawan untuk export.
+        Build data karyawan untuk export, satu per satu.
         
         Args:
             employees: hr.employee recordset
             categories (list): List kategori
             
-        Returns:
-            list: List of employee data
+        Yields:
+            dict: Employee data
         """
-        employees_data = []
+        self._prefetch_categories(employees, categories)
+        self._identity_rows = {}
+        if 'identity' in categories:
+            self._identity_rows = self._read_identity_fields(employees)
+            self._selection_labels = self._build_selection_labels(employees)
         
         for emp in employees:
-            emp_data = self._build_employee_data(emp, categories)
-            employees_data.append(emp_data)
+            yield self._build_employee_data(emp, categories)
+    
+    def _prefetch_categories(self, employees, categories):
+        """
+        Isi cache ORM dengan semua field yang dibaca kategori terpilih.
+        
+        Field hr.employee dibaca dengan satu ``read()``, lalu record relasi
+        (CATEGORY_PREFETCH) dengan ``mapped()``/``read()`` atas seluruh
+        recordset, sehingga penyusunan data per karyawan tidak memicu query
+        per record.
         
-        return employees_data
+        Args:
+            employees: hr.employee recordset
+            categories (list): List kategori
+        """
+        model_fields = employees._fields
+        
+        field_names = {}
+        relations = {}
+        for key in ['base'] + list(categories):
+            for field_name, sub_fields in self.CATEGORY_PREFETCH.get(key, {}).items():
+                field_names[field_name] = True
+                if sub_fields:
+                    relations[field_name] = sub_fields
+        
+        employees.read([f for f in field_names if f in model_fields])
+        
+        for field_name, sub_fields in relations.items():
+            if field_name in model_fields:
+                related = employees.mapped(field_name)
+                related.read([f for f in sub_fields if f in related._fields])
+    
+    def _read_identity_fields(self, employees):
+        """
+        Baca field identity seluruh karyawan dengan satu ``read()``.
+        
+        Field yang tidak ada di model tidak ikut dibaca, sehingga tidak ada
+        di dict hasil (dianggap None oleh _get_identity_data).
+        
+        Args:
+            employees: hr.employee recordset
+            
+        Returns:
+            dict: {employee_id: {field_name: value}}
+        """
+        field_names = [f for f in self.IDENTITY_FIELDS if f in employees._fields]
+        return {row['id']: row for row in employees.read(field_names)}
+    
+    def _build_selection_labels(self, employees):
+        """
+        Bangun map value -> label untuk SELECTION_LABEL_FIELDS sekali per export.
+        
+        Args:
+            employees: hr.employee recordset
+            
+        Returns:
+            dict: {field_name: {value: label}}, None untuk field yang bukan
+                selection
+        """
+        labels = {}
+        for field_name in self.SELECTION_LABEL_FIELDS:
+            field = employees._fields.get(field_name)
+            selection = getattr(field, 'selection', None) if field else None
+            if selection is None:
+                labels[field_name] = None
+                continue
+            if callable(selection):
+                selection = selection(employees)
+            labels[field_name] = dict(selection)
+        return labels
+    
+    def _selection_label(self, field_name, value):
+        """
+        Label selection dari map _build_selection_labels (sama dengan
+        get_selection_label).
+        
+        Args:
+            field_name (str): Nama field selection
+            value: Nilai field
+            
+        Returns:
+            str: Label selection atau empty_value
+        """
+        if not value:
+            return self.empty_value
+        labels = self._selection_labels.get(field_name)
+        if labels is None:
+            return str(value)
+        return labels.get(value, value)
+    
+    @staticmethod
+    def _iso(value):
+        """
+        Konversi nilai hasil ``read()`` untuk JSON (sama dengan _get_value).
+        
+        Args:
+            value: Nilai field
+            
+        Returns:
+            String ISO untuk date/datetime, boolean apa adanya, selain itu
+            nilai atau None jika kosong
+        """
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        if isinstance(value, bool):
+            return value
+        return value if value else None
     
     def _build_employee_data(self, emp, categories):
         """
@@ -146,35 +392,57 @@ class EmployeeExportJson(EmployeeExportBase):
         }
         
         if 'identity' in categories:
-            data['identity'] = self._get_identity_data(emp)
+            self._set_block(data, 'identity', self._get_identity_data(emp))
         
         if 'employment' in categories:
-            data['employment'] = self._get_employment_data(emp)
+            self._set_block(data, 'employment', self._get_employment_data(emp))
         
         if 'family' in categories:
-            data['family'] = self._get_family_data(emp)
+            self._set_block(data, 'family', self._get_family_data(emp))
         
         if 'bpjs' in categories:
-            data['bpjs'] = self._get_bpjs_data(emp)
+            self._set_block(data, 'bpjs', self._get_bpjs_data(emp))
         
         if 'education' in categories:
-            data['education'] = self._get_education_data(emp)
+            self._set_block(data, 'education', self._get_education_data(emp))
         
         if 'payroll' in categories:
-            data['payroll'] = self._get_payroll_data(emp)
+            self._set_block(data, 'payroll', self._get_payroll_data(emp))
         
         if 'training' in categories:
-            data['training'] = self._get_training_data(emp)
+            self._set_block(data, 'training', self._get_training_data(emp))
         
         if 'reward_punishment' in categories:
-            data['reward_punishment'] = self._get_reward_punishment_data(emp)
+            self._set_block(data, 'reward_punishment', self._get_reward_punishment_data(emp))
         
         return data
     
+    def _set_block(self, data, key, block):
+        """
+        Tambahkan blok kategori ke data karyawan.
+        
+        Jika omit_empty aktif, key bernilai None di dalam blok dihilangkan
+        dan blok yang kosong (atau None) tidak ditambahkan.
+        
+        Args:
+            data (dict): Data karyawan
+            key (str): Nama kategori
+            block: Data kategori (dict atau None)
+        """
+        if self.omit_empty:
+            if isinstance(block, dict):
+                block = {k: v for k, v in block.items() if v is not None}
+            if not block:
+                return
+        data[key] = block
+    
     def _get_value(self, record, field_name):
         """
         Get field value dengan handling None dan konversi.
         
+        Field tanpa dot notation dicek terhadap daftar field model (sekali
+        per model), tanpa try/except per field.
+        
         Args:
             record: Odoo record
             field_name (str): Field name (supports dot notation)
@@ -182,44 +450,80 @@ class EmployeeExportJson(EmployeeExportBase):
         Returns:
             Value atau None
         """
-        try:
+        if '.' in field_name:
             value = self.get_field_value(record, field_name)
+        else:
+            if not record or field_name not in self._get_model_fields(record):
+                return None
+            value = getattr(record, field_name)
+        
+        return self._convert_value(value)
+    
+    def _convert_value(self, value):
+        """
+        Konversi nilai field untuk JSON (lihat _get_value).
+        
+        Args:
+            value: Nilai field
             
-            # Convert recordset to dict or id
-            if hasattr(value, '_name'):
-                return {'id': value.id, 'name': value.name} if value else None
-            
-            # Convert date/datetime
-            if isinstance(value, (date, datetime)):
-                return value.isoformat()
-            
-            # Convert boolean
-            if isinstance(value, bool):
-                return value
-            
-            # Convert to string if needed
-            return value if value else None
+        Returns:
+            Value atau None
+        """
+        # Convert recordset to dict or id
+        if hasattr(value, '_name'):
+            if len(value) != 1 or 'name' not in self._get_model_fields(value):
+                return None
+            return {'id': value.id, 'name': value.name}
+        
+        # Convert date/datetime
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        
+        # Convert boolean
+        if isinstance(value, bool):
+            return value
+        
+        # Convert to string if needed
+        return value if value else None
+    
+    def _get_model_fields(self, record):
+        """
+        Nama field model dari record, di-cache per model.
+        
+        Args:
+            record: Odoo record/recordset
             
-        except Exception:
-            return None
+        Returns:
+            set: Nama field model
+        """
+        fields = self._model_fields.get(record._name)
+        if fields is None:
+            fields = self._model_fields[record._name] = set(record._fields)
+        return fields
     
     def _get_identity_data(self, emp):
-        """Get identity data for JSON."""
+        """Get identity data for JSON (dari hasil _read_identity_fields)."""
+        rec = self._identity_rows.get(emp.id)
+        if rec is None:
+            rec = self._read_identity_fields(emp)[emp.id]
+        if not self._selection_labels:
+            self._selection_labels = self._build_selection_labels(emp)
+        iso = self._iso
         return {
-            'nik': self._get_value(emp, 'nik'),
-            'no_kk': self._get_value(emp, 'no_kk'),
-            'gelar': self._get_value(emp, 'gelar'),
-            'place_of_birth': self._get_value(emp, 'place_of_birth'),
-            'birthday': self._get_value(emp, 'birthday'),
-            'age': self._get_value(emp, 'age'),
-            'gender': self._get_value(emp, 'gender'),
-            'gender_label': self.get_selection_label(emp, 'gender'),
-            'religion': self._get_value(emp, 'religion'),
-            'religion_label': self.get_selection_label(emp, 'religion'),
-            'blood_type': self._get_value(emp, 'blood_type'),
-            'status_kawin': self._get_value(emp, 'status_kawin'),
-            'alamat_ktp': self._get_value(emp, 'alamat_ktp'),
-            'alamat_domisili': self._get_value(emp, 'alamat_domisili'),
+            'nik': iso(rec.get('nik')),
+            'no_kk': iso(rec.get('no_kk')),
+            'gelar': iso(rec.get('gelar')),
+            'place_of_birth': iso(rec.get('place_of_birth')),
+            'birthday': iso(rec.get('birthday')),
+            'age': iso(rec.get('age')),
+            'gender': iso(rec.get('gender')),
+            'gender_label': self._selection_label('gender', rec.get('gender')),
+            'religion': iso(rec.get('religion')),
+            'religion_label': self._selection_label('religion', rec.get('religion')),
+            'blood_type': iso(rec.get('blood_type')),
+            'status_kawin': iso(rec.get('status_kawin')),
+            'alamat_ktp': iso(rec.get('alamat_ktp')),
+            'alamat_domisili': iso(rec.get('alamat_domisili')),
         }
     
     def _get_employment_data(self, emp):
@@ -388,6 +692,9 @@ class EmployeeExportJson(EmployeeExportBase):
         """
         Export data karyawan menggunakan template.
         
+        Key field_mapping template (path field dengan dot notation) menjadi
+        key data per karyawan; label header tidak dipakai di JSON.
+        
         Args:
             employees: hr.employee recordset
             template: hr.employee.export.template record
@@ -397,13 +704,18 @@ class EmployeeExportJson(EmployeeExportBase):
         """
         self.validate_employees(employees)
         
-        # Parse field mapping dari template
-        field_mapping = template.get_parsed_field_mapping()
+        # Compile getter per field path template sekali untuk seluruh karyawan
+        getters = [
+            (field_path, self._compile_field_getter(employees, field_path))
+            for field_path in template.get_fields()
+        ]
+        
+        export_date = datetime.now()
         
         # Build data berdasarkan field mapping
         export_data = {
             'metadata': {
-                'export_date': datetime.now().isoformat(),
+                'export_date': export_date.isoformat(),
                 'template_name': template.name,
                 'template_code': template.template_type,
                 'total_employees': len(employees),
@@ -414,32 +726,69 @@ class EmployeeExportJson(EmployeeExportBase):
         for emp in employees:
             emp_data = {'id': emp.id}
             
-            for field_key, field_info in field_mapping.items():
-                field_name = field_info.get('field', field_key)
-                label = field_info.get('label', field_key)
-                
-                # Get value using dot notation
-                value = self._get_value(emp, field_name)
-                emp_data[field_key] = value
+            for field_path, getter in getters:
+                emp_data[field_path] = getter(emp)
             
             export_data['employees'].append(emp_data)
         
         # Convert to JSON
-        json_str = json.dumps(export_data, cls=DateTimeEncoder,
-                              indent=self.indent, ensure_ascii=False)
-        json_bytes = json_str.encode('utf-8')
+        json_bytes = self._dumps(export_data)
         
-        filename = self.generate_filename(f'export_{template.template_type}', 'json')
+        filename = self.generate_filename(f'export_{template.template_type}', 'json', export_date)
         
         return json_bytes, filename
     
-    def export_for_api(self, employees, categories=None):
+    def _compile_field_getter(self, employees, field_path):
+        """
+        Compile field path template menjadi getter untuk satu karyawan.
+        
+        Path di-resolve sekali terhadap field model: field yang tidak ada
+        menghasilkan getter yang selalu None, dan path yang hanya melewati
+        many2one dibaca dengan ``operator.attrgetter``. Path lain (misalnya
+        melewati one2many) tetap memakai _get_value. Hasilnya sama dengan
+        _get_value(emp, field_path).
+        
+        Args:
+            employees: hr.employee recordset
+            field_path (str): Path field dengan dot notation
+            
+        Returns:
+            callable: getter(emp) -> nilai JSON
+        """
+        parts = field_path.split('.')
+        fields = employees._fields
+        for part in parts[:-1]:
+            field = fields.get(part)
+            if field is None:
+                return lambda emp: None
+            if field.type != 'many2one':
+                return lambda emp: self._get_value(emp, field_path)
+            fields = self.env[field.comodel_name]._fields
+        if parts[-1] not in fields:
+            return lambda emp: None
+        
+        convert = self._convert_value
+        last_getter = operator.attrgetter(parts[-1])
+        if len(parts) == 1:
+            return lambda emp: convert(last_getter(emp))
+        
+        related_getter = operator.attrgetter('.'.join(parts[:-1]))
+        
+        def getter(emp):
+            related = related_getter(emp)
+            return convert(last_getter(related)) if related else None
+        
+        return getter
+    
+    def export_for_api(self, employees, categories=None, omit_empty=False):
         """
         Export data untuk API response (tanpa bytes conversion).
         
         Args:
             employees: hr.employee recordset
             categories (list): List kategori
+            omit_empty (bool): Hilangkan key bernilai None dan blok
+                kategori yang kosong
             
         Returns:
             dict: Export data sebagai dictionary
@@ -447,7 +796,9 @@ class EmployeeExportJson(EmployeeExportBase):
         if categories is None:
             categories = ['identity', 'employment']
         
+        self.omit_empty = omit_empty
+        
         return {
             'metadata': self._build_metadata(employees, categories),
-            'employees': self._build_employees_data(employees, categories),
+            'employees': list(self._iter_employees_data(employees, categories)),
         }
@@ -10,7 +10,7 @@ from datetime import datetime, date
 import logging
 import base64
 
-from .export_base import EmployeeExportBase, FIELD_MAPPINGS
+from .export_base import EmployeeExportBase, FIELD_MAPPINGS, HAS_WEASYPRINT
 
 _logger = logging.getLogger(__name__)
 
@@ -26,6 +26,15 @@ class EmployeeExportPdf(EmployeeExportBase):
     - Footer dengan page numbering
     """
     
+    # Escape teks untuk HTML fallback, dipakai dengan str.translate
+    # (satu pass per nilai)
+    HTML_ESCAPE_TABLE = str.maketrans({
+        '&': '&amp;',
+        '<': '&lt;',
+        '>': '&gt;',
+        '"': '&quot;',
+    })
+    
     def __init__(self, env):
         """Initialize PDF export service."""
         super().__init__(env)
@@ -55,12 +64,12 @@ class EmployeeExportPdf(EmployeeExportBase):
         # Generate PDF using report action
         try:
             pdf_content = self._generate_pdf_report(employees, report_data)
-            filename = self.generate_filename('export_karyawan', 'pdf')
+            filename = self.generate_filename('export_karyawan', 'pdf', report_data['export_date'])
             
             return pdf_content, filename
             
         except Exception as e:
-            _logger.error(f"Error generating PDF: {str(e)}")
+            _logger.error("Error generating PDF: %s", e)
             raise
     
     def _prepare_report_data(self, employees, categories):
@@ -113,8 +122,8 @@ class EmployeeExportPdf(EmployeeExportBase):
         # Get report action (ir.actions.report)
         report = self.env.ref(self.report_action_name, raise_if_not_found=False)
         
-        _logger.info(f"Attempting to generate PDF with report: {self.report_action_name}")
-        _logger.info(f"Report found: {report}, type: {report._name if report else 'None'}")
+        _logger.info("Attempting to generate PDF with report: %s", self.report_action_name)
+        _logger.info("Report found: %s, type: %s", report, report._name if report else 'None')
         
         if report and report._name == 'ir.actions.report':
             try:
@@ -126,13 +135,13 @@ class EmployeeExportPdf(EmployeeExportBase):
                 )
                 
                 if pdf_content:
-                    _logger.info(f"PDF generated successfully, size: {len(pdf_content)} bytes")
+                    _logger.info("PDF generated successfully, size: %s bytes", len(pdf_content))
                     return pdf_content
                 else:
                     _logger.warning("PDF content is empty, using fallback")
                     
             except Exception as e:
-                _logger.error(f"Error with QWeb PDF render: {str(e)}")
+                _logger.error("Error with QWeb PDF render: %s", e)
         
         # Fallback: Generate simple PDF using wkhtmltopdf directly
         _logger.info("Using fallback PDF generation")
@@ -151,7 +160,14 @@ class EmployeeExportPdf(EmployeeExportBase):
         """
         # Generate HTML
         html_content = self._generate_html(employees, report_data)
-        _logger.info(f"Generated HTML content, length: {len(html_content)} chars")
+        _logger.info("Generated HTML content, length: %s chars", len(html_content))
+        
+        # Convert HTML to PDF di dalam proses (tanpa fork/exec wkhtmltopdf)
+        if HAS_WEASYPRINT:
+            try:
+                return self._html_to_pdf_weasyprint(html_content, 'landscape')
+            except Exception as e:
+                _logger.warning("WeasyPrint failed, falling back to wkhtmltopdf: %s", e)
         
         # Convert HTML to PDF using wkhtmltopdf
         try:
@@ -187,14 +203,14 @@ class EmployeeExportPdf(EmployeeExportBase):
                 result = subprocess.run(cmd, capture_output=True, timeout=60)
                 
                 if result.returncode != 0:
-                    _logger.warning(f"wkhtmltopdf returned non-zero: {result.stderr.decode('utf-8', errors='ignore')}")
+                    _logger.warning("wkhtmltopdf returned non-zero: %s", result.stderr.decode('utf-8', errors='ignore'))
                 
                 # Read PDF content
                 with open(pdf_path, 'rb') as pdf_file:
                     pdf_content = pdf_file.read()
                 
                 if pdf_content:
-                    _logger.info(f"PDF generated via wkhtmltopdf, size: {len(pdf_content)} bytes")
+                    _logger.info("PDF generated via wkhtmltopdf, size: %s bytes", len(pdf_content))
                     return pdf_content
                 else:
                     _logger.warning("wkhtmltopdf produced empty PDF")
@@ -209,7 +225,7 @@ class EmployeeExportPdf(EmployeeExportBase):
         except FileNotFoundError:
             _logger.error("wkhtmltopdf not found, please install it")
         except Exception as e:
-            _logger.error(f"Error running wkhtmltopdf: {str(e)}")
+            _logger.error("Error running wkhtmltopdf: %s", e)
         
         # Final fallback: Return HTML as bytes (browser can still display it)
         _logger.info("Returning HTML as fallback")
@@ -227,8 +243,10 @@ class EmployeeExportPdf(EmployeeExportBase):
             str: HTML content
         """
         categories = report_data.get('categories', [])
+        esc = self.HTML_ESCAPE_TABLE
         
-        html = f"""
+        # Potongan HTML dikumpulkan di list lalu digabung sekali di akhir
+        parts = [f"""
         <!DOCTYPE html>
         <html>
         <head>
@@ -280,27 +298,27 @@ class EmployeeExportPdf(EmployeeExportBase):
         <body>
             <h1>LAPORAN DATA KARYAWAN</h1>
             <div class="info">
-                <p><strong>Tanggal Export:</strong> {datetime.now().strftime('%d/%m/%Y %H:%M')}</p>
-                <p><strong>Diekspor Oleh:</strong> {self.env.user.name}</p>
-                <p><strong>Perusahaan:</strong> {self.env.company.name}</p>
+                <p><strong>Tanggal Export:</strong> {(report_data.get('export_date') or datetime.now()).strftime('%d/%m/%Y %H:%M')}</p>
+                <p><strong>Diekspor Oleh:</strong> {str(self.env.user.name).translate(esc)}</p>
+                <p><strong>Perusahaan:</strong> {str(self.env.company.name).translate(esc)}</p>
                 <p><strong>Total Karyawan:</strong> {len(employees)}</p>
-                <p><strong>Kategori:</strong> {', '.join(report_data.get('category_names', []))}</p>
+                <p><strong>Kategori:</strong> {', '.join(report_data.get('category_names', [])).translate(esc)}</p>
             </div>
-        """
+        """]
         
         # Generate table berdasarkan kategori
         if 'identity' in categories or 'employment' in categories:
-            html += self._generate_main_table(employees, categories)
+            parts.append(self._generate_main_table(employees, categories))
         
-        html += """
+        parts.append("""
             <div class="footer">
                 <p>Dokumen ini digenerate oleh sistem YHC Employee Export</p>
             </div>
         </body>
         </html>
-        """
+        """)
         
-        return html
+        return ''.join(parts)
     
     def _generate_main_table(self, employees, categories):
         """Generate main employee table HTML."""
@@ -312,16 +330,19 @@ class EmployeeExportPdf(EmployeeExportBase):
         if 'employment' in categories:
             headers.extend(['Unit Kerja', 'Jabatan', 'Status'])
         
-        html = '<table><thead><tr>'
+        esc = self.HTML_ESCAPE_TABLE
+        
+        parts = ['<table><thead><tr>']
+        append = parts.append
         for header in headers:
-            html += f'<th>{header}</th>'
-        html += '</tr></thead><tbody>'
+            append(f'<th>{header}</th>')
+        append('</tr></thead><tbody>')
         
         for idx, emp in enumerate(employees, 1):
-            html += '<tr>'
-            html += f'<td style="text-align:center">{idx}</td>'
-            html += f'<td>{self.get_formatted_field_value(emp, "nrp")}</td>'
-            html += f'<td>{self.get_formatted_field_value(emp, "name")}</td>'
+            append('<tr>')
+            append(f'<td style="text-align:center">{idx}</td>')
+            append(f'<td>{self.get_formatted_field_value(emp, "nrp").translate(esc)}</td>')
+            append(f'<td>{self.get_formatted_field_value(emp, "name").translate(esc)}</td>')
             
             if 'identity' in categories:
                 birthday = self.get_field_value(emp, 'birthday')
@@ -329,20 +350,20 @@ class EmployeeExportPdf(EmployeeExportBase):
                 if birthday:
                     ttl += f", {birthday.strftime('%d/%m/%Y')}"
                 
-                html += f'<td>{self.get_formatted_field_value(emp, "nik")}</td>'
-                html += f'<td>{ttl}</td>'
-                html += f'<td>{self.get_selection_label(emp, "gender")}</td>'
+                append(f'<td>{self.get_formatted_field_value(emp, "nik").translate(esc)}</td>')
+                append(f'<td>{ttl.translate(esc)}</td>')
+                append(f'<td>{str(self.get_selection_label(emp, "gender")).translate(esc)}</td>')
             
             if 'employment' in categories:
-                html += f'<td>{self.get_formatted_field_value(emp, "department_id.name")}</td>'
-                html += f'<td>{self.get_formatted_field_value(emp, "job_id.name")}</td>'
-                html += f'<td>{self.get_formatted_field_value(emp, "employment_status")}</td>'
+                append(f'<td>{self.get_formatted_field_value(emp, "department_id.name").translate(esc)}</td>')
+                append(f'<td>{self.get_formatted_field_value(emp, "job_id.name").translate(esc)}</td>')
+                append(f'<td>{self.get_formatted_field_value(emp, "employment_status").translate(esc)}</td>')
             
-            html += '</tr>'
+            append('</tr>')
         
-        html += '</tbody></table>'
+        append('</tbody></table>')
         
-        return html
+        return ''.join(parts)
     
     def generate_employee_card_pdf(self, employee):
         """
@@ -370,6 +391,7 @@ class EmployeeExportPdf(EmployeeExportBase):
     
     def _generate_simple_card_pdf(self, employee):
         """Generate simple card PDF."""
+        esc = self.HTML_ESCAPE_TABLE
         html = f"""
         <!DOCTYPE html>
         <html>
@@ -400,23 +422,29 @@ class EmployeeExportPdf(EmployeeExportBase):
         <body>
             <div class="card">
                 <div class="header">
-                    <div class="company">{self.env.company.name}</div>
-                    <div class="name">{employee.name}</div>
-                    <div class="nrp">NRP: {self.get_formatted_field_value(employee, 'nrp')}</div>
+                    <div class="company">{str(self.env.company.name).translate(esc)}</div>
+                    <div class="name">{str(employee.name).translate(esc)}</div>
+                    <div class="nrp">NRP: {self.get_formatted_field_value(employee, 'nrp').translate(esc)}</div>
                 </div>
                 <div class="info">
                     <div class="label">Unit Kerja</div>
-                    <div>{self.get_formatted_field_value(employee, 'department_id.name')}</div>
+                    <div>{self.get_formatted_field_value(employee, 'department_id.name').translate(esc)}</div>
                 </div>
                 <div class="info">
                     <div class="label">Jabatan</div>
-                    <div>{self.get_formatted_field_value(employee, 'job_id.name')}</div>
+                    <div>{self.get_formatted_field_value(employee, 'job_id.name').translate(esc)}</div>
                 </div>
             </div>
         </body>
         </html>
         """
         
+        if HAS_WEASYPRINT:
+            try:
+                return self._html_to_pdf_weasyprint(html, 'portrait')
+            except Exception as e:
+                _logger.warning("WeasyPrint failed, falling back to wkhtmltopdf: %s", e)
+        
         try:
             IrActionsReport = self.env['ir.actions.report']
             pdf_content = IrActionsReport._run_wkhtmltopdf(
@@ -230,6 +230,11 @@ class EmployeeExportXlsx(EmployeeExportBase):
                    'Agama', 'Gol. Darah', 'Status Nikah', 'Alamat KTP']
         
         data_row = self._write_sheet_header(sheet, 'DATA IDENTITAS KARYAWAN', headers)
+        # Bind nilai invariant sebagai local, dipakai per cell di loop bawah
+        empty = self.empty_value
+        fmt_cell = self.formats['cell']
+        fmt_center = self.formats['cell_center']
+        fmt_date = self.formats['date']
         data_rows = []
         
         for idx, emp in enumerate(employees, 1):
@@ -252,12 +257,11 @@ class EmployeeExportXlsx(EmployeeExportBase):
             
             for col, value in enumerate(row_data):
                 if col == 7 and value:  # Tanggal Lahir
-                    sheet.write(data_row, col, value, self.formats['date'])
+                    sheet.write(data_row, col, value, fmt_date)
                 elif col == 0:  # No
-                    sheet.write(data_row, col, value, self.formats['cell_center'])
+                    sheet.write(data_row, col, value, fmt_center)
                 else:
-                    sheet.write(data_row, col, value if value else self.empty_value, 
-                               self.formats['cell'])
+                    sheet.write(data_row, col, value if value else empty, fmt_cell)
             
             data_rows.append(row_data)
             data_row += 1
@@ -273,12 +277,16 @@ class EmployeeExportXlsx(EmployeeExportBase):
                    'Status', 'Tgl Masuk', 'Masa Kerja']
         
         data_row = self._write_sheet_header(sheet, 'DATA KEPEGAWAIAN', headers)
+        empty = self.empty_value
+        fmt_cell = self.formats['cell']
+        fmt_center = self.formats['cell_center']
+        fmt_date = self.formats['date']
         data_rows = []
         
         for idx, emp in enumerate(employees, 1):
             # Get masa kerja
             service_length = self.get_field_value(emp, 'service_length')
-            masa_kerja = self._format_service_length(service_length, with_unit=True) if service_length else self.empty_value
+            masa_kerja = self._format_service_length(service_length, with_unit=True) if service_length else empty
             
             row_data = [
                 idx,
@@ -298,12 +306,11 @@ class EmployeeExportXlsx(EmployeeExportBase):
             
             for col, value in enumerate(row_data):
                 if col == 11 and value:  # Tgl Masuk
-                    sheet.write(data_row, col, value, self.formats['date'])
+                    sheet.write(data_row, col, value, fmt_date)
                 elif col == 0:  # No
-                    sheet.write(data_row, col, value, self.formats['cell_center'])
+                    sheet.write(data_row, col, value, fmt_center)
                 else:
-                    sheet.write(data_row, col, value if value else self.empty_value,
-                               self.formats['cell'])
+                    sheet.write(data_row, col, value if value else empty, fmt_cell)
             
             data_rows.append(row_data)
             data_row += 1
@@ -318,6 +325,10 @@ class EmployeeExportXlsx(EmployeeExportBase):
                    'NIK Pasangan', 'Tgl Lahir Pasangan', 'Jumlah Anak', 'Jml Anggota Keluarga']
         
         data_row = self._write_sheet_header(sheet, 'DATA KELUARGA', headers)
+        empty = self.empty_value
+        fmt_cell = self.formats['cell']
+        fmt_center = self.formats['cell_center']
+        fmt_date = self.formats['date']
         data_rows = []
         
         for idx, emp in enumerate(employees, 1):
@@ -337,12 +348,11 @@ class EmployeeExportXlsx(EmployeeExportBase):
             
             for col, value in enumerate(row_data):
                 if col == 6 and value:  # Tgl Lahir Pasangan
-                    sheet.write(data_row, col, value, self.formats['date'])
+                    sheet.write(data_row, col, value, fmt_date)
                 elif col in [0, 7, 8]:  # No, Jumlah
-                    sheet.write(data_row, col, value if value else 0, self.formats['cell_center'])
+                    sheet.write(data_row, col, value if value else 0, fmt_center)
                 else:
-                    sheet.write(data_row, col, value if value else self.empty_value,
-                               self.formats['cell'])
+                    sheet.write(data_row, col, value if value else empty, fmt_cell)
             
             data_rows.append(row_data)
             data_row += 1
@@ -360,6 +370,10 @@ class EmployeeExportXlsx(EmployeeExportBase):
                    'Tanggal Lahir', 'Usia', 'Status']
         
         data_row = self._write_sheet_header(sheet, 'DATA ANAK KARYAWAN', headers)
+        empty = self.empty_value
+        fmt_cell = self.formats['cell']
+        fmt_center = self.formats['cell_center']
+        fmt_date = self.formats['date']
         data_rows = []
         no = 1
         
@@ -371,20 +385,19 @@ class EmployeeExportXlsx(EmployeeExportBase):
                         self.get_formatted_field_value(emp, 'nrp'),
                         self.get_formatted_field_value(emp, 'name'),
                         self.get_formatted_field_value(child, 'name'),
-                        self.get_selection_label(child, 'gender') if hasattr(child, 'gender') else self.empty_value,
+                        self.get_selection_label(child, 'gender') if hasattr(child, 'gender') else empty,
                         self.get_field_value(child, 'birth_date'),
-                        self.get_formatted_field_value(child, 'age') if hasattr(child, 'age') else self.empty_value,
-                        self.get_formatted_field_value(child, 'status') if hasattr(child, 'status') else self.empty_value,
+                        self.get_formatted_field_value(child, 'age') if hasattr(child, 'age') else empty,
+                        self.get_formatted_field_value(child, 'status') if hasattr(child, 'status') else empty,
                     ]
                     
                     for col, value in enumerate(row_data):
                         if col == 5 and value:  # Tanggal Lahir
-                            sheet.write(data_row, col, value, self.formats['date'])
+                            sheet.write(data_row, col, value, fmt_date)
                         elif col == 0:
-                            sheet.write(data_row, col, value, self.formats['cell_center'])
+                            sheet.write(data_row, col, value, fmt_center)
                         else:
-                            sheet.write(data_row, col, value if value else self.empty_value,
-                                       self.formats['cell'])
+                            sheet.write(data_row, col, value if value else empty, fmt_cell)
                     
                     data_rows.append(row_data)
                     data_row += 1
@@ -400,6 +413,9 @@ class EmployeeExportXlsx(EmployeeExportBase):
                    'Faskes TK1', 'Kelas']
         
         data_row = self._write_sheet_header(sheet, 'DATA BPJS', headers)
+        empty = self.empty_value
+        fmt_cell = self.formats['cell']
+        fmt_center = self.formats['cell_center']
         data_rows = []
         no = 1
         
@@ -419,10 +435,9 @@ class EmployeeExportXlsx(EmployeeExportBase):
                     
                     for col, value in enumerate(row_data):
                         if col == 0:
-                            sheet.write(data_row, col, value, self.formats['cell_center'])
+                            sheet.write(data_row, col, value, fmt_center)
                         else:
-                            sheet.write(data_row, col, value if value else self.empty_value,
-                                       self.formats['cell'])
+                            sheet.write(data_row, col, value if value else empty, fmt_cell)
                     
                     data_rows.append(row_data)
                     data_row += 1
@@ -434,17 +449,17 @@ class EmployeeExportXlsx(EmployeeExportBase):
                     self.get_formatted_field_value(emp, 'nrp'),
                     self.get_formatted_field_value(emp, 'name'),
                     self.get_formatted_field_value(emp, 'nik'),
-                    self.empty_value,
-                    self.empty_value,
-                    self.empty_value,
-                    self.empty_value,
+                    empty,
+                    empty,
+                    empty,
+                    empty,
                 ]
                 
                 for col, value in enumerate(row_data):
                     if col == 0:
-                        sheet.write(data_row, col, value, self.formats['cell_center'])
+                        sheet.write(data_row, col, value, fmt_center)
                     else:
-                        sheet.write(data_row, col, value, self.formats['cell'])
+                        sheet.write(data_row, col, value, fmt_cell)
                 
                 data_rows.append(row_data)
                 data_row += 1
@@ -460,6 +475,9 @@ class EmployeeExportXlsx(EmployeeExportBase):
                    'Tahun Masuk', 'Tahun Lulus']
         
         data_row = self._write_sheet_header(sheet, 'DATA PENDIDIKAN', headers)
+        empty = self.empty_value
+        fmt_cell = self.formats['cell']
+        fmt_center = self.formats['cell_center']
         data_rows = []
         no = 1
         
@@ -476,18 +494,17 @@ class EmployeeExportXlsx(EmployeeExportBase):
                         self.get_formatted_field_value(edu, 'certificate'),
                         self.get_formatted_field_value(edu, 'study_school'),
                         self.get_formatted_field_value(edu, 'major'),
-                        date_start.year if date_start else self.empty_value,
-                        date_end.year if date_end else self.empty_value,
+                        date_start.year if date_start else empty,
+                        date_end.year if date_end else empty,
                     ]
                     
                     for col, value in enumerate(row_data):
                         if col == 0:
-                            sheet.write(data_row, col, value, self.formats['cell_center'])
-                        elif col in [6, 7] and value != self.empty_value:
-                            sheet.write(data_row, col, value, self.formats['cell_center'])
+                            sheet.write(data_row, col, value, fmt_center)
+                        elif col in [6, 7] and value != empty:
+                            sheet.write(data_row, col, value, fmt_center)
                         else:
-                            sheet.write(data_row, col, value if value else self.empty_value,
-                                       self.formats['cell'])
+                            sheet.write(data_row, col, value if value else empty, fmt_cell)
                     
                     data_rows.append(row_data)
                     data_row += 1
@@ -503,6 +520,9 @@ class EmployeeExportXlsx(EmployeeExportBase):
                    'NPWP', 'EFIN']
         
         data_row = self._write_sheet_header(sheet, 'DATA PAYROLL', headers)
+        empty = self.empty_value
+        fmt_cell = self.formats['cell']
+        fmt_center = self.formats['cell_center']
         data_rows = []
         
         for idx, emp in enumerate(employees, 1):
@@ -513,18 +533,17 @@ class EmployeeExportXlsx(EmployeeExportBase):
                 self.get_formatted_field_value(emp, 'nrp'),
                 self.get_formatted_field_value(emp, 'name'),
                 self.get_formatted_field_value(emp, 'nik'),
-                self.get_formatted_field_value(payroll, 'bank_name') if payroll else self.empty_value,
-                self.get_formatted_field_value(payroll, 'bank_account') if payroll else self.empty_value,
-                self.get_formatted_field_value(payroll, 'npwp') if payroll else self.empty_value,
-                self.get_formatted_field_value(payroll, 'efin') if payroll else self.empty_value,
+                self.get_formatted_field_value(payroll, 'bank_name') if payroll else empty,
+                self.get_formatted_field_value(payroll, 'bank_account') if payroll else empty,
+                self.get_formatted_field_value(payroll, 'npwp') if payroll else empty,
+                self.get_formatted_field_value(payroll, 'efin') if payroll else empty,
             ]
             
             for col, value in enumerate(row_data):
                 if col == 0:
-                    sheet.write(data_row, col, value, self.formats['cell_center'])
+                    sheet.write(data_row, col, value, fmt_center)
                 else:
-                    sheet.write(data_row, col, value if value else self.empty_value,
-                               self.formats['cell'])
+                    sheet.write(data_row, col, value if value else empty, fmt_cell)
             
             data_rows.append(row_data)
             data_row += 1
@@ -539,6 +558,10 @@ class EmployeeExportXlsx(EmployeeExportBase):
                    'Jenis', 'Metode', 'Tgl Mulai', 'Tgl Selesai']
         
         data_row = self._write_sheet_header(sheet, 'DATA PELATIHAN', headers)
+        empty = self.empty_value
+        fmt_cell = self.formats['cell']
+        fmt_center = self.formats['cell_center']
+        fmt_date = self.formats['date']
         data_rows = []
         no = 1
         
@@ -559,12 +582,11 @@ class EmployeeExportXlsx(EmployeeExportBase):
                     
                     for col, value in enumerate(row_data):
                         if col in [7, 8] and value:  # Tanggal
-                            sheet.write(data_row, col, value, self.formats['date'])
+                            sheet.write(data_row, col, value, fmt_date)
                         elif col == 0:
-                            sheet.write(data_row, col, value, self.formats['cell_center'])
+                            sheet.write(data_row, col, value, fmt_center)
                         else:
-                            sheet.write(data_row, col, value if value else self.empty_value,
-                                       self.formats['cell'])
+                            sheet.write(data_row, col, value if value else empty, fmt_cell)
                     
                     data_rows.append(row_data)
                     data_row += 1
@@ -580,6 +602,10 @@ class EmployeeExportXlsx(EmployeeExportBase):
                    'Tanggal', 'Keterangan']
         
         data_row = self._write_sheet_header(sheet, 'DATA REWARD & PUNISHMENT', headers)
+        empty = self.empty_value
+        fmt_cell = self.formats['cell']
+        fmt_center = self.formats['cell_center']
+        fmt_date = self.formats['date']
         data_rows = []
         no = 1
         
@@ -588,10 +614,10 @@ class EmployeeExportXlsx(EmployeeExportBase):
                 for rp in emp.reward_punishment_ids:
                     # Get type label
                     rp_type = self.get_field_value(rp, 'type')
-                    type_label = 'Reward' if rp_type == 'reward' else ('Punishment' if rp_type == 'punishment' else self.empty_value)
+                    type_label = 'Reward' if rp_type == 'reward' else ('Punishment' if rp_type == 'punishment' else empty)
                     
                     # Get category based on type
-                    category = self.empty_value
+                    category = empty
                     if rp_type == 'reward':
                         reward_cat = self.get_field_value(rp, 'reward_category')
                         if reward_cat:
@@ -627,12 +653,11 @@ class EmployeeExportXlsx(EmployeeExportBase):
                     
                     for col, value in enumerate(row_data):
                         if col == 6 and value:  # Tanggal
-                            sheet.write(data_row, col, value, self.formats['date'])
+                            sheet.write(data_row, col, value, fmt_date)
                         elif col == 0:
-                            sheet.write(data_row, col, value, self.formats['cell_center'])
+                            sheet.write(data_row, col, value, fmt_center)
                         else:
-                            sheet.write(data_row, col, value if value else self.empty_value,
-                                       self.formats['cell'])
+                            sheet.write(data_row, col, value if value else empty, fmt_cell)
                     
                     data_rows.append(row_data)
                     data_row += 1
@@ -666,7 +666,7 @@ class WorkforceReportService:
                 'Laporan tidak dapat digenerate karena data tidak valid.'
             ) % (table_total, total_chart_sum))
         
-        _logger.info(f"Reconciliation PASSED: Total = {table_total}")
+        _logger.info("Reconciliation PASSED: Total = %s", table_total)
     
     # ===== HELPER METHODS =====
     
@@ -9,6 +9,8 @@ Package ini berisi unit tests untuk:
 - test_security: Test access rights
 - test_workforce_analytics: Test workforce analytics (PRD v1.1)
 - test_workforce_report: Test Workforce Report Engine (PRD v1.1)
+- test_fast_xlsx: Test writer XLSX streaming
+- test_export_kernels: Test jalur perhitungan numba/numpy/Python murni
 
 Run tests dengan:
     ./odoo-bin -c odoo.conf -d testdb --test-tags yhc_export -i yhc_employee_export --stop-after-init
@@ -26,3 +28,5 @@ from . import test_dashboard
 from . import test_security
 from . import test_workforce_analytics
 from . import test_workforce_report
+from . import test_fast_xlsx
+from . import test_export_kernels
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit Tests untuk jalur perhitungan numba/numpy/Python murni
+
+Setiap jalur dipaksa lewat flag module (NUMBA_AVAILABLE/NUMPY_AVAILABLE)
+dan hasilnya dibandingkan dengan jalur Python murni.
+"""
+
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase, tagged
+
+from ..services import export_bpjs_tk, export_graph_pdf
+from ..services.export_bpjs_tk import EmployeeExportBpjsTk, IuranRow
+from ..services.export_graph_pdf import EmployeeExportGraphPdf
+
+
+@tagged('post_install', '-at_install', 'yhc_export')
+class TestIuranCalculation(TransactionCase):
+    """Test cases untuk EmployeeExportBpjsTk._calculate_iuran"""
+    
+    def setUp(self):
+        super().setUp()
+        self.service = EmployeeExportBpjsTk(self.env)
+        # Batch kecil pun memakai kernel numba (jika tersedia)
+        self.service.NUMBA_MIN_BATCH = 1
+        max_wage = self.service.JP_MAX_WAGE
+        self.upah_values = [
+            0, 0.0, 4500000, 5123456.78, max_wage, max_wage + 1, 25000000,
+        ]
+    
+    def _calculate(self, numba, numpy):
+        """Hitung iuran dengan flag jalur numba/numpy yang dipaksa."""
+        with patch.object(export_bpjs_tk, 'NUMBA_AVAILABLE', numba), \
+                patch.object(export_bpjs_tk, 'NUMPY_AVAILABLE', numpy):
+            return self.service._calculate_iuran(self.upah_values)
+    
+    def _assert_rows_equal(self, rows, expected_rows):
+        """Bandingkan IuranRow per komponen (toleransi floating point)."""
+        self.assertEqual(len(rows), len(expected_rows))
+        for row, expected in zip(rows, expected_rows):
+            self.assertIsInstance(row, IuranRow)
+            for field, value, expected_value in zip(IuranRow._fields, row, expected):
+                self.assertAlmostEqual(value, expected_value, places=4, msg=field)
+    
+    def test_python_path(self):
+        """Test jalur Python murni: nol upah dan batas upah JP"""
+        rows, totals = self._calculate(numba=False, numpy=False)
+        rate = self.service.IURAN_RATE
+        max_wage = self.service.JP_MAX_WAGE
+        
+        zero = rows[0]
+        self.assertEqual(tuple(zero), (0,) * 12)
+        
+        # Upah di atas JP_MAX_WAGE: JP dibatasi, komponen lain tidak
+        above = rows[5]
+        self.assertAlmostEqual(above.jht_tk, (max_wage + 1) * rate['jht_tk'])
+        self.assertAlmostEqual(above.jp_tk, max_wage * rate['jp_tk'])
+        self.assertAlmostEqual(above.jp_company, max_wage * rate['jp_company'])
+        self.assertEqual(rows[6].total_jp, rows[4].total_jp)
+        
+        expected_totals = [sum(values) for values in zip(*rows)]
+        self._assert_rows_equal([totals], [expected_totals])
+    
+    def test_numpy_path(self):
+        """Test jalur numpy sama dengan jalur Python murni"""
+        if not export_bpjs_tk.NUMPY_AVAILABLE:
+            self.skipTest("numpy not installed")
+        expected_rows, expected_totals = self._calculate(numba=False, numpy=False)
+        rows, totals = self._calculate(numba=False, numpy=True)
+        self._assert_rows_equal(rows, expected_rows)
+        self._assert_rows_equal([totals], [expected_totals])
+    
+    def test_numba_path(self):
+        """Test kernel numba sama dengan jalur Python murni"""
+        if not export_bpjs_tk.NUMBA_AVAILABLE:
+            self.skipTest("numba not installed")
+        expected_rows, expected_totals = self._calculate(numba=False, numpy=False)
+        rows, totals = self._calculate(numba=True, numpy=True)
+        self._assert_rows_equal(rows, expected_rows)
+        self._assert_rows_equal([totals], [expected_totals])
+    
+    def test_empty(self):
+        """Test tanpa upah: tidak ada baris, total nol"""
+        rows, totals = self.service._calculate_iuran([])
+        self.assertEqual(rows, [])
+        self.assertEqual(tuple(totals), (0,) * 12)
+
+
+@tagged('post_install', '-at_install', 'yhc_export')
+class TestBucketCounts(TransactionCase):
+    """Test cases untuk EmployeeExportGraphPdf._bucket_counts"""
+    
+    def setUp(self):
+        super().setUp()
+        self.service = EmployeeExportGraphPdf(self.env)
+        # Jumlah nilai kecil pun memakai kernel numba (jika tersedia)
+        self.service.NUMBA_MIN_VALUES = 1
+        self.edges = self.service.AGE_GROUP_EDGES
+        # Nilai tepat di batas masuk kelompok atas (side='right')
+        self.values = [0, 18.5, 24.99, 25, 25.01, 34.9, 35, 44, 45, 54.99, 55, 70]
+    
+    def _bucket_counts(self, numba, numpy):
+        """Hitung kelompok dengan flag jalur numba/numpy yang dipaksa."""
+        with patch.object(export_graph_pdf, 'NUMBA_AVAILABLE', numba), \
+                patch.object(export_graph_pdf, 'NUMPY_AVAILABLE', numpy):
+            return self.service._bucket_counts(self.values, self.edges)
+    
+    def test_bisect_path(self):
+        """Test jalur bisect (Python murni), termasuk nilai di batas"""
+        self.assertEqual(self._bucket_counts(numba=False, numpy=False), [3, 3, 2, 2, 2])
+    
+    def test_searchsorted_path(self):
+        """Test jalur searchsorted numpy sama dengan jalur bisect"""
+        if not export_graph_pdf.NUMPY_AVAILABLE:
+            self.skipTest("numpy not installed")
+        self.assertEqual(
+            self._bucket_counts(numba=False, numpy=True),
+            self._bucket_counts(numba=False, numpy=False),
+        )
+    
+    def test_numba_path(self):
+        """Test kernel numba sama dengan jalur bisect"""
+        if not export_graph_pdf.NUMBA_AVAILABLE:
+            self.skipTest("numba not installed")
+        self.assertEqual(
+            self._bucket_counts(numba=True, numpy=True),
+            self._bucket_counts(numba=False, numpy=False),
+        )
+    
+    def test_empty(self):
+        """Test tanpa nilai: semua kelompok nol"""
+        self.values = []
+        self.assertEqual(self._bucket_counts(numba=False, numpy=False), [0] * 5)
+        if export_graph_pdf.NUMPY_AVAILABLE:
+            self.assertEqual(self._bucket_counts(numba=False, numpy=True), [0] * 5)
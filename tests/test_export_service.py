@@ -8,9 +8,12 @@ Test cases untuk semua export services (XLSX, CSV, PDF, JSON)
 
 import base64
 import json
-from io import BytesIO
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest.mock import patch
 
 from odoo.tests import TransactionCase, tagged
+from odoo import fields
 from odoo.exceptions import UserError
 
 
@@ -213,6 +216,124 @@ class TestExportServices(TransactionCase):
         decoded = base64.b64decode(result['file']).decode('utf-8-sig')
         
         self.assertIn('Test Export Dept', decoded)
+    
+    def test_export_csv_arrow_writer_round_trip(self):
+        """Test writer CSV pyarrow menghasilkan isi yang sama dengan csv.writer"""
+        import csv
+        from ..services.export_csv import EmployeeExportCsv, PYARROW_AVAILABLE
+        
+        if not PYARROW_AVAILABLE:
+            self.skipTest("pyarrow not installed")
+        
+        employees = self.employees | self.env['hr.employee'].create({
+            'name': 'Doe, "JD"\nJr',
+            'department_id': self.department.id,
+        })
+        categories = ['identity', 'employment', 'family']
+        
+        for delimiter in (',', ';', '\t'):
+            service = EmployeeExportCsv(self.env)
+            plain, _ = service.export(employees, categories, delimiter=delimiter)
+            
+            service = EmployeeExportCsv(self.env)
+            service.ARROW_MIN_ROWS = 1
+            service.ARROW_BATCH_SIZE = 2
+            arrow, _ = service.export(employees, categories, delimiter=delimiter)
+            
+            def parse(content):
+                text = content.decode('utf-8-sig')
+                return list(csv.reader(StringIO(text, newline=''), delimiter=delimiter))
+            
+            self.assertEqual(parse(arrow), parse(plain))
+            self.assertEqual(len(parse(arrow)), len(employees) + 1)
+    
+    def test_export_json_omit_empty_block(self):
+        """Test omit_empty: key None dan blok kosong dibuang, False/0 tetap"""
+        from ..services.export_json import EmployeeExportJson
+        
+        service = EmployeeExportJson(self.env)
+        service.omit_empty = True
+        data = {}
+        service._set_block(data, 'identity', {
+            'name': 'John Doe', 'nik': None, 'is_active': False, 'age': 0, 'notes': '',
+        })
+        service._set_block(data, 'family', {'spouse_name': None})
+        service._set_block(data, 'bpjs', {})
+        service._set_block(data, 'payroll', None)
+        
+        self.assertEqual(data, {
+            'identity': {'name': 'John Doe', 'is_active': False, 'age': 0, 'notes': ''},
+        })
+        
+        # Tanpa omit_empty semua key dan blok dipertahankan
+        service.omit_empty = False
+        data = {}
+        service._set_block(data, 'family', {'spouse_name': None})
+        service._set_block(data, 'payroll', None)
+        self.assertEqual(data, {'family': {'spouse_name': None}, 'payroll': None})
+    
+    def test_export_json_omit_empty(self):
+        """Test export_for_api dengan omit_empty sama dengan tanpa key None"""
+        from ..services.export_json import EmployeeExportJson
+        
+        categories = ['identity', 'employment', 'family']
+        full = EmployeeExportJson(self.env).export_for_api(self.employees, categories)
+        compact = EmployeeExportJson(self.env).export_for_api(
+            self.employees, categories, omit_empty=True)
+        
+        self.assertEqual(len(compact['employees']), len(full['employees']))
+        for full_emp, compact_emp in zip(full['employees'], compact['employees']):
+            expected = {}
+            for key, block in full_emp.items():
+                if key in categories:
+                    block = {k: v for k, v in (block or {}).items() if v is not None}
+                    if not block:
+                        continue
+                expected[key] = block
+            self.assertEqual(compact_emp, expected)
+            
+            for block in compact_emp.values():
+                if isinstance(block, dict):
+                    self.assertNotIn(None, block.values())
+    
+    def test_export_json_template(self):
+        """Test export JSON dengan field mapping template"""
+        from ..services.export_json import EmployeeExportJson
+        
+        john, jane, bob = self.employees
+        jane.parent_id = john
+        template = self.env['hr.employee.export.template'].create({
+            'name': 'Test Template JSON',
+            'code': 'TEST_JSON',
+            'template_type': 'demographic',
+            'field_mapping': json.dumps({
+                'name': 'Nama',
+                'department_id.name': 'Unit Kerja',
+                'child_ids.name': 'Bawahan',
+                'x_not_a_field': 'Tidak Ada',
+            }),
+        })
+        
+        service = EmployeeExportJson(self.env)
+        content, filename = service.export_template(self.employees, template)
+        data = json.loads(content)
+        
+        self.assertTrue(filename.endswith('.json'))
+        self.assertEqual(data['metadata']['total_employees'], 3)
+        rows = {row['id']: row for row in data['employees']}
+        
+        # Path satu level dan many2one
+        self.assertEqual(rows[john.id]['name'], 'John Doe')
+        self.assertEqual(rows[john.id]['department_id.name'], 'Test Export Dept')
+        # Path one2many dibaca lewat _get_value
+        self.assertEqual(rows[john.id]['child_ids.name'], 'Jane Smith')
+        self.assertIsNone(rows[bob.id]['child_ids.name'])
+        # Field yang tidak ada
+        self.assertIsNone(rows[john.id]['x_not_a_field'])
+        
+        for emp in self.employees:
+            for field_path in template.get_fields():
+                self.assertEqual(rows[emp.id][field_path], service._get_value(emp, field_path))
 
 
 @tagged('post_install', '-at_install', 'yhc_export')
@@ -271,3 +392,128 @@ class TestExportWizard(TransactionCase):
         
         # Should return action to show preview
         self.assertIsNotNone(result)
+
+
+@tagged('post_install', '-at_install', 'yhc_export')
+class TestGraphPdfAnalyticsCache(TransactionCase):
+    """Test cases untuk cache analytics export grafik PDF"""
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        
+        cls.employees = cls.env['hr.employee'].create([
+            {'name': 'Cache Satu', 'gender': 'male'},
+            {'name': 'Cache Dua', 'gender': 'female'},
+        ])
+    
+    def setUp(self):
+        super().setUp()
+        from ..services import export_graph_pdf
+        
+        self.module = export_graph_pdf
+        self.module._ANALYTICS_CACHE.clear()
+        self.addCleanup(self.module._ANALYTICS_CACHE.clear)
+        
+        self.service = export_graph_pdf.EmployeeExportGraphPdf(self.env)
+        self.calc = patch.object(
+            self.service, '_calc_all_distributions',
+            wraps=self.service._calc_all_distributions,
+        ).start()
+        self.addCleanup(patch.stopall)
+    
+    def _get(self, needed=frozenset({'gender'})):
+        """Ambil data analytics karyawan test untuk key yang diminta."""
+        return self.service._get_analytics_data(self.employees, set(needed))
+    
+    def test_cache_hit(self):
+        """Test export berulang memakai hasil cache (salinan)"""
+        first = self._get()
+        second = self._get()
+        
+        self.assertEqual(self.calc.call_count, 1)
+        self.assertEqual(first, second)
+        
+        # Hasil cache tidak ikut berubah jika hasil sebelumnya dimodifikasi
+        second['gender']['data'].append(99)
+        self.assertEqual(self._get(), first)
+        self.assertEqual(self.calc.call_count, 1)
+        
+        # Key analytics lain tidak memakai entri yang sama
+        self._get({'gender', 'age'})
+        self.assertEqual(self.calc.call_count, 2)
+    
+    def test_cache_invalidated_by_write_date(self):
+        """Test perubahan write_date karyawan membuat key cache baru"""
+        self._get()
+        self.employees[0].write({
+            'write_date': fields.Datetime.now() + timedelta(days=1),
+        })
+        self._get()
+        
+        self.assertEqual(self.calc.call_count, 2)
+    
+    def test_cache_ttl_expired(self):
+        """Test entri cache kedaluwarsa setelah ANALYTICS_CACHE_TTL detik"""
+        ttl = self.service.ANALYTICS_CACHE_TTL
+        monotonic = patch.object(self.module.time, 'monotonic').start()
+        
+        monotonic.return_value = 1000.0
+        self._get()
+        monotonic.return_value = 1000.0 + ttl - 1
+        self._get()
+        self.assertEqual(self.calc.call_count, 1)
+        
+        monotonic.return_value = 1000.0 + ttl
+        self._get()
+        self.assertEqual(self.calc.call_count, 2)
+
+
+@tagged('post_install', '-at_install', 'yhc_export')
+class TestBpjsExportServices(TransactionCase):
+    """Test cases untuk export BPJS Kesehatan dan Ketenagakerjaan"""
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        
+        cls.state = cls.env['res.country.state'].create({
+            'name': 'Jawa Barat Test',
+            'code': 'JBT',
+            'country_id': cls.env.ref('base.id').id,
+        })
+        cls.employees = cls.env['hr.employee'].create([
+            {'name': 'Alamat Relasi', 'private_state_id': cls.state.id},
+            {'name': 'Alamat Kosong'},
+        ])
+    
+    def test_bpjs_kes_many2one_address(self):
+        """Test field alamat many2one ditulis dengan name record (BPJS Kesehatan)"""
+        from ..services.export_bpjs_kes import EmployeeExportBpjsKes
+        
+        service = EmployeeExportBpjsKes(self.env)
+        # Field alamat dari module lain bisa berupa many2one; diwakili
+        # private_state_id bawaan hr.employee
+        service.EMPLOYEE_FIELDS += ('private_state_id',)
+        service._alamat_fields = ('private_state_id',)
+        
+        emp_data = service._read_employee_data(self.employees)
+        with_state, without_state = (emp_data[emp.id] for emp in self.employees)
+        
+        self.assertEqual(with_state['private_state_id'], 'Jawa Barat Test')
+        self.assertEqual(service._parse_alamat(with_state)['private_state_id'], 'Jawa Barat Test')
+        self.assertEqual(service._parse_alamat(without_state)['private_state_id'], service.empty_value)
+    
+    def test_bpjs_tk_many2one_address(self):
+        """Test field alamat many2one ditulis dengan name record (BPJS Ketenagakerjaan)"""
+        from ..services.export_bpjs_tk import EmployeeExportBpjsTk
+        
+        service = EmployeeExportBpjsTk(self.env)
+        service.EMPLOYEE_FIELDS += ('private_state_id',)
+        service.ALAMAT_FIELDS += ('private_state_id',)
+        
+        with_state, without_state = service._prefetch_employees(self.employees)
+        
+        self.assertEqual(with_state['private_state_id'], 'Jawa Barat Test')
+        self.assertEqual(service._parse_alamat(with_state)['private_state_id'], 'Jawa Barat Test')
+        self.assertEqual(service._parse_alamat(without_state)['private_state_id'], service.empty_value)
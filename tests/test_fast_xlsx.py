@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit Tests untuk StreamingWorkbook (services/_fast_xlsx.py)
+
+Workbook ditulis lalu dibaca ulang sebagai arsip ZIP dan XML.
+"""
+
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from io import BytesIO
+from xml.etree import ElementTree
+
+from odoo.tests import TransactionCase, tagged
+
+from ..services._fast_xlsx import StreamingWorkbook, STYLE_DATE, STYLE_HEADER
+
+NS = {'x': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+
+@tagged('post_install', '-at_install', 'yhc_export')
+class TestStreamingWorkbook(TransactionCase):
+    """Test cases untuk writer XLSX streaming"""
+    
+    def _write(self, rows, styles=None):
+        """Tulis rows ke workbook dan kembalikan cell sheet1 per referensi."""
+        output = BytesIO()
+        workbook = StreamingWorkbook(output, 'Data')
+        workbook.set_column_widths([10, 10, 20])
+        workbook.freeze_rows(1)
+        for row in rows:
+            workbook.write_row(row, styles)
+        workbook.close()
+        
+        with zipfile.ZipFile(BytesIO(output.getvalue())) as archive:
+            # Semua part XML harus valid
+            for name in archive.namelist():
+                ElementTree.fromstring(archive.read(name))
+            sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+        
+        cells = {}
+        for cell in sheet.iterfind('.//x:c', NS):
+            value = cell.find('x:v', NS)
+            text = cell.find('x:is/x:t', NS)
+            cells[cell.get('r')] = (
+                cell.get('t'),
+                cell.get('s'),
+                text.text if text is not None else value.text,
+            )
+        return cells
+    
+    def test_write_value_types(self):
+        """Test string, angka, tanggal, boolean dan karakter kontrol"""
+        cells = self._write([
+            ['Nama', 'Nilai', 'Keterangan'],
+            ['A <b> & "c"', 42, 'x\x01y\x1fz'],
+            [date(2024, 1, 15), 1.5, True],
+            [datetime(2024, 1, 15, 12, 0), Decimal('2.50'), None],
+            [False, '', 0],
+        ], styles=None)
+        
+        self.assertEqual(cells['A1'], ('inlineStr', None, 'Nama'))
+        self.assertEqual(cells['A2'], ('inlineStr', None, 'A <b> & "c"'))
+        self.assertEqual(cells['B2'], (None, None, '42'))
+        # Karakter kontrol yang tidak valid di XML dibuang
+        self.assertEqual(cells['C2'], ('inlineStr', None, 'xyz'))
+        
+        # Tanggal sebagai serial Excel dengan style tanggal
+        self.assertEqual(cells['A3'], (None, str(STYLE_DATE), '45306'))
+        self.assertEqual(cells['B3'], (None, None, '1.5'))
+        self.assertEqual(cells['C3'], ('b', None, '1'))
+        
+        self.assertEqual(cells['A4'], (None, str(STYLE_DATE), '45306.5'))
+        self.assertEqual(cells['B4'], (None, None, '2.5'))
+        self.assertNotIn('C4', cells)
+        
+        # False dan '' adalah cell kosong, 0 tetap ditulis
+        self.assertNotIn('A5', cells)
+        self.assertNotIn('B5', cells)
+        self.assertEqual(cells['C5'], (None, None, '0'))
+    
+    def test_write_styles(self):
+        """Test style per kolom"""
+        cells = self._write([['No', 'Nama', 'Tanggal']],
+                            styles=[STYLE_HEADER, STYLE_HEADER, STYLE_HEADER])
+        
+        self.assertEqual(cells['A1'], ('inlineStr', str(STYLE_HEADER), 'No'))
+        self.assertEqual(cells['C1'], ('inlineStr', str(STYLE_HEADER), 'Tanggal'))
+    
+    def test_write_invalid_values(self):
+        """Test nilai yang tidak bisa ditulis ke XLSX"""
+        workbook = StreamingWorkbook(BytesIO())
+        
+        with self.assertRaises(TypeError):
+            workbook.write_row([object()])
+        with self.assertRaises(ValueError):
+            workbook.write_row([float('nan')])
+        with self.assertRaises(ValueError):
+            workbook.write_row([Decimal('Infinity')])
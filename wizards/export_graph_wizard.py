@@ -318,10 +318,10 @@ class HrEmployeeExportGraphWizard(models.TransientModel):
             }
             
         except ImportError as e:
-            _logger.error(f"Import error: {str(e)}")
+            _logger.error("Import error: %s", e)
             raise UserError(_('Module export tidak tersedia. Hubungi administrator.'))
         except Exception as e:
-            _logger.error(f"Error exporting graph PDF: {str(e)}")
+            _logger.error("Error exporting graph PDF: %s", e)
             raise UserError(_('Gagal membuat PDF: %s') % str(e))
     
     def action_preview(self):
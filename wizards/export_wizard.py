@@ -621,10 +621,10 @@ class HrEmployeeExportWizard(models.TransientModel):
             }
             
         except ImportError as e:
-            _logger.error(f"Import error for PDF export: {str(e)}")
+            _logger.error("Import error for PDF export: %s", e)
             raise UserError(_("Gagal mengimpor modul PDF export. Pastikan service export_pdf tersedia."))
         except Exception as e:
-            _logger.error(f"Error during PDF export: {str(e)}")
+            _logger.error("Error during PDF export: %s", e)
             raise UserError(_("Gagal melakukan export PDF: %s") % str(e))
 
     def _log_export_activity(self, record_count, export_format):
@@ -640,7 +640,7 @@ class HrEmployeeExportWizard(models.TransientModel):
                     'status': 'success',
                 })
         except Exception as e:
-            _logger.warning(f"Could not log export activity: {str(e)}")
+            _logger.warning("Could not log export activity: %s", e)
 
     def _format_service_length(self, value, with_unit=True):
         """
@@ -682,7 +682,7 @@ class HrEmployeeExportWizard(models.TransientModel):
             return str(value)
             
         except Exception as e:
-            _logger.warning(f"Error formatting service_length '{value}': {e}")
+            _logger.warning("Error formatting service_length '%s': %s", value, e)
             return str(value) if value else '-'
 
     def _safe_value(self, value, default='-'):
@@ -460,7 +460,7 @@ class HrEmployeeExportWorkforceWizard(models.TransientModel):
             }
             
         except Exception as e:
-            _logger.error(f"Error exporting workforce analytics PDF: {e}", exc_info=True)
+            _logger.error("Error exporting workforce analytics PDF: %s", e, exc_info=True)
             raise UserError(_('Gagal export PDF: %s') % str(e))
     
     def _validate_before_export(self):
@@ -529,7 +529,7 @@ class HrEmployeeExportWorkforceWizard(models.TransientModel):
                 'notes': f"Layout: {self.layout_type}, Snapshot: {self.snapshot_date}",
             })
         except Exception as e:
-            _logger.warning(f"Failed to create audit log: {e}")
+            _logger.warning("Failed to create audit log: %s", e)
     
     def action_back(self):
         """Go back to config state."""
@@ -306,7 +306,7 @@ class HrEmployeeSeedWizard(models.TransientModel):
             except Exception as e:
                 failed_count += 1
                 errors.append(f"#{i+1}: {str(e)}")
-                _logger.warning(f"Failed to create employee #{i+1}: {e}")
+                _logger.warning("Failed to create employee #%s: %s", i + 1, e)
         
         # Build result message
         result_lines = [
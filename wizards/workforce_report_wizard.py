@@ -293,7 +293,7 @@ class WorkforceReportWizard(models.TransientModel):
                 'Laporan TIDAK DAPAT digenerate tanpa data snapshot.'
             ))
         
-        _logger.info(f"Generating Workforce Report for {month}/{year}")
+        _logger.info("Generating Workforce Report for %s/%s", month, year)
         
         try:
             # Get report service
@@ -310,7 +310,7 @@ class WorkforceReportWizard(models.TransientModel):
             self.output_filename = f"Workforce_Report_{year}{month:02d}.pdf"
             self.state = 'done'
             
-            _logger.info(f"Workforce Report generated successfully: {self.output_filename}")
+            _logger.info("Workforce Report generated successfully: %s", self.output_filename)
             
             # Log audit
             self._log_report_generation(report_data)
@@ -318,7 +318,7 @@ class WorkforceReportWizard(models.TransientModel):
         except ValidationError as e:
             raise
         except Exception as e:
-            _logger.error(f"Error generating workforce report: {str(e)}")
+            _logger.error("Error generating workforce report: %s", e)
             raise UserError(_(
                 'Gagal generate laporan:\n%s'
             ) % str(e))
@@ -361,10 +361,10 @@ class WorkforceReportWizard(models.TransientModel):
                     raise_if_not_found=False
                 )
                 if report_action:
-                    _logger.info(f"Found report action via env.ref with module: {module_name}")
+                    _logger.info("Found report action via env.ref with module: %s", module_name)
                     break
             except (ValueError, Exception) as e:
-                _logger.warning(f"Could not find report via env.ref ({module_name}): {e}")
+                _logger.warning("Could not find report via env.ref (%s): %s", module_name, e)
         
         # Method 2: Search by report_name if env.ref fails - try multiple naming patterns
         if not report_action:
@@ -374,7 +374,7 @@ class WorkforceReportWizard(models.TransientModel):
                 ], limit=1)
                 
                 if report_action:
-                    _logger.info(f"Found report action via search: {report_action.name}")
+                    _logger.info("Found report action via search: %s", report_action.name)
                     break
         
         # Method 3: Search by model if still not found
@@ -386,7 +386,7 @@ class WorkforceReportWizard(models.TransientModel):
             ], limit=1)
             
             if report_action:
-                _logger.info(f"Found report action via model search: {report_action.name}")
+                _logger.info("Found report action via model search: %s", report_action.name)
         
         # Raise error if report action not found at all
         if not report_action:
@@ -411,7 +411,7 @@ class WorkforceReportWizard(models.TransientModel):
         except ValueError as e:
             # QWeb template not found - use fallback PDF generation
             if 'External ID not found' in str(e):
-                _logger.warning(f"QWeb template not found, using fallback PDF generation: {e}")
+                _logger.warning("QWeb template not found, using fallback PDF generation: %s", e)
                 pdf_content = self._generate_fallback_pdf(report_data)
             else:
                 raise
@@ -718,7 +718,7 @@ class WorkforceReportWizard(models.TransientModel):
             return f"data:image/png;base64,{image_base64}"
             
         except Exception as e:
-            _logger.error(f"Error generating bar chart: {e}")
+            _logger.error("Error generating bar chart: %s", e)
             return None
     
     def _generate_horizontal_bar_chart(self, labels, data, colors, title):
@@ -773,7 +773,7 @@ class WorkforceReportWizard(models.TransientModel):
             return f"data:image/png;base64,{image_base64}"
             
         except Exception as e:
-            _logger.error(f"Error generating horizontal bar chart: {e}")
+            _logger.error("Error generating horizontal bar chart: %s", e)
             return None
     
     def _generate_pie_chart(self, labels, data, colors, title):
@@ -829,7 +829,7 @@ class WorkforceReportWizard(models.TransientModel):
             return f"data:image/png;base64,{image_base64}"
             
         except Exception as e:
-            _logger.error(f"Error generating pie chart: {e}")
+            _logger.error("Error generating pie chart: %s", e)
             return None
     
     def _log_report_generation(self, report_data):
@@ -844,7 +844,7 @@ class WorkforceReportWizard(models.TransientModel):
                 'description': f"Workforce Report - {report_data['header']['period_name']}",
             })
         except Exception as e:
-            _logger.warning(f"Could not create audit log: {e}")
+            _logger.warning("Could not create audit log: %s", e)
     
     def action_back(self):
         """Go back to period selection."""